@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+HEADY_BRAND:BEGIN
+╔══════════════════════════════════════════════════════════════════╗
+║  HeadySync Bench - Autoscaler                                     ║
+╚══════════════════════════════════════════════════════════════════╝
+HEADY_BRAND:END
+
+Runs the Autoscaler against the fake Docker API and a synthetic oracle,
+with time compressed (one wall second stands for one minute of load).
+
+* Each worker drains ``--capacity`` messages per second. The backlog, batch
+  write latency and CPU follow from the offered load and the worker count,
+  and are exported on a ``/metrics`` page and through Docker stats.
+* Scaling recreates ``heady_oracle`` blue/green with the new ``ORACLE_WORKERS``.
+
+The load is a steady base, a sustained surge, then back to base. The bench
+prints a timeline, peak backlog against a fixed single worker, the number
+of direction changes (flapping), and checks that a manual pad step holds
+against the loop.
+
+Run from midi_bridge/:  python -m benchmarks.bench_autoscaler [--surge N] [--capacity N]
+"""
+
+import argparse
+import asyncio
+import socket
+import threading
+import time
+from typing import Dict
+
+import docker
+import uvicorn
+from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
+
+from benchmarks.fake_docker import start_in_thread
+from src.autoscaler import Autoscaler, ScalingPolicy
+from src.docker_ops import DockerExecutor
+from src.rollout import blue_green_swap
+
+ALTERNATES = {'ORACLE_SPOOL_DIR': ('/app/spool', '/app/spool/alt')}
+PHASES = [(4.0, 'base'), (10.0, 'surge'), (14.0, 'base')]
+
+
+class SyntheticOracle:
+    """Queue and latency model of the oracle, served as Prometheus text"""
+
+    def __init__(self, capacity: float):
+        self.capacity = capacity
+        self.backlog = 0.0
+        self.latency = 0.02
+        self.utilization = 0.0
+        self.write_sum = 0.0
+        self.write_count = 0
+
+    def advance(self, load: float, workers: int, seconds: float):
+        capacity = self.capacity * workers
+        self.backlog = max(0.0, self.backlog + (load - capacity) * seconds)
+        self.utilization = min(1.0, (load + (self.backlog > 0) * capacity) / capacity)
+        self.latency = min(2.0, 0.02 / max(0.01, 1.0 - min(self.utilization, 0.99)))
+        batches = max(1, int(10 * seconds))
+        self.write_count += batches
+        self.write_sum += self.latency * batches
+
+    def render(self) -> str:
+        return "\n".join([
+            f'heady_oracle_queue_depth{{queue="ingest"}} {self.backlog * 0.2:.0f}',
+            f'heady_oracle_queue_depth{{queue="write"}} {self.backlog * 0.8:.0f}',
+            f'heady_oracle_queue_depth{{queue="brain"}} 3',
+            f'heady_oracle_write_duration_seconds_sum{{sink="spool"}} {self.write_sum}',
+            f'heady_oracle_write_duration_seconds_count{{sink="spool"}} {self.write_count}',
+        ]) + "\n"
+
+
+def serve_metrics(model: SyntheticOracle) -> str:
+    app = FastAPI()
+
+    @app.get("/metrics", response_class=PlainTextResponse)
+    async def metrics():
+        return model.render()
+
+    with socket.socket() as probe:
+        probe.bind(('127.0.0.1', 0))
+        port = probe.getsockname()[1]
+    server = uvicorn.Server(uvicorn.Config(app, host='127.0.0.1', port=port, log_level='warning'))
+    threading.Thread(target=server.run, name='synthetic-oracle', daemon=True).start()
+    while not server.started:
+        time.sleep(0.01)
+    return f"http://127.0.0.1:{port}/metrics"
+
+
+def workers_of(fake) -> int:
+    container = fake.containers.get('heady_oracle')
+    env = dict(item.split('=', 1) for item in (container or {}).get('Config', {}).get('Env', []))
+    return int(env.get('ORACLE_WORKERS', '1'))
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--base', type=float, default=600, help='base load, messages/s')
+    parser.add_argument('--surge', type=float, default=3200, help='surge load, messages/s')
+    parser.add_argument('--capacity', type=float, default=1000, help='messages/s one worker drains')
+    args = parser.parse_args()
+
+    fake = start_in_thread(boot_latency=0.2)
+    fake.containers['heady_oracle']['Config']['Env'] = ['ORACLE_SPOOL_DIR=/app/spool', 'ORACLE_WORKERS=1']
+    executor = DockerExecutor(client_factory=lambda timeout: docker.DockerClient(base_url=fake.url, timeout=timeout))
+    model = SyntheticOracle(args.capacity)
+    fixed = SyntheticOracle(args.capacity)
+
+    async def apply(workers: int) -> bool:
+        await executor.run('swap', 'heady_oracle', blue_green_swap, 'heady_oracle',
+                           {'ORACLE_WORKERS': str(workers)}, None, ALTERNATES, 10.0, 1)
+        return True
+
+    scaler = Autoscaler(executor, 'heady_oracle', apply, serve_metrics(model),
+                        ScalingPolicy(min_replicas=1, max_replicas=6, queue_high=500, queue_low=50,
+                                      latency_high=0.25, latency_low=0.05, cpu_high=80, cpu_low=30,
+                                      up_after=2, down_after=4, up_cooldown=0.8, down_cooldown=2.0),
+                        interval=0.2, override_hold=2.0)
+
+    started = time.monotonic()
+    phase_end = 0.0
+    peak = peak_fixed = 0.0
+    last_print = -1
+    for duration, phase in PHASES:
+        phase_end += duration
+        load = args.surge if phase == 'surge' else args.base
+        while (now := time.monotonic() - started) < phase_end:
+            workers = workers_of(fake)
+            model.advance(load, workers, 0.05)
+            fixed.advance(load, 1, 0.05)
+            fake.set_usage('heady_oracle', model.utilization * 100 * workers, 20 + 8 * workers)
+            peak, peak_fixed = max(peak, model.backlog), max(peak_fixed, fixed.backlog)
+            if int(now) != last_print:
+                last_print = int(now)
+                print(f"t={now:5.1f}s  {phase:5}  load {load:5.0f}/s  workers {workers}  "
+                      f"backlog {model.backlog:7.0f}  latency {model.latency * 1000:5.0f} ms")
+            if int(now * 20) % 4 == 0:
+                await scaler.tick()
+            await asyncio.sleep(0.05)
+
+    decisions = list(scaler.decisions)
+    directions = [1 if d['to'] > d['from'] else -1 for d in decisions]
+    flips = sum(1 for a, b in zip(directions, directions[1:]) if a != b)
+    print(f"\ndecisions: {[(d['from'], d['to'], d['reason']) for d in decisions]}")
+    print(f"peak backlog: {peak:.0f} autoscaled vs {peak_fixed:.0f} with one worker; "
+          f"direction changes: {flips}; final workers {workers_of(fake)}")
+
+    before = workers_of(fake)
+    await scaler.step(+1)
+    model.backlog, model.utilization = 0.0, 0.0
+    fake.set_usage('heady_oracle', 0.0, 20)
+    for _ in range(12):
+        await scaler.tick()
+        await asyncio.sleep(0.05)
+    print(f"manual step: {before} -> {workers_of(fake)} workers, held while idle: "
+          f"{workers_of(fake) == before + 1} ({scaler.stats()['held_for_seconds']} s left)")
+
+    await scaler.stop()
+    await executor.shutdown()
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
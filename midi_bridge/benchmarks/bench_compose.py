@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+HEADY_BRAND:BEGIN
+╔══════════════════════════════════════════════════════════════════╗
+║  HeadySync Bench - docker-compose Runner                          ║
+╚══════════════════════════════════════════════════════════════════╝
+HEADY_BRAND:END
+
+Drives ComposeRunner against the stand-in compose CLI (benchmarks/fake_compose.py)
+while a heartbeat coroutine measures event-loop stalls:
+
+* a production deploy with one serial ``pull`` vs. per-service parallel pulls
+* a command that exceeds its timeout (must be killed)
+* a deploy cancelled mid-pull (the child must be terminated)
+
+Run from midi_bridge/:  python -m benchmarks.bench_compose [--pull-seconds S]
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+from typing import List
+
+from src.compose import ComposeError, ComposeRunner
+
+FAKE_COMPOSE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fake_compose.py')
+
+
+async def heartbeat(stop: asyncio.Event, lags: List[float]):
+    while not stop.is_set():
+        expected = time.perf_counter() + 0.005
+        await asyncio.sleep(0.005)
+        lags.append(max(0.0, time.perf_counter() - expected))
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--pull-seconds', type=float, default=1.0, help='fake pull time per service')
+    parser.add_argument('--parallel', type=int, default=4)
+    args = parser.parse_args()
+    os.environ['FAKE_COMPOSE_PULL_SECONDS'] = str(args.pull_seconds)
+
+    runner = ComposeRunner(command=f"{sys.executable} {FAKE_COMPOSE}", max_parallel=args.parallel, kill_grace=1.0)
+    lines = runner.subscribe()
+    lags: List[float] = []
+    stop = asyncio.Event()
+    beat = asyncio.create_task(heartbeat(stop, lags))
+
+    started = time.perf_counter()
+    await runner.run(['pull'])
+    await runner.run(['up', '-d'])
+    serial = time.perf_counter() - started
+
+    started = time.perf_counter()
+    await runner.pull()
+    await runner.run(['up', '-d'])
+    parallel = time.perf_counter() - started
+
+    stop.set()
+    await beat
+    print(f"deploy, serial pull:    {serial:6.2f} s")
+    print(f"deploy, parallel pulls: {parallel:6.2f} s  ({args.parallel} at a time)")
+    print(f"max event loop stall:   {max(lags) * 1000:6.1f} ms; {lines.qsize()} output lines streamed")
+
+    os.environ['FAKE_COMPOSE_HANG'] = '1'
+    started = time.perf_counter()
+    try:
+        await runner.run(['up', '-d'], timeout=0.5)
+    except ComposeError as e:
+        job = runner.jobs(1)[0]
+        print(f"timeout:   {e} -> {job.state}, returncode {job.returncode} "
+              f"after {time.perf_counter() - started:.2f} s")
+
+    deploy = asyncio.create_task(runner.run(['pull']))
+    await asyncio.sleep(0.3)
+    job = runner.jobs(1)[0]
+    runner.cancel(job.id)
+    try:
+        await deploy
+    except asyncio.CancelledError:
+        print(f"cancelled: {job.id} -> {job.state}, returncode {job.returncode}, "
+              f"process exited: {job.process.returncode is not None}")
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+HEADY_BRAND:BEGIN
+╔══════════════════════════════════════════════════════════════════╗
+║  HeadySync Bench - Container Health Collection                    ║
+╚══════════════════════════════════════════════════════════════════╝
+HEADY_BRAND:END
+
+Collects the status of the Heady containers from the fake Docker Engine API
+(each inspect taking ``--inspect-latency`` seconds) three ways:
+
+* ``sequential``: the previous system_health, one inspect after another
+* ``cold``:       ContainerStateCache.snapshot with an empty cache (parallel fan-out)
+* ``cached``:     ContainerStateCache.snapshot once the event-fed view is warm
+
+It then measures how long a state change takes to reach the cache over the
+event stream, checks that a reconcile corrects a change whose event was lost,
+and flaps unrelated containers on the same host to show their events never
+reach the bridge.
+
+Run from midi_bridge/:  python -m benchmarks.bench_container_state
+"""
+
+import argparse
+import asyncio
+import time
+
+import docker
+
+from benchmarks.fake_docker import HEADY_CONTAINERS, start_in_thread
+from src.container_state import ContainerStateCache
+from src.docker_ops import DockerExecutor, inspect_container
+
+
+async def timed(coro_fn, repeat: int) -> float:
+    """Mean milliseconds per call"""
+    started = time.perf_counter()
+    for _ in range(repeat):
+        await coro_fn()
+    return (time.perf_counter() - started) / repeat * 1000
+
+
+async def wait_for(predicate, timeout: float = 5.0) -> float:
+    started = time.perf_counter()
+    while not predicate():
+        if time.perf_counter() - started > timeout:
+            raise TimeoutError("cache never caught up")
+        await asyncio.sleep(0.0005)
+    return (time.perf_counter() - started) * 1000
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--inspect-latency', type=float, default=0.02, help='fake daemon seconds per inspect')
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    others = [f"other_{n}" for n in range(20)]
+    fake = start_in_thread(inspect_latency=args.inspect_latency, containers=list(HEADY_CONTAINERS) + others)
+    executor = DockerExecutor(max_workers=8, client_factory=lambda timeout: docker.DockerClient(
+        base_url=fake.url, timeout=timeout))
+    await executor.call(lambda client: client.ping())
+
+    async def sequential():
+        for name in HEADY_CONTAINERS:
+            await executor.call(inspect_container, name)
+
+    async def cold():
+        await ContainerStateCache(executor, HEADY_CONTAINERS).snapshot()
+
+    cache = ContainerStateCache(executor, HEADY_CONTAINERS, reconcile_interval=3600)
+    cache.start()
+    await wait_for(lambda: cache.stream_connected and cache.reconciles > 0)
+
+    print(f"{len(HEADY_CONTAINERS)} containers, {args.inspect_latency * 1000:.0f} ms per inspect")
+    print(f"{'sequential':<12} {await timed(sequential, args.repeat):>10.3f} ms")
+    print(f"{'cold':<12} {await timed(cold, args.repeat):>10.3f} ms")
+    print(f"{'cached':<12} {await timed(cache.snapshot, args.repeat * 100):>10.3f} ms")
+
+    fake.call_threadsafe(fake.set_state, 'heady_oracle', None, 'unhealthy')
+    lag = await wait_for(lambda: cache.cached('heady_oracle')['health'] == 'unhealthy')
+    print(f"event -> cache: {lag:.1f} ms")
+
+    fake.call_threadsafe(fake.set_state, 'heady_viz', 'exited', None, False)
+    await asyncio.sleep(0.1)
+    missed = cache.cached('heady_viz')['status']
+    await cache.reconcile()
+    print(f"lost event: cache said {missed!r}, reconcile corrected to {cache.cached('heady_viz')['status']!r} "
+          f"({cache.drift_corrections} drift correction)")
+
+    applied = cache.events_applied
+    for n in range(500):
+        fake.call_threadsafe(fake.set_state, others[n % len(others)], 'exited' if n % 2 else 'running')
+    fake.call_threadsafe(fake.set_state, 'heady_oracle', None, 'healthy')
+    await wait_for(lambda: cache.cached('heady_oracle')['health'] == 'healthy')
+    print(f"unrelated churn: 500 events on other containers -> {cache.events_applied - applied - 1} applied, "
+          f"{cache.stats()['cached']} containers cached")
+
+    await cache.stop()
+    await executor.shutdown()
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
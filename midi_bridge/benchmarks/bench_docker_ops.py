@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+HEADY_BRAND:BEGIN
+╔══════════════════════════════════════════════════════════════════╗
+║  HeadySync Bench - Docker Operations vs. Event Loop Responsiveness║
+╚══════════════════════════════════════════════════════════════════╝
+HEADY_BRAND:END
+
+Runs a burst of container restarts against the fake Docker Engine API (on
+its own thread) while a heartbeat coroutine measures event-loop stalls, as
+MIDI dispatch and the HTTP endpoints would experience them:
+
+* ``inline``:   the previous behaviour, SDK calls made directly in the coroutine
+* ``executor``: DockerExecutor (thread pool, per-container serialization)
+
+Then checks cancellation of a queued and a running operation.
+
+Run from midi_bridge/:  python -m benchmarks.bench_docker_ops [--restarts N]
+"""
+
+import argparse
+import asyncio
+import time
+from typing import Dict, List
+
+import docker
+
+from benchmarks.fake_docker import HEADY_CONTAINERS, start_in_thread
+from src.docker_ops import DockerExecutor, restart_container
+
+
+async def heartbeat(stop: asyncio.Event, interval: float, lags: List[float]):
+    while not stop.is_set():
+        expected = time.perf_counter() + interval
+        await asyncio.sleep(interval)
+        lags.append(max(0.0, time.perf_counter() - expected))
+
+
+async def run_mode(mode: str, url: str, targets: List[str]) -> Dict:
+    lags: List[float] = []
+    stop = asyncio.Event()
+    beat = asyncio.create_task(heartbeat(stop, 0.005, lags))
+    await asyncio.sleep(0.05)
+    started = time.perf_counter()
+
+    if mode == 'inline':
+        client = docker.DockerClient(base_url=url, timeout=60)
+
+        async def restart(name):
+            restart_container(client, name)
+
+        await asyncio.gather(*(restart(name) for name in targets))
+    else:
+        executor = DockerExecutor(max_workers=4, client_factory=lambda timeout: docker.DockerClient(
+            base_url=url, timeout=timeout))
+        ops = [executor.submit('restart', name, restart_container, name) for name in targets]
+        await asyncio.gather(*(executor.wait(op) for op in ops))
+        await executor.shutdown()
+
+    elapsed = time.perf_counter() - started
+    stop.set()
+    await beat
+    lags.sort()
+    return {
+        'elapsed': elapsed,
+        'max_stall_ms': lags[-1] * 1000,
+        'p99_stall_ms': lags[min(len(lags) - 1, int(len(lags) * 0.99))] * 1000,
+        'beats': len(lags),
+    }
+
+
+async def check_cancellation(url: str, op_latency: float):
+    executor = DockerExecutor(client_factory=lambda timeout: docker.DockerClient(base_url=url, timeout=timeout))
+    running = executor.submit('restart', 'heady_oracle', restart_container, 'heady_oracle')
+    queued = executor.submit('restart', 'heady_oracle', restart_container, 'heady_oracle')
+    follow_up = executor.submit('restart', 'heady_oracle', restart_container, 'heady_oracle')
+    await asyncio.sleep(op_latency / 4)
+    executor.cancel(queued.id)
+    executor.cancel(running.id)
+    await asyncio.gather(running.task, queued.task, follow_up.task, return_exceptions=True)
+    for op in (running, queued, follow_up):
+        print(f"  {op.id}: {op.state:<10} {op.error or ''}")
+    # The abandoned restart kept the container locked, so the follow-up started after it returned
+    print(f"  follow-up started {follow_up.started_at - running.started_at:.2f}s after the cancelled restart")
+    await executor.shutdown()
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--restarts', type=int, default=10, help='restarts, spread over the Heady containers')
+    parser.add_argument('--op-latency', type=float, default=0.5, help='fake daemon seconds per restart')
+    args = parser.parse_args()
+
+    fake = start_in_thread(op_latency=args.op_latency)
+    targets = [HEADY_CONTAINERS[i % len(HEADY_CONTAINERS)] for i in range(args.restarts)]
+
+    print(f"{args.restarts} restarts over {len(HEADY_CONTAINERS)} containers, {args.op_latency}s each")
+    print(f"{'mode':<10} {'wall s':>7} {'max stall ms':>13} {'p99 stall ms':>13}")
+    for mode in ('inline', 'executor'):
+        fake.max_in_flight.clear()
+        result = await run_mode(mode, fake.url, targets)
+        print(f"{mode:<10} {result['elapsed']:>7.2f} {result['max_stall_ms']:>13.1f} "
+              f"{result['p99_stall_ms']:>13.1f}   max concurrent per container: "
+              f"{max(fake.max_in_flight.values())}")
+
+    print("cancellation:")
+    await check_cancellation(fake.url, args.op_latency)
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
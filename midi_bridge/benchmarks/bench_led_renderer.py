@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+HEADY_BRAND:BEGIN
+╔══════════════════════════════════════════════════════════════════╗
+║  HeadySync Bench - LED Renderer                                   ║
+╚══════════════════════════════════════════════════════════════════╝
+HEADY_BRAND:END
+
+Drives LedRenderer into a recording output port (no MIDI hardware needed):
+
+* feedback flash: how long a pad actually stays lit, previous inline
+  note_on/note_off vs. the scheduled revert
+* status storm: containers flapping and pads hammered for a second; what
+  reaches the wire vs. what was asked for, the peak message rate, and
+  whether the device ends up matching the model
+* input-path cost of one feedback call
+
+Run from midi_bridge/:  python -m benchmarks.bench_led_renderer [--changes N] [--rate R]
+"""
+
+import argparse
+import asyncio
+import random
+import statistics
+import time
+from typing import Dict, List, Tuple
+
+import mido
+
+from src.led_renderer import STATUS_LEDS, Led, LedRenderer
+
+PADS = {'heady_mqtt': 40, 'heady_vault': 41, 'heady_oracle': 42, 'heady_viz': 43, 'heady_auditor': 44}
+
+
+class RecordingPort:
+    """Output port that timestamps what it is sent and tracks the lit state"""
+
+    def __init__(self, send_cost: float = 0.0):
+        self.send_cost = send_cost
+        self.sent: List[Tuple[float, mido.Message]] = []
+        self.lit: Dict[int, Led] = {}
+
+    def send(self, msg):
+        if self.send_cost:
+            time.sleep(self.send_cost)
+        self.sent.append((time.perf_counter(), msg))
+        if msg.type == 'note_on' and msg.velocity:
+            self.lit[msg.note] = Led(msg.velocity, msg.channel)
+        else:
+            self.lit.pop(msg.note, None)
+
+
+def lit_time(port: RecordingPort, note: int) -> float:
+    on = next(t for t, m in port.sent if m.note == note and m.type == 'note_on')
+    off = next(t for t, m in port.sent if m.note == note and m.type == 'note_off')
+    return off - on
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--changes', type=int, default=5000, help='status changes and pad hits in the storm')
+    parser.add_argument('--rate', type=float, default=500, help='LED message budget per second')
+    args = parser.parse_args()
+
+    # Previous behaviour: note_on, a detached sleep that delays nothing, note_off
+    port = RecordingPort()
+    port.send(mido.Message('note_on', note=60, velocity=100))
+    asyncio.create_task(asyncio.sleep(0.1))
+    port.send(mido.Message('note_off', note=60))
+    print(f"feedback lit for:  inline {lit_time(port, 60) * 1e6:8.1f} us", end='')
+
+    port = RecordingPort()
+    leds = LedRenderer(max_rate=args.rate)
+    leds.attach(port)
+    leds.start()
+    leds.flash(60, 120)
+    await asyncio.sleep(0.3)
+    print(f"   renderer {lit_time(port, 60) * 1000:6.1f} ms")
+
+    # Storm: random status flaps and pad hits over one second
+    port = RecordingPort(send_cost=0.0002)
+    leds.attach(port)
+    rng = random.Random(7)
+    statuses = list(STATUS_LEDS)
+    hit_costs: List[float] = []
+    started = time.perf_counter()
+    for i in range(args.changes):
+        if i % 4 == 0:
+            t = time.perf_counter()
+            leds.flash(rng.randrange(36, 52), rng.randrange(20, 128))
+            hit_costs.append(time.perf_counter() - t)
+        else:
+            leds.set(PADS[rng.choice(list(PADS))], STATUS_LEDS[rng.choice(statuses)])
+        if i % 50 == 0:
+            await asyncio.sleep(1.0 / (args.changes / 50))
+    await asyncio.sleep(0.5)
+    elapsed = time.perf_counter() - started
+
+    stamps = [t for t, _ in port.sent]
+    peak = max(sum(1 for s in stamps if start <= s < start + 0.1) for start in stamps) * 10 if stamps else 0
+    wanted = {note: led for note in range(36, 52) if (led := leds.wanted(note)).color}
+    stats = leds.stats()
+    print(f"storm:             {args.changes} changes -> {len(port.sent)} MIDI messages in {elapsed:.2f} s "
+          f"(coalesced {stats['coalesced']}, deferred {stats['deferred']})")
+    print(f"peak output rate:  {peak:.0f} msg/s (budget {args.rate:.0f}); "
+          f"device matches model: {port.lit == wanted}")
+    print(f"feedback call:     median {statistics.median(hit_costs) * 1e6:.1f} us, "
+          f"max {max(hit_costs) * 1e6:.1f} us on the input path")
+
+    await leds.stop()
+    print(f"shutdown:          {len(port.lit)} pads left lit")
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
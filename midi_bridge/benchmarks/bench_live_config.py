@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+HEADY_BRAND:BEGIN
+╔══════════════════════════════════════════════════════════════════╗
+║  HeadySync Bench - Live Config and Blue/Green Swap                ║
+╚══════════════════════════════════════════════════════════════════╝
+HEADY_BRAND:END
+
+Measures how a knob change reaches the oracle:
+
+* live: ``PUT /config`` through ConfigChannel to a stand-in oracle
+  (answers 200 for live keys, 409 for restart-only ones), per-tick latency
+* swap: a restart-only key recreates ``heady_oracle`` blue/green on the fake
+  Docker API, sampling how many healthy containers answer to the name
+  throughout, against stop-then-recreate
+* a replacement that crashes on boot must leave the running container alone
+
+Run from midi_bridge/:  python -m benchmarks.bench_live_config [--ticks N] [--boot-seconds S]
+"""
+
+import argparse
+import asyncio
+import socket
+import statistics
+import threading
+import time
+from typing import Dict, List
+
+import docker
+import uvicorn
+from fastapi import Body, FastAPI
+from fastapi.responses import JSONResponse
+
+from benchmarks.fake_docker import start_in_thread
+from src.config_channel import ConfigChannel, RestartRequired
+from src.docker_ops import DockerExecutor
+from src.rollout import blue_green_swap
+
+LIVE_KEYS = {'AI_TEMPERATURE', 'VERIFICATION_THRESHOLD', 'HEADY_BRAIN_RATE_LIMIT', 'BACKOFF_BASE_DELAY_MS',
+             'MAINTENANCE_MODE'}
+ALTERNATES = {'ORACLE_SPOOL_DIR': ('/app/spool', '/app/spool/alt')}
+
+
+def start_oracle() -> str:
+    """Serve a stand-in oracle /config on a free port; returns its URL"""
+    oracle = FastAPI()
+    settings: Dict[str, str] = {'AI_TEMPERATURE': '0.7', 'VERIFICATION_THRESHOLD': '0.95'}
+
+    @oracle.put("/config")
+    async def put_config(updates: Dict[str, str] = Body(...)):
+        unknown = sorted(set(updates) - LIVE_KEYS)
+        if unknown:
+            return JSONResponse(status_code=409, content={"restart_required": unknown})
+        settings.update(updates)
+        return {"applied": updates, "version": len(settings)}
+
+    @oracle.get("/config")
+    async def get_config():
+        return {"settings": {key: {"value": value} for key, value in settings.items()}}
+
+    with socket.socket() as probe:
+        probe.bind(('127.0.0.1', 0))
+        port = probe.getsockname()[1]
+    server = uvicorn.Server(uvicorn.Config(oracle, host='127.0.0.1', port=port, log_level='warning'))
+    threading.Thread(target=server.run, name='fake-oracle', daemon=True).start()
+    while not server.started:
+        time.sleep(0.01)
+    return f"http://127.0.0.1:{port}"
+
+
+async def sample_serving(fake, alias: str, stop: asyncio.Event, samples: List[int]):
+    while not stop.is_set():
+        samples.append(fake.serving(alias))
+        await asyncio.sleep(0.002)
+
+
+def stop_then_recreate(client, name: str, env: Dict[str, str], timeout: float):
+    """The naive recreation: the old container goes away before the new one is up"""
+    blue = client.api.inspect_container(name)
+    client.api.stop(blue['Id'])
+    client.api.remove_container(blue['Id'])
+    created = client.api.create_container(
+        image=blue['Config']['Image'], name=name,
+        environment=[f"{key}={value}" for key, value in env.items()],
+        networking_config=client.api.create_networking_config(
+            {'heady_field_net': client.api.create_endpoint_config(aliases=[name])})
+    )['Id']
+    client.api.start(created)
+    deadline = time.monotonic() + timeout
+    while client.api.inspect_container(created)['State']['Health']['Status'] != 'healthy':
+        if time.monotonic() > deadline:
+            raise TimeoutError(name)
+        time.sleep(0.05)
+
+
+async def measured(fake, coro) -> Dict:
+    samples: List[int] = []
+    stop = asyncio.Event()
+    sampler = asyncio.create_task(sample_serving(fake, 'heady_oracle', stop, samples))
+    started = time.perf_counter()
+    error = None
+    try:
+        await coro
+    except Exception as e:
+        error = e
+    elapsed = time.perf_counter() - started
+    stop.set()
+    await sampler
+    return {'seconds': elapsed, 'min_serving': min(samples), 'dark_ms': samples.count(0) * 2, 'error': error}
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--ticks', type=int, default=200, help='live knob updates to time')
+    parser.add_argument('--boot-seconds', type=float, default=1.0, help='time for a new container to turn healthy')
+    args = parser.parse_args()
+
+    channel = ConfigChannel({'heady_oracle': start_oracle()})
+    latencies = []
+    for tick in range(args.ticks):
+        started = time.perf_counter()
+        await channel.update('heady_oracle', {'AI_TEMPERATURE': f"{0.1 + (tick % 128) / 127 * 1.9:.2f}"})
+        latencies.append((time.perf_counter() - started) * 1000)
+    latencies.sort()
+    print(f"live knob tick:      p50 {statistics.median(latencies):6.2f} ms   "
+          f"p99 {latencies[int(len(latencies) * 0.99) - 1]:6.2f} ms   max {latencies[-1]:6.2f} ms")
+
+    fake = start_in_thread(boot_latency=args.boot_seconds)
+    fake.containers['heady_oracle']['Config']['Env'] = ['ORACLE_SPOOL_DIR=/app/spool', 'ORACLE_WORKERS=1']
+    executor = DockerExecutor(client_factory=lambda timeout: docker.DockerClient(base_url=fake.url, timeout=timeout))
+
+    try:
+        await channel.update('heady_oracle', {'ORACLE_WORKERS': '4'})
+    except RestartRequired as e:
+        print(f"restart-only key:    {e}")
+    env = {**await channel.current('heady_oracle'), 'ORACLE_WORKERS': '4'}
+    swap = await measured(fake, executor.run('swap', 'heady_oracle', blue_green_swap, 'heady_oracle', env,
+                                             None, ALTERNATES, 10.0, 1))
+    current = fake.containers['heady_oracle']['Config']['Env']
+    print(f"blue/green swap:     {swap['seconds']:6.2f} s   min serving {swap['min_serving']}   "
+          f"dark {swap['dark_ms']} ms   env {sorted(e for e in current if 'ORACLE' in e)}")
+
+    naive = await measured(fake, executor.call(stop_then_recreate, 'heady_oracle', env, 10.0))
+    print(f"stop then recreate:  {naive['seconds']:6.2f} s   min serving {naive['min_serving']}   "
+          f"dark {naive['dark_ms']} ms")
+
+    fake.boot_outcome = 'exit'
+    before = fake.containers['heady_oracle']['Id']
+    failed = await measured(fake, executor.run('swap', 'heady_oracle', blue_green_swap, 'heady_oracle', env,
+                                               None, ALTERNATES, 10.0, 1))
+    print(f"crashing green:      {failed['error']}; min serving {failed['min_serving']}, "
+          f"blue kept: {fake.containers['heady_oracle']['Id'] == before}, "
+          f"green removed: {'heady_oracle_green' not in fake.containers}")
+
+    await channel.close()
+    await executor.shutdown()
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
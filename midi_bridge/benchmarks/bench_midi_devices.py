@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+HEADY_BRAND:BEGIN
+╔══════════════════════════════════════════════════════════════════╗
+║  HeadySync Bench - Multi-Device MIDI Input                        ║
+╚══════════════════════════════════════════════════════════════════╝
+HEADY_BRAND:END
+
+* dispatch lookup: the previous path (note number -> pitch name -> action_map
+  dict, which never matched drum names) vs. the compiled profile tables,
+  over a mixed keyboard and drum stream
+* devices (needs rtmidi virtual ports, ALSA or CoreMIDI): a keyboard and a
+  drum kit play concurrently into one merged stream, each dispatched by its
+  own profile; a third device is plugged in and unplugged mid-run and must
+  be picked up and dropped by the hot-plug scan
+
+Run from midi_bridge/:  python -m benchmarks.bench_midi_devices [--messages N]
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import threading
+import time
+from typing import Dict, List
+
+import mido
+
+from src.midi_devices import GM_DRUMS, DeviceProfile, MidiDeviceManager, load_profiles
+from src.midi_input import MidiInputStream, note_number_to_name
+
+PROFILES = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'config', 'midi_profiles.json')
+ACTIONS = ['deploy_production', 'deploy_staging', 'restart_oracle', 'restart_grafana', 'scale_oracle',
+           'backup_data', 'system_health', 'emergency_stop', 'start_all_services', 'restart_all_services',
+           'scale_up_services', 'scale_down_services', 'rotate_logs', 'toggle_maintenance_mode',
+           'generate_report', 'adjust_ai_temperature', 'adjust_verification_threshold', 'adjust_backoff_rate']
+
+
+def make_action(name: str, hits: Dict[str, int]):
+    def action(*args):
+        hits[name] = hits.get(name, 0) + 1
+    action.__name__ = name
+    return action
+
+
+def lookup_bench(messages: int):
+    hits: Dict[str, int] = {}
+    actions = {name: make_action(name, hits) for name in ACTIONS}
+    keyboard, drums = load_profiles(PROFILES, actions)
+    # The previous action_map: pitch names for the keyboard plus drum names no note ever resolved to
+    old_map = {**{note_number_to_name(note): handler for note, handler in enumerate(keyboard.notes) if handler},
+               **dict.fromkeys(GM_DRUMS)}
+
+    rng = random.Random(3)
+    drum_notes = [note for notes in GM_DRUMS.values() for note in notes]
+    stream = [(drums, rng.choice(drum_notes)) if rng.random() < 0.5 else (keyboard, rng.randrange(48, 84))
+              for _ in range(messages)]
+
+    started = time.perf_counter()
+    old_matched = sum(1 for _, note in stream if note_number_to_name(note) in old_map)
+    old = time.perf_counter() - started
+    started = time.perf_counter()
+    new_matched = sum(1 for profile, note in stream if profile.notes[note] is not None)
+    new = time.perf_counter() - started
+    drum_hits = sum(1 for profile, note in stream if profile is drums)
+    print(f"lookup, old path:  {old / messages * 1e9:7.1f} ns/msg, matched {old_matched}/{messages} "
+          f"(drum hits matched: 0 of {drum_hits})")
+    print(f"lookup, compiled:  {new / messages * 1e9:7.1f} ns/msg, matched {new_matched}/{messages}")
+    return actions
+
+
+def play(port, notes: List[int], channel: int, interval: float):
+    for note in notes:
+        port.send(mido.Message('note_on', note=note, velocity=100, channel=channel))
+        time.sleep(interval)
+
+
+async def device_bench(actions, messages: int):
+    keyboard_out = mido.open_output('Heady Launchkey Bench', virtual=True)
+    drums_out = mido.open_output('Heady Pyle Drum Bench', virtual=True)
+    stream = MidiInputStream(max_queue=messages * 4)
+    manager = MidiDeviceManager(stream, DeviceProfile('default', {}, {}), keywords=['heady'], actions=actions,
+                                profiles_path=PROFILES, scan_interval=0.2)
+    await manager.scan()
+    manager.start()
+    print(f"devices: {manager.stats()['devices']}")
+
+    dispatched: Dict[str, int] = {}
+    order: List[float] = []
+
+    async def consume():
+        while True:
+            msg, received_at, port_name = await stream.get()
+            order.append(received_at)
+            profile = manager.devices.get(port_name, manager.fallback)
+            if profile.channel is not None and msg.channel != profile.channel:
+                continue
+            handler = profile.notes[msg.note]
+            if handler is not None:
+                dispatched[profile.name] = dispatched.get(profile.name, 0) + 1
+
+    consumer = asyncio.create_task(consume())
+    keys = [60, 62, 64, 71] * (messages // 8)
+    drums = [36, 38, 42, 49] * (messages // 8)
+    players = [threading.Thread(target=play, args=(keyboard_out, keys, 0, 0.002)),
+               threading.Thread(target=play, args=(drums_out, drums, 9, 0.002))]
+    for player in players:
+        player.start()
+
+    await asyncio.sleep(0.3)
+    extra = mido.open_output('Heady Extra Pad Bench', virtual=True)
+    await asyncio.sleep(0.5)
+    plugged = any('Extra' in name for name in manager.devices)
+    extra.close()
+    await asyncio.sleep(0.5)
+    unplugged = not any('Extra' in name for name in manager.devices)
+
+    while any(player.is_alive() for player in players):
+        await asyncio.sleep(0.05)
+    await asyncio.sleep(0.2)
+    consumer.cancel()
+    print(f"merged stream: {len(order)} messages, in arrival order: {order == sorted(order)}; "
+          f"dispatched by profile: {dispatched}")
+    print(f"hot-plug: connected {plugged}, disconnected {unplugged} "
+          f"(scans {manager.scans}, connects {manager.connects}, disconnects {manager.disconnects})")
+    await manager.stop()
+    keyboard_out.close()
+    drums_out.close()
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--messages', type=int, default=200000, help='messages for the lookup bench')
+    args = parser.parse_args()
+
+    actions = lookup_bench(args.messages)
+    try:
+        await device_bench(actions, 800)
+    except (ImportError, OSError, RuntimeError) as e:
+        print(f"devices: skipped, no MIDI backend with virtual ports ({e})")
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
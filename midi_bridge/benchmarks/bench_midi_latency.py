@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+HEADY_BRAND:BEGIN
+╔══════════════════════════════════════════════════════════════════╗
+║  HeadySync Bench - MIDI Input Latency & Idle CPU                  ║
+╚══════════════════════════════════════════════════════════════════╝
+HEADY_BRAND:END
+
+Opens a virtual rtmidi output port, connects the bridge's input path to it,
+and plays notes into it from a separate thread. For each input mode it
+reports send-to-dispatch latency (p50/p99/max) and the CPU time the process
+burns while no MIDI is arriving:
+
+* ``callback``: MidiInputStream (port callback -> call_soon_threadsafe)
+* ``polling``:  the previous loop of iter_pending() + asyncio.sleep(0.01)
+
+Needs the rtmidi backend with ALSA (Linux) or CoreMIDI (macOS) virtual ports.
+
+Run from midi_bridge/:  python -m benchmarks.bench_midi_latency [--notes N]
+"""
+
+import argparse
+import asyncio
+import threading
+import time
+from typing import List
+
+import mido
+
+from src.midi_input import MidiInputStream
+
+PORT_NAME = 'heady-latency-bench'
+
+
+def play(output, notes: int, interval: float, sent: List[float]):
+    """Send ``notes`` note_on messages ``interval`` seconds apart, recording send times"""
+    for i in range(notes):
+        sent.append(time.perf_counter())
+        output.send(mido.Message('note_on', note=i % 128, velocity=100))
+        time.sleep(interval)
+
+
+async def receive_callback(port_name: str, notes: int) -> List[float]:
+    stream = MidiInputStream()
+    stream.open(port_name)
+    try:
+        received = []
+        for _ in range(notes):
+            await stream.get()
+            received.append(time.perf_counter())
+        return received
+    finally:
+        stream.close()
+
+
+async def receive_polling(port_name: str, notes: int) -> List[float]:
+    port = mido.open_input(port_name)
+    try:
+        received = []
+        while len(received) < notes:
+            for _ in port.iter_pending():
+                received.append(time.perf_counter())
+            await asyncio.sleep(0.01)
+        return received
+    finally:
+        port.close()
+
+
+async def idle_cpu(mode: str, port_name: str, seconds: float) -> float:
+    """CPU seconds used per wall second while waiting on an idle port"""
+    receiver = receive_callback if mode == 'callback' else receive_polling
+    task = asyncio.create_task(receiver(port_name, 1))
+    await asyncio.sleep(0.2)
+    started_cpu, started = time.process_time(), time.perf_counter()
+    await asyncio.sleep(seconds)
+    used = (time.process_time() - started_cpu) / (time.perf_counter() - started)
+    task.cancel()
+    await asyncio.gather(task, return_exceptions=True)
+    return used
+
+
+async def measure(mode: str, output, port_name: str, notes: int, interval: float) -> List[float]:
+    receiver = receive_callback if mode == 'callback' else receive_polling
+    task = asyncio.create_task(receiver(port_name, notes))
+    await asyncio.sleep(0.2)  # let the input port connect
+    sent: List[float] = []
+    player = threading.Thread(target=play, args=(output, notes, interval, sent))
+    player.start()
+    received = await task
+    player.join()
+    return [(r - s) * 1000 for s, r in zip(sent, received)]
+
+
+def percentile(values: List[float], q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * q))]
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--notes', type=int, default=500)
+    parser.add_argument('--interval', type=float, default=0.013, help='seconds between notes')
+    parser.add_argument('--idle-seconds', type=float, default=5.0)
+    args = parser.parse_args()
+
+    output = mido.open_output(PORT_NAME, virtual=True)
+    port_name = next(name for name in mido.get_input_names() if PORT_NAME in name)
+    try:
+        print(f"{'mode':<10} {'p50 ms':>8} {'p99 ms':>8} {'max ms':>8} {'idle CPU':>9}")
+        for mode in ('polling', 'callback'):
+            latencies = await measure(mode, output, port_name, args.notes, args.interval)
+            cpu = await idle_cpu(mode, port_name, args.idle_seconds)
+            print(f"{mode:<10} {percentile(latencies, 0.5):>8.3f} {percentile(latencies, 0.99):>8.3f} "
+                  f"{max(latencies):>8.3f} {cpu:>8.2%}")
+    finally:
+        output.close()
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
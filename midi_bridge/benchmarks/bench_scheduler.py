@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+HEADY_BRAND:BEGIN
+╔══════════════════════════════════════════════════════════════════╗
+║  HeadySync Bench - Action Scheduler                               ║
+╚══════════════════════════════════════════════════════════════════╝
+HEADY_BRAND:END
+
+Replays typical performance gestures against the ActionScheduler with
+stand-in actions that sleep for ``--action-latency`` seconds, and counts how
+many executions reach the actions compared with the previous inline dispatch
+(one execution per MIDI message):
+
+* snare roll:   ``--hits`` pad hits 50 ms apart on restart_all_services
+* knob sweep:   CC1 swept 0 -> 127 over one second
+* emergency:    crash cymbal during a deploy, with a queue of pending work
+
+Run from midi_bridge/:  python -m benchmarks.bench_scheduler
+"""
+
+import argparse
+import asyncio
+import time
+from typing import List
+
+from src.scheduler import ActionScheduler
+
+
+class StandInActions:
+    def __init__(self, latency: float):
+        self.latency = latency
+        self.calls: List[tuple] = []
+
+    async def _act(self, name: str, *args):
+        self.calls.append((name, args, time.perf_counter()))
+        await asyncio.sleep(self.latency)
+
+    async def restart_all_services(self):
+        await self._act('restart_all_services')
+
+    async def adjust_ai_temperature(self, value: int):
+        await self._act('adjust_ai_temperature', value)
+
+    async def deploy_production(self):
+        await self._act('deploy_production')
+        await asyncio.sleep(5)
+
+    async def rotate_logs(self):
+        await self._act('rotate_logs')
+
+    async def emergency_stop(self):
+        await self._act('emergency_stop')
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--hits', type=int, default=3)
+    parser.add_argument('--action-latency', type=float, default=0.2)
+    args = parser.parse_args()
+
+    actions = StandInActions(args.action_latency)
+    scheduler = ActionScheduler(debounce=2.0, cc_interval=0.05)
+
+    for _ in range(args.hits):
+        scheduler.submit(actions.restart_all_services)
+        await asyncio.sleep(0.05)
+    for value in range(128):
+        scheduler.submit(actions.adjust_ai_temperature, value, continuous=True)
+        await asyncio.sleep(1 / 128)
+    await asyncio.sleep(1.0)
+
+    restarts = [c for c in actions.calls if c[0] == 'restart_all_services']
+    knob = [c for c in actions.calls if c[0] == 'adjust_ai_temperature']
+    print(f"snare roll: {args.hits} hits -> {len(restarts)} restart_all_services (inline: {args.hits})")
+    print(f"knob sweep: 128 CC messages -> {len(knob)} adjust_ai_temperature (inline: 128), "
+          f"final value applied: {knob[-1][1][0]}")
+
+    actions.calls.clear()
+    scheduler.submit(actions.deploy_production)
+    await asyncio.sleep(0.05)
+    scheduler.submit(actions.rotate_logs)
+    scheduler.submit(actions.adjust_ai_temperature, 10, continuous=True)
+    crash = time.perf_counter()
+    scheduler.submit(actions.emergency_stop)
+    await asyncio.sleep(0.5)
+    stop_at = next(c[2] for c in actions.calls if c[0] == 'emergency_stop')
+    print(f"emergency:  started {(stop_at - crash) * 1000:.2f} ms after the crash cymbal; "
+          f"preempted {scheduler.preempted} actions; ran after it: "
+          f"{[c[0] for c in actions.calls if c[2] > stop_at] or 'nothing'}")
+
+    stats = scheduler.stats()
+    print(f"stats: executed={stats['executed']} debounced={stats['debounced']} coalesced={stats['coalesced']} "
+          f"queue_wait={stats['queue_wait']}")
+    await scheduler.shutdown()
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+HEADY_BRAND:BEGIN
+╔══════════════════════════════════════════════════════════════════╗
+║  HeadySync Bench - Stand-in docker-compose CLI                    ║
+╚══════════════════════════════════════════════════════════════════╝
+HEADY_BRAND:END
+
+Behaves like ``docker-compose`` for the subcommands the bridge runs,
+printing progress lines and sleeping instead of touching Docker. Use it as
+``COMPOSE_COMMAND="python /path/to/fake_compose.py"``.
+
+* ``config --services``   the Heady services
+* ``pull [service...]``   ``FAKE_COMPOSE_PULL_SECONDS`` (default 1.0) per
+  service, one after another, as a single compose process does
+* ``up``, ``down``, ``restart``, ``ps``, ``logs``, ``exec``  short output
+
+``FAKE_COMPOSE_HANG=1`` makes every command hang until killed.
+"""
+
+import os
+import sys
+import time
+
+SERVICES = ['mosquitto', 'influxdb', 'heady_oracle', 'grafana', 'heady_auditor', 'heady_midi_bridge']
+
+
+def say(line: str, stream=sys.stdout):
+    print(line, file=stream, flush=True)
+
+
+def main(argv):
+    # Global options: -f FILE, -p NAME, --project-directory DIR
+    while argv and argv[0] in ('-f', '-p', '--project-directory'):
+        argv = argv[2:]
+    if not argv:
+        say("usage: fake_compose <command>", sys.stderr)
+        return 1
+    command, args = argv[0], [a for a in argv[1:] if not a.startswith('-')]
+
+    if os.getenv('FAKE_COMPOSE_HANG'):
+        say(f"{command}: hanging", sys.stderr)
+        while True:
+            time.sleep(1)
+
+    if command == 'config':
+        for service in SERVICES:
+            say(service)
+    elif command == 'pull':
+        seconds = float(os.getenv('FAKE_COMPOSE_PULL_SECONDS', '1.0'))
+        for service in args or SERVICES:
+            say(f"Pulling {service} ...", sys.stderr)
+            for step in range(1, 5):
+                time.sleep(seconds / 4)
+                say(f"{service}: layer {step}/4 downloaded", sys.stderr)
+            say(f"Pulling {service} ... done", sys.stderr)
+    elif command in ('up', 'down', 'restart'):
+        verb = {'up': 'Starting', 'down': 'Stopping', 'restart': 'Restarting'}[command]
+        for service in args or SERVICES:
+            time.sleep(0.02)
+            say(f"{verb} {service} ... done", sys.stderr)
+    elif command == 'ps':
+        say("Name            Command   State   Ports")
+        for service in SERVICES:
+            say(f"{service:<15} run       Up")
+    elif command == 'logs':
+        for i in range(100):
+            say(f"2026-01-01T00:00:{i % 60:02d}Z heady_oracle | message {i}")
+    elif command == 'exec':
+        say(f"exec {' '.join(args)}: ok")
+    else:
+        say(f"No such command: {command}", sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
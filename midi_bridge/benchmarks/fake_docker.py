@@ -0,0 +1,317 @@
+#!/usr/bin/env python3
+"""
+HEADY_BRAND:BEGIN
+╔══════════════════════════════════════════════════════════════════╗
+║  HeadySync Bench - Stand-in Docker Engine API                     ║
+╚══════════════════════════════════════════════════════════════════╝
+HEADY_BRAND:END
+
+Keep-alive HTTP/1.1 server on asyncio streams that speaks enough of the
+Docker Engine API for the bridge's SDK calls. Point the SDK at it with
+``DOCKER_HOST=tcp://127.0.0.1:<port>``.
+
+* ``GET /version``, ``GET /_ping``                     version negotiation
+* ``GET /containers/{name}/json``                     inspect, taking
+  ``inspect_latency`` seconds
+* ``GET /containers/{name}/stats``                    one stats read with the
+  CPU and memory set by ``set_usage`` (idle by default)
+* ``POST /containers/{name}/{start|stop|restart}``    lifecycle, each taking
+  ``op_latency`` seconds
+* ``POST /containers/create``, ``POST /containers/{name}/rename``,
+  ``DELETE /containers/{name}``, ``POST /networks/{net}/connect``
+  recreation; a created container reports ``starting`` health for
+  ``boot_latency`` seconds after start, then ``healthy`` (or exits when
+  ``boot_outcome`` is ``'exit'``)
+* ``GET /events``                                     chunked stream of container
+  events for lifecycle calls and ``set_state`` changes, honouring a
+  ``container`` filter (name or id)
+
+Routes may carry an API version prefix (``/v1.41/...``). Unknown containers
+answer 404 like the real daemon. ``start_in_thread`` serves it from its own
+loop so a bench loop blocked in an SDK call cannot stall it; use
+``fake.call_threadsafe(fn, *args)`` to act on it from the bench thread.
+"""
+
+import asyncio
+import hashlib
+import itertools
+import json
+import re
+import threading
+import time
+from typing import Dict, Iterable, List, Optional
+from urllib.parse import parse_qs
+
+API_VERSION = '1.41'
+VERSION_PREFIX = re.compile(r'^/v\d+\.\d+')
+HEADY_CONTAINERS = ('heady_mqtt', 'heady_vault', 'heady_oracle', 'heady_viz', 'heady_auditor')
+
+
+class FakeDockerAPI:
+    """In-memory containers behind the Docker Engine API routes the bridge uses"""
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 0,
+                 containers: Iterable[str] = HEADY_CONTAINERS, op_latency: float = 0.0,
+                 inspect_latency: float = 0.0, boot_latency: float = 0.0):
+        self.host = host
+        self.port = port
+        self.op_latency = op_latency
+        self.inspect_latency = inspect_latency
+        self.boot_latency = boot_latency
+        self.boot_outcome = 'healthy'
+        self._ids = itertools.count()
+        self.containers: Dict[str, Dict] = {name: self._container(name) for name in containers}
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._subscribers: List[asyncio.Queue] = []
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+        self.usage: Dict[str, Dict[str, float]] = {}
+        self.requests: Dict[str, int] = {}
+        self.in_flight: Dict[str, int] = {}
+        self.max_in_flight: Dict[str, int] = {}
+
+    def _container(self, name: str, config: Optional[Dict] = None) -> Dict:
+        config = config or {'Image': f"heady/{name}:latest", 'Labels': {}, 'Env': [],
+                            'HostConfig': {'NetworkMode': 'heady_field_net'},
+                            'NetworkingConfig': {'EndpointsConfig': {'heady_field_net': {'Aliases': [name]}}}}
+        endpoints = (config.get('NetworkingConfig') or {}).get('EndpointsConfig') or {}
+        return {
+            'Id': hashlib.sha256(f"{name}-{next(self._ids)}".encode()).hexdigest(),
+            'Name': f"/{name}",
+            'State': {'Status': 'running', 'Running': True, 'Health': {'Status': 'healthy'}},
+            'Config': {key: value for key, value in config.items() if key not in ('HostConfig', 'NetworkingConfig')},
+            'HostConfig': config.get('HostConfig') or {},
+            'NetworkSettings': {'Networks': {net: {'Aliases': list(ep.get('Aliases') or [])}
+                                             for net, ep in endpoints.items()}},
+            'Mounts': [],
+        }
+
+    def serving(self, alias: str) -> int:
+        """Running, healthy containers answering to ``alias`` on any network"""
+        return sum(1 for c in list(self.containers.values())
+                   if c['State']['Running'] and c['State']['Health']['Status'] == 'healthy'
+                   and any(alias in net['Aliases'] for net in c['NetworkSettings']['Networks'].values()))
+
+    async def start(self) -> int:
+        self._loop = asyncio.get_running_loop()
+        self._server = await asyncio.start_server(self._client, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self.port
+
+    async def stop(self):
+        if self._server:
+            self._server.close()
+            await self._server.wait_closed()
+
+    def call_threadsafe(self, fn, *args):
+        """Run ``fn(*args)`` on the server's loop (e.g. ``set_state`` from another thread)"""
+        self._loop.call_soon_threadsafe(fn, *args)
+
+    @property
+    def url(self) -> str:
+        return f"tcp://{self.host}:{self.port}"
+
+    def stats(self) -> Dict:
+        return {"requests": dict(self.requests), "max_in_flight": dict(self.max_in_flight)}
+
+    async def _client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                method, target, _ = request_line.decode().split(' ', 2)
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    name, _, value = line.decode().partition(':')
+                    headers[name.strip().lower()] = value.strip()
+                body = await reader.readexactly(int(headers.get('content-length', '0')))
+                path, _, query = target.partition('?')
+                path = VERSION_PREFIX.sub('', path)
+                params = {key: values[-1] for key, values in parse_qs(query).items()}
+                if path == '/events':
+                    await self._stream_events(writer, json.loads(params.get('filters', '{}')))
+                    break
+                status, payload = await self._route(method, path, params, body)
+                out = json.dumps(payload).encode() if payload is not None else b''
+                writer.write(f"HTTP/1.1 {status}\r\nContent-Type: application/json\r\n"
+                             f"Api-Version: {API_VERSION}\r\nContent-Length: {len(out)}\r\n\r\n".encode() + out)
+                await writer.drain()
+        except (asyncio.IncompleteReadError, asyncio.CancelledError, ConnectionError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def _route(self, method: str, path: str, params: Dict[str, str], body: bytes):
+        if path == '/_ping':
+            return '200 OK', 'OK'
+        if path == '/version':
+            return '200 OK', {'Version': '24.0.0', 'ApiVersion': API_VERSION, 'MinAPIVersion': '1.12'}
+
+        parts = path.strip('/').split('/')
+        if method == 'POST' and parts == ['containers', 'create']:
+            name = params.get('name')
+            if name in self.containers:
+                return '409 Conflict', {'message': f"Conflict. The container name \"/{name}\" is already in use"}
+            container = self._container(name, json.loads(body))
+            container['State'].update({'Status': 'created', 'Running': False, 'Health': {'Status': 'starting'}})
+            self.containers[name] = container
+            self.requests['POST create'] = self.requests.get('POST create', 0) + 1
+            return '201 Created', {'Id': container['Id'], 'Warnings': []}
+        if len(parts) == 3 and parts[0] == 'networks' and parts[2] == 'connect' and method == 'POST':
+            request = json.loads(body)
+            container = self._lookup(request['Container'])
+            if container is None:
+                return '404 Not Found', {'message': f"No such container: {request['Container']}"}
+            aliases = (request.get('EndpointConfig') or {}).get('Aliases') or []
+            container['NetworkSettings']['Networks'][parts[1]] = {'Aliases': list(aliases)}
+            return '200 OK', None
+        if len(parts) == 2 and parts[0] == 'containers' and method == 'DELETE':
+            container = self._lookup(parts[1])
+            if container is None:
+                return '404 Not Found', {'message': f"No such container: {parts[1]}"}
+            if container['State']['Running'] and params.get('force') not in ('1', 'true', 'True'):
+                return '409 Conflict', {'message': 'You cannot remove a running container'}
+            container['State'].update({'Status': 'removing', 'Running': False})
+            del self.containers[container['Name'].lstrip('/')]
+            self._emit(container, 'destroy')
+            return '204 No Content', None
+        if len(parts) == 3 and parts[0] == 'containers':
+            _, name, action = parts
+            container = self._lookup(name)
+            if container is None:
+                return '404 Not Found', {'message': f"No such container: {name}"}
+            route = f"{method} {action}"
+            self.requests[route] = self.requests.get(route, 0) + 1
+            if method == 'GET' and action == 'json':
+                if self.inspect_latency:
+                    await asyncio.sleep(self.inspect_latency)
+                return '200 OK', container
+            if method == 'GET' and action == 'stats':
+                return '200 OK', self._stats(container)
+            if method == 'POST' and action in ('start', 'stop', 'restart'):
+                await self._lifecycle(container, action)
+                return '204 No Content', None
+            if method == 'POST' and action == 'rename':
+                if params['name'] in self.containers:
+                    return '409 Conflict', {'message': f"name {params['name']} is already in use"}
+                del self.containers[container['Name'].lstrip('/')]
+                container['Name'] = f"/{params['name']}"
+                self.containers[params['name']] = container
+                self._emit(container, 'rename')
+                return '204 No Content', None
+        return '404 Not Found', {'message': f"page not found: {path}"}
+
+    async def _stream_events(self, writer: asyncio.StreamWriter, filters: Dict):
+        self.requests['GET events'] = self.requests.get('GET events', 0) + 1
+        subscriber: asyncio.Queue = asyncio.Queue()
+        subscriber.names = set(filters.get('container', [])) or None  # like dockerd: name or id
+        self._subscribers.append(subscriber)
+        try:
+            writer.write(b"HTTP/1.1 200 OK\r\nContent-Type: application/json\r\n"
+                         b"Transfer-Encoding: chunked\r\n\r\n")
+            await writer.drain()
+            while True:
+                chunk = json.dumps(await subscriber.get()).encode() + b'\n'
+                writer.write(f"{len(chunk):x}\r\n".encode() + chunk + b"\r\n")
+                await writer.drain()
+        finally:
+            self._subscribers.remove(subscriber)
+
+    def _emit(self, container: Dict, action: str):
+        now = time.time()
+        event = {
+            'Type': 'container', 'Action': action, 'status': action, 'id': container['Id'],
+            'Actor': {'ID': container['Id'], 'Attributes': {'name': container['Name'].lstrip('/')}},
+            'time': int(now), 'timeNano': int(now * 1e9),
+        }
+        for subscriber in self._subscribers:
+            if subscriber.names is None or {container['Id'], container['Name'].lstrip('/')} & subscriber.names:
+                subscriber.put_nowait(event)
+
+    def set_state(self, name: str, status: Optional[str] = None, health: Optional[str] = None,
+                  emit: bool = True):
+        """Change a container behind the bridge's back; ``emit=False`` loses the event"""
+        container = self.containers[name]
+        if status is not None:
+            container['State'].update({'Status': status, 'Running': status == 'running'})
+            if emit:
+                self._emit(container, {'running': 'start', 'exited': 'die', 'paused': 'pause'}.get(status, status))
+        if health is not None:
+            container['State']['Health']['Status'] = health
+            if emit:
+                self._emit(container, f"health_status: {health}")
+
+    def set_usage(self, name: str, cpu_percent: float, memory_percent: float):
+        """CPU (100 per busy core) and memory (percent of limit) reported for ``name`` from now on"""
+        self.usage[name] = {'cpu_percent': cpu_percent, 'memory_percent': memory_percent}
+
+    def _stats(self, container: Dict, online_cpus: int = 4, memory_limit: int = 2 << 30) -> Dict:
+        usage = self.usage.get(container['Name'].lstrip('/'), {'cpu_percent': 0.0, 'memory_percent': 0.0})
+        system_delta = online_cpus * 10 ** 9
+        cpu_delta = int(usage['cpu_percent'] / 100 * system_delta / online_cpus)
+        return {
+            'read': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+            'cpu_stats': {'cpu_usage': {'total_usage': 10 ** 12 + cpu_delta},
+                          'system_cpu_usage': 10 ** 14 + system_delta, 'online_cpus': online_cpus},
+            'precpu_stats': {'cpu_usage': {'total_usage': 10 ** 12}, 'system_cpu_usage': 10 ** 14,
+                             'online_cpus': online_cpus},
+            'memory_stats': {'usage': int(usage['memory_percent'] / 100 * memory_limit), 'limit': memory_limit,
+                             'stats': {'inactive_file': 0}},
+        }
+
+    def _lookup(self, name: str) -> Optional[Dict]:
+        container = self.containers.get(name)
+        if container is None:
+            container = next((c for c in self.containers.values() if c['Id'].startswith(name)), None)
+        return container
+
+    async def _lifecycle(self, container: Dict, action: str):
+        name = container['Name'].lstrip('/')
+        self.in_flight[name] = self.in_flight.get(name, 0) + 1
+        self.max_in_flight[name] = max(self.max_in_flight.get(name, 0), self.in_flight[name])
+        try:
+            if self.op_latency:
+                await asyncio.sleep(self.op_latency)
+            running = action != 'stop'
+            if action in ('stop', 'restart'):
+                self._emit(container, 'die')
+            booting = running and container['State']['Health']['Status'] == 'starting'
+            container['State'].update({'Status': 'running' if running else 'exited', 'Running': running})
+            if running:
+                self._emit(container, 'start')
+            if booting:
+                self._loop.call_later(self.boot_latency, self._booted, container)
+        finally:
+            self.in_flight[name] -= 1
+
+
+    def _booted(self, container: Dict):
+        if not container['State']['Running']:
+            return
+        if self.boot_outcome == 'exit':
+            container['State'].update({'Status': 'exited', 'Running': False, 'ExitCode': 1})
+            self._emit(container, 'die')
+        else:
+            container['State']['Health']['Status'] = 'healthy'
+            self._emit(container, 'health_status: healthy')
+
+
+def start_in_thread(**kwargs) -> FakeDockerAPI:
+    """Start a FakeDockerAPI on its own event loop thread"""
+    fake = FakeDockerAPI(**kwargs)
+    loop = asyncio.new_event_loop()
+    started = threading.Event()
+
+    def serve():
+        asyncio.set_event_loop(loop)
+        loop.run_until_complete(fake.start())
+        started.set()
+        loop.run_forever()
+
+    threading.Thread(target=serve, name='fake-docker', daemon=True).start()
+    started.wait()
+    return fake
@@ -0,0 +1,325 @@
+#!/usr/bin/env python3
+"""
+HEADY_BRAND:BEGIN
+╔══════════════════════════════════════════════════════════════════╗
+║  HeadySync MIDI Bridge - Autoscaler                               ║
+║  "The band grows when the crowd does"                             ║
+╚══════════════════════════════════════════════════════════════════╝
+HEADY_BRAND:END
+
+Control loop that sizes the oracle to sensor load. Each tick combines:
+
+* the oracle's ``/metrics``: queued items (``queue_depth`` for the ingest
+  and write queues) and mean batch write time since the last tick (from
+  the ``write_duration_seconds`` histogram)
+* Docker stats for the container: CPU per worker (percent of one core) and
+  memory as a percent of its limit
+
+The replica count is the oracle's worker-process count (``ORACLE_WORKERS``).
+The stack runs one oracle container under a fixed name, and its sharding
+already spreads load across processes. Changing the count goes through
+the controller's env update, so the oracle is recreated blue/green.
+
+The rules use hysteresis and cooldowns:
+
+* Scale up one worker once any of queue depth, write latency or CPU has
+  been over its high mark for ``up_after`` consecutive ticks, unless memory
+  is over its ceiling (more processes would only add memory).
+* Scale down one worker once all of them have been under their low marks
+  for ``down_after`` consecutive ticks.
+* After a change, no scale-up for ``up_cooldown`` seconds and no
+  scale-down for ``down_cooldown`` seconds.
+
+Manual steps from the pads take precedence and pin the count for
+``override_hold`` seconds.
+"""
+
+import asyncio
+import logging
+import os
+import re
+import time
+from collections import deque
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+import httpx
+
+from .docker_ops import DockerExecutor
+
+logger = logging.getLogger(__name__)
+
+SAMPLE_LINE = re.compile(r'^([a-zA-Z_:][a-zA-Z0-9_:]*)(\{[^}]*\})?\s+(\S+)')
+LABEL_PAIR = re.compile(r'(\w+)="((?:[^"\\]|\\.)*)"')
+
+
+def parse_metrics(text: str) -> List[Tuple[str, Dict[str, str], float]]:
+    """Samples from Prometheus text exposition format as (name, labels, value)"""
+    samples = []
+    for line in text.splitlines():
+        match = SAMPLE_LINE.match(line)
+        if match is None:
+            continue
+        name, labels, value = match.groups()
+        try:
+            samples.append((name, dict(LABEL_PAIR.findall(labels or '')), float(value)))
+        except ValueError:
+            continue
+    return samples
+
+
+def metric_total(samples: List[Tuple[str, Dict[str, str], float]], name: str, **labels) -> float:
+    """Sum of the samples named ``name`` whose labels include ``labels``"""
+    return sum(value for sample, sample_labels, value in samples
+               if sample == name and all(sample_labels.get(k) == v for k, v in labels.items()))
+
+
+def container_usage(client, name: str) -> Dict:
+    """CPU, memory and configured workers of a container, from one stats read and an inspect"""
+    stats = client.api.stats(name, stream=False)
+    env = dict(item.split('=', 1) for item in client.api.inspect_container(name)['Config'].get('Env') or []
+               if '=' in item)
+    workers = env.get('ORACLE_WORKERS', '1')
+
+    cpu, precpu = stats.get('cpu_stats', {}), stats.get('precpu_stats', {})
+    cpu_delta = cpu.get('cpu_usage', {}).get('total_usage', 0) - precpu.get('cpu_usage', {}).get('total_usage', 0)
+    system_delta = cpu.get('system_cpu_usage', 0) - precpu.get('system_cpu_usage', 0)
+    online = cpu.get('online_cpus') or len(cpu.get('cpu_usage', {}).get('percpu_usage') or []) or 1
+    memory = stats.get('memory_stats', {})
+    # Page cache is reclaimable; the docker CLI leaves it out too (cgroup v2 / v1 key)
+    cache = memory.get('stats', {}).get('inactive_file', memory.get('stats', {}).get('total_inactive_file', 0))
+    limit = memory.get('limit') or 0
+    return {
+        'cpu_percent': cpu_delta / system_delta * online * 100 if system_delta > 0 and cpu_delta > 0 else 0.0,
+        'memory_percent': (memory.get('usage', 0) - cache) / limit * 100 if limit else 0.0,
+        'workers': (os.cpu_count() or 1) if workers == 'auto' else int(workers),
+    }
+
+
+class ScalingPolicy:
+    """Thresholds, bounds and timing for scaling decisions"""
+
+    def __init__(self, min_replicas: int = 1, max_replicas: int = 4,
+                 queue_high: float = 500, queue_low: float = 50,
+                 latency_high: float = 0.25, latency_low: float = 0.05,
+                 cpu_high: float = 80.0, cpu_low: float = 30.0, memory_ceiling: float = 85.0,
+                 up_after: int = 2, down_after: int = 4,
+                 up_cooldown: float = 120.0, down_cooldown: float = 600.0):
+        if not min_replicas <= max_replicas:
+            raise ValueError(f"replica bounds inverted: {min_replicas} > {max_replicas}")
+        if queue_low >= queue_high or latency_low >= latency_high or cpu_low >= cpu_high:
+            raise ValueError("each low mark must be below its high mark")
+        self.min_replicas = min_replicas
+        self.max_replicas = max_replicas
+        self.queue_high = queue_high
+        self.queue_low = queue_low
+        self.latency_high = latency_high
+        self.latency_low = latency_low
+        self.cpu_high = cpu_high
+        self.cpu_low = cpu_low
+        self.memory_ceiling = memory_ceiling
+        self.up_after = up_after
+        self.down_after = down_after
+        self.up_cooldown = up_cooldown
+        self.down_cooldown = down_cooldown
+
+    def pressure(self, sample: Dict) -> List[str]:
+        """Signals over their high marks"""
+        latency = sample.get('write_latency')
+        over = []
+        if sample['queue_depth'] >= self.queue_high:
+            over.append(f"queue {sample['queue_depth']:.0f} >= {self.queue_high:.0f}")
+        if latency is not None and latency >= self.latency_high:
+            over.append(f"write latency {latency * 1000:.0f} ms >= {self.latency_high * 1000:.0f} ms")
+        if sample['cpu_per_worker'] >= self.cpu_high:
+            over.append(f"cpu {sample['cpu_per_worker']:.0f}%/worker >= {self.cpu_high:.0f}%")
+        return over
+
+    def idle(self, sample: Dict) -> bool:
+        """Every signal under its low mark"""
+        latency = sample.get('write_latency')
+        return (sample['queue_depth'] <= self.queue_low
+                and (latency is None or latency <= self.latency_low)
+                and sample['cpu_per_worker'] <= self.cpu_low)
+
+
+class Autoscaler:
+    """Adjusts a container's worker count from its metrics, with manual overrides"""
+
+    def __init__(self, executor: DockerExecutor, container: str, apply: Callable[[int], Awaitable[bool]],
+                 metrics_url: Optional[str], policy: ScalingPolicy, interval: float = 15.0,
+                 override_hold: float = 900.0, enabled: bool = True, history: int = 50):
+        self.executor = executor
+        self.container = container
+        self.apply = apply
+        self.metrics_url = metrics_url
+        self.policy = policy
+        self.interval = interval
+        self.override_hold = override_hold
+        self.enabled = enabled
+
+        self.replicas: Optional[int] = None
+        self.last_sample: Optional[Dict] = None
+        self._previous_write: Optional[Tuple[float, float]] = None
+        self._high_streak = 0
+        self._low_streak = 0
+        self._last_change = float('-inf')
+        self.hold_until = 0.0
+        self._lock = asyncio.Lock()
+        self._http: Optional[httpx.AsyncClient] = None
+        self._task: Optional[asyncio.Task] = None
+        self.decisions = deque(maxlen=history)
+        self.sample_failures = 0
+        self._sampling_down = False
+
+    async def sample(self) -> Dict:
+        """One reading of the oracle's metrics and the container's resource use"""
+        usage, metrics = await asyncio.gather(
+            self.executor.call(container_usage, self.container),
+            self._scrape()
+        )
+        self.replicas = usage['workers']
+        return {
+            **metrics,
+            'cpu_percent': round(usage['cpu_percent'], 1),
+            'cpu_per_worker': round(usage['cpu_percent'] / max(1, usage['workers']), 1),
+            'memory_percent': round(usage['memory_percent'], 1),
+            'replicas': usage['workers'],
+            'at': time.time(),
+        }
+
+    async def _scrape(self) -> Dict:
+        if not self.metrics_url:
+            return {'queue_depth': 0.0, 'write_latency': None}
+        if self._http is None:
+            self._http = httpx.AsyncClient(timeout=5.0)
+        response = await self._http.get(self.metrics_url)
+        response.raise_for_status()
+        samples = parse_metrics(response.text)
+
+        written = (metric_total(samples, 'heady_oracle_write_duration_seconds_sum'),
+                   metric_total(samples, 'heady_oracle_write_duration_seconds_count'))
+        latency = None
+        if self._previous_write is not None and written[1] > self._previous_write[1]:
+            latency = (written[0] - self._previous_write[0]) / (written[1] - self._previous_write[1])
+        self._previous_write = written
+        return {
+            'queue_depth': (metric_total(samples, 'heady_oracle_queue_depth', queue='ingest')
+                            + metric_total(samples, 'heady_oracle_queue_depth', queue='write')),
+            'write_latency': latency,
+        }
+
+    def decide(self, sample: Dict, now: float) -> Tuple[Optional[int], str]:
+        """Replica count to move to (None to stay) and why"""
+        policy = self.policy
+        over = policy.pressure(sample)
+        self._high_streak = self._high_streak + 1 if over else 0
+        self._low_streak = self._low_streak + 1 if not over and policy.idle(sample) else 0
+        replicas = sample['replicas']
+        since_change = now - self._last_change
+
+        if now < self.hold_until:
+            return None, 'manual override'
+        if replicas < policy.min_replicas or replicas > policy.max_replicas:
+            return min(max(replicas, policy.min_replicas), policy.max_replicas), 'outside bounds'
+        if self._high_streak >= policy.up_after and replicas < policy.max_replicas:
+            if sample['memory_percent'] >= policy.memory_ceiling:
+                return None, f"memory {sample['memory_percent']:.0f}% at ceiling"
+            if since_change < policy.up_cooldown:
+                return None, 'cooling down'
+            return replicas + 1, '; '.join(over)
+        if self._low_streak >= policy.down_after and replicas > policy.min_replicas:
+            if since_change < policy.down_cooldown:
+                return None, 'cooling down'
+            return replicas - 1, 'idle'
+        return None, 'steady'
+
+    async def tick(self) -> Optional[Dict]:
+        """Sample, decide and apply once; returns the decision if the count changed"""
+        try:
+            sample = await self.sample()
+        except Exception as e:
+            # Warn once per outage, not on every tick
+            self.sample_failures += 1
+            if not self._sampling_down:
+                logger.warning(f"Autoscaler could not sample {self.container}: {e}")
+            self._sampling_down = True
+            return None
+        if self._sampling_down:
+            logger.info(f"Autoscaler sampling {self.container} again")
+            self._sampling_down = False
+        self.last_sample = sample
+        async with self._lock:
+            desired, reason = self.decide(sample, time.monotonic())
+            if desired is None or desired == sample['replicas']:
+                return None
+            return await self._scale(sample['replicas'], desired, reason, 'auto')
+
+    async def _scale(self, current: int, desired: int, reason: str, source: str) -> Dict:
+        logger.info(f"📈 Scaling {self.container} {current} -> {desired} workers ({source}: {reason})")
+        applied = await self.apply(desired)
+        # Failed attempts also start the cooldown so a broken rollout is not retried every tick
+        self._last_change = time.monotonic()
+        self._high_streak = self._low_streak = 0
+        if applied:
+            self.replicas = desired
+        decision = {'at': time.time(), 'from': current, 'to': desired, 'reason': reason,
+                    'source': source, 'applied': applied}
+        self.decisions.append(decision)
+        return decision
+
+    async def step(self, delta: int) -> Optional[Dict]:
+        """Manual override: add or remove workers now and hold the count against the loop"""
+        async with self._lock:
+            current = self.replicas
+            if current is None:
+                current = (await self.executor.call(container_usage, self.container))['workers']
+            desired = min(max(current + delta, self.policy.min_replicas), self.policy.max_replicas)
+            self.hold_until = time.monotonic() + self.override_hold
+            if desired == current:
+                logger.info(f"{self.container} already at {current} workers "
+                            f"(bounds {self.policy.min_replicas}-{self.policy.max_replicas})")
+                return None
+            return await self._scale(current, desired, 'pad', 'manual')
+
+    def toggle_hold(self) -> bool:
+        """Pin the current count against the loop, or hand control back; returns whether it is held"""
+        held = time.monotonic() < self.hold_until
+        self.hold_until = 0.0 if held else float('inf')
+        return not held
+
+    async def _run(self):
+        while True:
+            await self.tick()
+            await asyncio.sleep(self.interval)
+
+    def start(self):
+        if self.enabled and self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._http is not None:
+            await self._http.aclose()
+            self._http = None
+
+    def stats(self) -> Dict:
+        policy = self.policy
+        hold = self.hold_until - time.monotonic()
+        return {
+            'container': self.container,
+            'enabled': self.enabled,
+            'replicas': self.replicas,
+            'bounds': [policy.min_replicas, policy.max_replicas],
+            'held_for_seconds': None if hold <= 0 else ('indefinitely' if hold == float('inf') else round(hold)),
+            'high_streak': self._high_streak,
+            'low_streak': self._low_streak,
+            'last_sample': self.last_sample,
+            'sample_failures': self.sample_failures,
+            'decisions': list(self.decisions),
+        }
@@ -0,0 +1,239 @@
+#!/usr/bin/env python3
+"""
+HEADY_BRAND:BEGIN
+╔══════════════════════════════════════════════════════════════════╗
+║  HeadySync MIDI Bridge - docker-compose Runner                    ║
+║  "Every line of the deploy, live, while the band plays on"        ║
+╚══════════════════════════════════════════════════════════════════╝
+HEADY_BRAND:END
+
+Runs docker-compose commands as asyncio subprocesses. stdout and stderr are
+read line by line as they are produced. Each line is logged and fanned out
+to subscribers, such as the ``/ws/compose`` WebSocket, through bounded
+queues. A slow subscriber loses lines instead of stalling the child.
+
+Every run is a tracked ``ComposeJob`` with a timeout. A timed-out or
+cancelled job sends SIGTERM to its process and, after ``kill_grace``
+seconds, SIGKILL. ``pull`` fetches each service's images in its own process,
+``max_parallel`` at a time. Each service then gets its own timeout and
+output stream, and a slow registry only delays its own images.
+"""
+
+import asyncio
+import itertools
+import logging
+import shlex
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Sequence, Set
+
+logger = logging.getLogger(__name__)
+
+
+class ComposeError(Exception):
+    """Raised when a compose command fails or times out"""
+
+
+class ComposeJob:
+    """One docker-compose invocation and its outcome"""
+
+    __slots__ = ('id', 'args', 'state', 'returncode', 'started_at', 'finished_at', 'lines', 'tail',
+                 'output', 'process', 'task')
+
+    def __init__(self, job_id: str, args: List[str], capture: bool = False):
+        self.id = job_id
+        self.args = args
+        self.state = 'running'
+        self.returncode: Optional[int] = None
+        self.started_at = time.time()
+        self.finished_at: Optional[float] = None
+        self.lines = 0
+        self.tail: List[str] = []
+        self.output: Optional[List[str]] = [] if capture else None
+        self.process: Optional[asyncio.subprocess.Process] = None
+        self.task: Optional[asyncio.Task] = None
+
+    def to_dict(self) -> Dict:
+        return {
+            'id': self.id,
+            'command': ' '.join(self.args),
+            'state': self.state,
+            'returncode': self.returncode,
+            'started_at': self.started_at,
+            'finished_at': self.finished_at,
+            'lines': self.lines,
+            'tail': self.tail,
+        }
+
+
+class ComposeRunner:
+    """Streams docker-compose subprocess output with timeouts, cancellation and parallel pulls"""
+
+    def __init__(self, name: str = 'compose', command: str = 'docker-compose', files: Sequence[str] = (),
+                 project_name: Optional[str] = None, project_dir: Optional[str] = None,
+                 timeout: float = 600.0, kill_grace: float = 10.0, max_parallel: int = 4,
+                 history: int = 50, tail_lines: int = 20, subscriber_queue: int = 1000):
+        self.name = name
+        self.base = shlex.split(command)
+        for compose_file in files:
+            self.base += ['-f', compose_file]
+        if project_name:
+            self.base += ['-p', project_name]
+        if project_dir:
+            self.base += ['--project-directory', project_dir]
+        self.timeout = timeout
+        self.kill_grace = kill_grace
+        self.max_parallel = max_parallel
+        self.history = history
+        self.tail_lines = tail_lines
+        self.subscriber_queue = subscriber_queue
+
+        self._jobs: "OrderedDict[str, ComposeJob]" = OrderedDict()
+        self._ids = itertools.count(1)
+        self._subscribers: Set[asyncio.Queue] = set()
+        self._services: Optional[List[str]] = None
+
+        self.subscriber_drops = 0
+
+    async def run(self, args: Sequence[str], timeout: Optional[float] = None, check: bool = True,
+                  capture: bool = False, quiet: bool = False) -> ComposeJob:
+        """Run ``docker-compose <args>`` to completion, streaming its output
+
+        ``capture`` keeps all of stdout on the job; ``quiet`` keeps it out of the log and subscribers.
+        """
+        job = ComposeJob(f"{self.name}-{next(self._ids)}", list(args), capture)
+        job.task = asyncio.current_task()
+        self._jobs[job.id] = job
+        while len(self._jobs) > self.history:
+            self._jobs.popitem(last=False)
+
+        logger.info(f"Executing: {' '.join(self.base + job.args)}")
+        self._publish(job, 'status', 'started')
+        try:
+            job.process = await asyncio.create_subprocess_exec(
+                *self.base, *job.args,
+                stdin=asyncio.subprocess.DEVNULL,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE
+            )
+            pumps = asyncio.gather(self._pump(job, job.process.stdout, 'stdout', quiet),
+                                   self._pump(job, job.process.stderr, 'stderr', False))
+            try:
+                await asyncio.wait_for(asyncio.shield(pumps), timeout or self.timeout)
+                job.returncode = await job.process.wait()
+            except asyncio.TimeoutError:
+                job.state = 'timeout'
+                await self._terminate(job)
+                raise ComposeError(f"docker-compose {' '.join(job.args)} timed out after {timeout or self.timeout}s")
+            except asyncio.CancelledError:
+                job.state = 'cancelled'
+                await self._terminate(job)
+                raise
+            finally:
+                pumps.cancel()
+        except FileNotFoundError as e:
+            job.state = 'failed'
+            raise ComposeError(f"docker-compose not available: {e}")
+        finally:
+            job.finished_at = time.time()
+            if job.state == 'running':
+                job.state = 'succeeded' if job.returncode == 0 else 'failed'
+            self._publish(job, 'status', job.state)
+
+        if check and job.returncode != 0:
+            raise ComposeError(f"docker-compose {' '.join(job.args)} exited with {job.returncode}: "
+                               f"{job.tail[-1] if job.tail else ''}")
+        return job
+
+    async def _pump(self, job: ComposeJob, stream: asyncio.StreamReader, name: str, quiet: bool):
+        while True:
+            line = await stream.readline()
+            if not line:
+                break
+            text = line.decode(errors='replace').rstrip()
+            job.lines += 1
+            job.tail = (job.tail + [text])[-self.tail_lines:]
+            if job.output is not None and name == 'stdout':
+                job.output.append(text)
+            if not quiet:
+                logger.info(f"[{job.id} {name}] {text}")
+                self._publish(job, name, text)
+
+    async def _terminate(self, job: ComposeJob):
+        """SIGTERM, then SIGKILL after ``kill_grace``; shielded so a second cancel cannot orphan the child"""
+        process = job.process
+        if process is None or process.returncode is not None:
+            return
+
+        async def stop():
+            process.terminate()
+            try:
+                await asyncio.wait_for(process.wait(), self.kill_grace)
+            except asyncio.TimeoutError:
+                process.kill()
+                await process.wait()
+            job.returncode = process.returncode
+
+        await asyncio.shield(stop())
+
+    def _publish(self, job: ComposeJob, stream: str, line: str):
+        event = {'job': job.id, 'stream': stream, 'line': line, 'time': time.time()}
+        for subscriber in self._subscribers:
+            try:
+                subscriber.put_nowait(event)
+            except asyncio.QueueFull:
+                self.subscriber_drops += 1
+
+    async def services(self) -> List[str]:
+        """Service names from the compose file (cached)"""
+        if self._services is None:
+            job = await self.run(['config', '--services'], capture=True, quiet=True)
+            self._services = [line for line in job.output if line]
+        return self._services
+
+    async def pull(self, services: Optional[Sequence[str]] = None, timeout: Optional[float] = None):
+        """Pull each service's images in its own process, ``max_parallel`` at a time"""
+        services = list(services) if services else await self.services()
+        slots = asyncio.Semaphore(self.max_parallel)
+
+        async def pull_one(service: str):
+            async with slots:
+                return await self.run(['pull', service], timeout=timeout, check=False)
+
+        jobs = await asyncio.gather(*(pull_one(service) for service in services))
+        failed = [service for service, job in zip(services, jobs) if job.returncode != 0]
+        if failed:
+            raise ComposeError(f"Pull failed for {', '.join(failed)}")
+        return jobs
+
+    def cancel(self, job_id: str) -> bool:
+        job = self._jobs.get(job_id)
+        if job is None or job.state != 'running' or job.task is None:
+            return False
+        job.task.cancel()
+        return True
+
+    def jobs(self, limit: int = 20) -> List[ComposeJob]:
+        """Most recent jobs, newest first"""
+        return list(reversed(self._jobs.values()))[:limit]
+
+    def subscribe(self, subscriber: Optional[asyncio.Queue] = None) -> asyncio.Queue:
+        """Queue receiving ``{job, stream, line, time}`` events (pass one in to share it across runners)"""
+        if subscriber is None:
+            subscriber = asyncio.Queue(maxsize=self.subscriber_queue)
+        self._subscribers.add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber: asyncio.Queue):
+        self._subscribers.discard(subscriber)
+
+    def stats(self) -> Dict:
+        states = [job.state for job in self._jobs.values()]
+        return {
+            'running': states.count('running'),
+            'succeeded': states.count('succeeded'),
+            'failed': states.count('failed') + states.count('timeout'),
+            'cancelled': states.count('cancelled'),
+            'subscribers': len(self._subscribers),
+            'subscriber_drops': self.subscriber_drops,
+        }
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+HEADY_BRAND:BEGIN
+╔══════════════════════════════════════════════════════════════════╗
+║  HeadySync MIDI Bridge - Live Config Channel                      ║
+║  "Turn the knob, hear the change, never stop the music"           ║
+╚══════════════════════════════════════════════════════════════════╝
+HEADY_BRAND:END
+
+Pushes setting changes to running services over their ``/config`` endpoint
+(``PUT`` a JSON object of ``{KEY: value}``). Each service keeps one
+keep-alive HTTP connection, so a knob tick costs one small request on an
+open socket. A service that answers 409 lists the keys it can only take at
+startup. Those surface as ``RestartRequired`` so the caller can recreate the
+container instead.
+"""
+
+import logging
+import time
+from typing import Dict, List, Optional
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+
+class RestartRequired(Exception):
+    """The service cannot apply these keys live"""
+
+    def __init__(self, container: str, keys: List[str]):
+        super().__init__(f"{container} needs a restart for {', '.join(keys)}")
+        self.container = container
+        self.keys = keys
+
+
+class LiveConfigError(Exception):
+    """The service rejected the update or could not be reached"""
+
+
+class ConfigChannel:
+    """Live ``/config`` updates to services, by container name"""
+
+    def __init__(self, endpoints: Dict[str, str], timeout: float = 2.0):
+        self.endpoints = {name: url.rstrip('/') for name, url in endpoints.items() if url}
+        self.timeout = timeout
+        self._client: Optional[httpx.AsyncClient] = None
+
+        self.updates = 0
+        self.failures = 0
+        self.last_latency: Optional[float] = None
+
+    def supports(self, container: str) -> bool:
+        return container in self.endpoints
+
+    def _http(self) -> httpx.AsyncClient:
+        if self._client is None:
+            self._client = httpx.AsyncClient(timeout=self.timeout)
+        return self._client
+
+    async def update(self, container: str, updates: Dict[str, str]) -> Dict:
+        """Apply ``updates`` on the running service; raises RestartRequired or LiveConfigError"""
+        if not self.supports(container):
+            raise RestartRequired(container, sorted(updates))
+        started = time.perf_counter()
+        try:
+            response = await self._http().put(f"{self.endpoints[container]}/config", json=updates)
+        except httpx.HTTPError as e:
+            self.failures += 1
+            raise LiveConfigError(f"{container} config endpoint unreachable: {e}")
+        if response.status_code == 409:
+            raise RestartRequired(container, response.json().get('restart_required', sorted(updates)))
+        if response.status_code != 200:
+            self.failures += 1
+            raise LiveConfigError(f"{container} rejected {updates}: {response.text}")
+        self.updates += 1
+        self.last_latency = time.perf_counter() - started
+        return response.json()
+
+    async def current(self, container: str) -> Dict[str, str]:
+        """Live values on the running service as environment strings ({} if it has no channel)"""
+        if not self.supports(container):
+            return {}
+        try:
+            response = await self._http().get(f"{self.endpoints[container]}/config")
+            response.raise_for_status()
+        except httpx.HTTPError as e:
+            logger.warning(f"Could not read live config of {container}: {e}")
+            return {}
+        settings = response.json().get('settings', {})
+        return {key: str(entry['value']).lower() if isinstance(entry['value'], bool) else str(entry['value'])
+                for key, entry in settings.items()}
+
+    async def close(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    def stats(self) -> Dict:
+        return {
+            'endpoints': self.endpoints,
+            'updates': self.updates,
+            'failures': self.failures,
+            'last_latency_ms': round(self.last_latency * 1000, 3) if self.last_latency is not None else None,
+        }
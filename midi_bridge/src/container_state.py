@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+"""
+HEADY_BRAND:BEGIN
+╔══════════════════════════════════════════════════════════════════╗
+║  HeadySync MIDI Bridge - Container State View                     ║
+║  "Know the state of the stage without walking over to look"       ║
+╚══════════════════════════════════════════════════════════════════╝
+HEADY_BRAND:END
+
+Keeps the status and health of the Heady containers in memory so health
+reports answer without a round trip to the Docker daemon.
+
+A watcher thread follows the daemon's container event stream (``start``,
+``die``, ``health_status: ...``, ...) and applies each event on the event
+loop. Events can be missed: the stream drops, the bridge restarts, or the
+daemon hiccups. To cover that, every ``reconcile_interval`` seconds, and
+after each reconnect, all watched containers are re-inspected in parallel
+and any drift is corrected. Lookups of containers not in the cache yet are
+also fanned out in parallel through the Docker executor.
+"""
+
+import asyncio
+import logging
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional
+
+from .docker_ops import DockerExecutor, inspect_container
+
+logger = logging.getLogger(__name__)
+
+# Container event action -> resulting status
+EVENT_STATUS = {
+    'create': 'created',
+    'start': 'running',
+    'restart': 'running',
+    'unpause': 'running',
+    'pause': 'paused',
+    'die': 'exited',
+    'stop': 'exited',
+    'destroy': 'removed',
+}
+
+
+class ContainerStateCache:
+    """Event-fed, periodically reconciled view of container status and health"""
+
+    def __init__(self, executor: DockerExecutor, containers: Iterable[str],
+                 reconcile_interval: float = 30.0, reconnect_delay: float = 2.0):
+        self.executor = executor
+        self.containers = list(containers)
+        self._watched = set(self.containers)
+        self.reconcile_interval = reconcile_interval
+        self.reconnect_delay = reconnect_delay
+
+        self._state: Dict[str, Dict] = {}
+        self._listeners: List[Callable[[str, Dict], None]] = []
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._reconcile_task: Optional[asyncio.Task] = None
+        self._reconcile_now = asyncio.Event()
+        self._watcher: Optional[threading.Thread] = None
+        self._stream = None
+        self._running = False
+        self._last_event_time: Optional[int] = None
+
+        self.stream_connected = False
+        self.events_applied = 0
+        self.reconciles = 0
+        self.drift_corrections = 0
+        self.cold_lookups = 0
+        self.last_reconcile: Optional[float] = None
+
+    def start(self):
+        """Start the event watcher thread and the reconcile loop"""
+        self._loop = asyncio.get_running_loop()
+        self._running = True
+        self._reconcile_task = asyncio.create_task(self._reconcile_loop())
+        self._watcher = threading.Thread(target=self._watch_events, name='docker-events', daemon=True)
+        self._watcher.start()
+
+    async def stop(self):
+        self._running = False
+        if self._stream is not None:
+            try:
+                self._stream.close()
+            except Exception:
+                pass
+        if self._reconcile_task:
+            self._reconcile_task.cancel()
+            await asyncio.gather(self._reconcile_task, return_exceptions=True)
+
+    def add_listener(self, callback: Callable[[str, Dict], None]):
+        """Call ``callback(name, state)`` on the event loop whenever a container's state changes"""
+        self._listeners.append(callback)
+
+    # Event stream (watcher thread)
+
+    def _watch_events(self):
+        while self._running:
+            try:
+                # Only the watched containers, so unrelated churn on the host never wakes this thread
+                kwargs = {'decode': True, 'filters': {'type': 'container', 'container': self.containers}}
+                if self._last_event_time is not None:
+                    # Replay what happened while disconnected
+                    kwargs['since'] = self._last_event_time
+                self._stream = self.executor.client.events(**kwargs)
+                self.stream_connected = True
+                self._loop.call_soon_threadsafe(self._reconcile_now.set)
+                for event in self._stream:
+                    self._loop.call_soon_threadsafe(self._apply_event, event)
+            except Exception as e:
+                if self._running:
+                    logger.warning(f"Docker event stream error: {e}")
+            finally:
+                self.stream_connected = False
+                self._stream = None
+            if self._running:
+                time.sleep(self.reconnect_delay)
+
+    def _apply_event(self, event: Dict):
+        attributes = event.get('Actor', {}).get('Attributes', {})
+        name = attributes.get('name')
+        action = event.get('Action') or event.get('status') or ''
+        self._last_event_time = event.get('time', self._last_event_time)
+        if name not in self._watched:
+            return
+
+        update = {}
+        if action.startswith('health_status'):
+            update['health'] = action.split(':', 1)[1].strip()
+        elif action in EVENT_STATUS:
+            update['status'] = EVENT_STATUS[action]
+            if action in ('die', 'destroy'):
+                update['health'] = 'unknown'
+        else:
+            return
+        self.events_applied += 1
+        self._update(name, update, 'event')
+
+    def _update(self, name: str, update: Dict, source: str) -> bool:
+        """Merge ``update`` into the cached state; True if anything changed"""
+        current = self._state.get(name, {})
+        changed = any(current.get(key) != value for key, value in update.items())
+        self._state[name] = {**current, **update, 'source': source, 'updated_at': time.time()}
+        if changed:
+            for listener in self._listeners:
+                try:
+                    listener(name, self._state[name])
+                except Exception as e:
+                    logger.error(f"Container state listener failed: {e}")
+        return changed
+
+    # Reconcile
+
+    async def _reconcile_loop(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._reconcile_now.wait(), timeout=self.reconcile_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._reconcile_now.clear()
+            try:
+                await self.reconcile()
+            except Exception as e:
+                logger.error(f"Container state reconcile failed: {e}")
+
+    async def reconcile(self, names: Optional[Iterable[str]] = None) -> Dict[str, Dict]:
+        """Inspect ``names`` (default: all watched) in parallel and correct the cache"""
+        names = list(names) if names is not None else self.containers
+        results = await asyncio.gather(*(self.executor.call(inspect_container, name) for name in names),
+                                       return_exceptions=True)
+        for name, result in zip(names, results):
+            if isinstance(result, Exception):
+                result = {'status': 'missing' if 'No such container' in str(result) else 'error',
+                          'health': 'unknown', 'error': str(result)}
+            else:
+                result.setdefault('error', None)
+            known = name in self._state
+            if self._update(name, result, 'inspect') and known:
+                self.drift_corrections += 1
+                logger.info(f"Container state drift corrected for {name}: {result}")
+        self.reconciles += 1
+        self.last_reconcile = time.time()
+        return {name: self._state[name] for name in names}
+
+    # Queries
+
+    def cached(self, name: str) -> Optional[Dict]:
+        return self._state.get(name)
+
+    async def snapshot(self, names: Optional[Iterable[str]] = None) -> Dict[str, Dict]:
+        """State of ``names``, answering from memory and fanning out lookups for any not cached yet"""
+        names = list(names) if names is not None else self.containers
+        cold = [name for name in names if name not in self._state]
+        if cold:
+            self.cold_lookups += len(cold)
+            await self.reconcile(cold)
+        return {name: dict(self._state[name]) for name in names}
+
+    def stats(self) -> Dict:
+        return {
+            'watched': len(self.containers),
+            'cached': len(self._state),
+            'stream_connected': self.stream_connected,
+            'events_applied': self.events_applied,
+            'reconciles': self.reconciles,
+            'drift_corrections': self.drift_corrections,
+            'cold_lookups': self.cold_lookups,
+            'last_reconcile': self.last_reconcile,
+            'reconcile_interval': self.reconcile_interval,
+        }
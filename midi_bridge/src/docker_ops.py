@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+"""
+HEADY_BRAND:BEGIN
+╔══════════════════════════════════════════════════════════════════╗
+║  HeadySync MIDI Bridge - Docker Operation Executor                ║
+║  "The stage keeps playing while the crew moves the amps"          ║
+╚══════════════════════════════════════════════════════════════════╝
+HEADY_BRAND:END
+
+The Docker SDK is blocking: ``containers.get``, ``restart`` and friends hold
+the calling thread for as long as the daemon takes. Every SDK call made by
+the bridge runs on a small dedicated thread pool instead of the event loop.
+
+Mutating operations are submitted as tracked ``Operation`` records. Operations
+on the same container run one at a time, in submission order; operations on
+different containers run in parallel up to ``max_workers``. At most
+``max_pending`` operations may be queued or running. A queued operation can be
+cancelled outright. A running SDK call cannot be interrupted, so cancelling
+it abandons the result and the container stays locked until the call returns.
+The ``api_timeout`` on the client bounds how long that can take.
+"""
+
+import asyncio
+import itertools
+import logging
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+
+import docker
+
+logger = logging.getLogger(__name__)
+
+ACTIVE_STATES = ('queued', 'running')
+
+
+class OperationRejected(Exception):
+    """Raised when too many Docker operations are already pending"""
+
+
+def inspect_container(client, name: str) -> Dict:
+    """Status and health of one container"""
+    container = client.containers.get(name)
+    return {
+        'status': container.status,
+        'health': container.attrs.get('State', {}).get('Health', {}).get('Status', 'unknown')
+    }
+
+
+def restart_container(client, name: str, timeout: int = 10) -> Dict:
+    """Restart a container, giving it ``timeout`` seconds to stop"""
+    container = client.containers.get(name)
+    container.restart(timeout=timeout)
+    container.reload()
+    return {'status': container.status}
+
+
+class Operation:
+    """One submitted Docker operation and its outcome"""
+
+    __slots__ = ('id', 'kind', 'target', 'state', 'submitted_at', 'started_at', 'finished_at',
+                 'result', 'error', 'task')
+
+    def __init__(self, op_id: str, kind: str, target: str):
+        self.id = op_id
+        self.kind = kind
+        self.target = target
+        self.state = 'queued'
+        self.submitted_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.result: Any = None
+        self.error: Optional[str] = None
+        self.task: Optional[asyncio.Task] = None
+
+    def to_dict(self) -> Dict:
+        return {
+            'id': self.id,
+            'kind': self.kind,
+            'target': self.target,
+            'state': self.state,
+            'submitted_at': self.submitted_at,
+            'started_at': self.started_at,
+            'finished_at': self.finished_at,
+            'result': self.result,
+            'error': self.error,
+        }
+
+
+class DockerExecutor:
+    """Runs Docker SDK calls on a bounded thread pool with per-container serialization"""
+
+    def __init__(self, max_workers: int = 4, max_pending: int = 64, api_timeout: float = 60.0,
+                 history: int = 200, client_factory: Optional[Callable[..., Any]] = None):
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.api_timeout = api_timeout
+        self.history = history
+        self._client_factory = client_factory or docker.from_env
+        self._client = None
+        self._client_lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='docker')
+        self._locks: Dict[str, asyncio.Lock] = {}
+        self._operations: "OrderedDict[str, Operation]" = OrderedDict()
+        self._ids = itertools.count(1)
+
+        self.submitted = 0
+        self.succeeded = 0
+        self.failed = 0
+        self.cancelled = 0
+        self.rejected = 0
+
+    @property
+    def client(self):
+        """Docker client, created on first use (from a pool thread: it pings the daemon)"""
+        if self._client is None:
+            with self._client_lock:
+                if self._client is None:
+                    self._client = self._client_factory(timeout=int(self.api_timeout))
+        return self._client
+
+    def _invoke(self, fn: Callable, args: tuple):
+        return fn(self.client, *args)
+
+    async def call(self, fn: Callable, *args):
+        """Run ``fn(client, *args)`` on the pool without tracking or locking (reads)"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._pool, self._invoke, fn, args)
+
+    def submit(self, kind: str, target: str, fn: Callable, *args) -> Operation:
+        """Queue ``fn(client, *args)`` as a tracked operation on container ``target``"""
+        pending = sum(1 for op in self._operations.values() if op.state in ACTIVE_STATES)
+        if pending >= self.max_pending:
+            self.rejected += 1
+            raise OperationRejected(f"{pending} Docker operations already pending")
+
+        op = Operation(f"op-{next(self._ids)}", kind, target)
+        op.task = asyncio.get_running_loop().create_task(self._execute(op, fn, args))
+        op.task.add_done_callback(lambda task: self._settle(op, task))
+        self._operations[op.id] = op
+        self.submitted += 1
+        self._trim_history()
+        return op
+
+    async def run(self, kind: str, target: str, fn: Callable, *args):
+        """Submit an operation and wait for its result"""
+        return await self.wait(self.submit(kind, target, fn, *args))
+
+    async def wait(self, op: Operation):
+        """Result of ``op``; raises if it failed or was cancelled"""
+        # Shielded so a caller giving up does not cancel the operation itself
+        return await asyncio.shield(op.task)
+
+    async def _execute(self, op: Operation, fn: Callable, args: tuple):
+        lock = self._locks.setdefault(op.target, asyncio.Lock())
+        await lock.acquire()
+        future = None
+        try:
+            op.state = 'running'
+            op.started_at = time.time()
+            future = asyncio.get_running_loop().run_in_executor(self._pool, self._invoke, fn, args)
+            return await asyncio.shield(future)
+        finally:
+            if future is not None and not future.done():
+                # Keep the container locked until the abandoned SDK call returns
+                future.add_done_callback(lambda done: (lock.release(), done.cancelled() or done.exception()))
+            else:
+                lock.release()
+
+    def _settle(self, op: Operation, task: asyncio.Task):
+        """Record the outcome once the operation's task is done (including cancelled before start)"""
+        op.finished_at = time.time()
+        if task.cancelled():
+            op.error = 'cancelled while running; result abandoned' if op.state == 'running' else 'cancelled'
+            op.state = 'cancelled'
+            self.cancelled += 1
+        elif task.exception() is not None:
+            op.state = 'failed'
+            op.error = str(task.exception())
+            self.failed += 1
+            logger.error(f"Docker {op.kind} on {op.target} failed: {op.error}")
+        else:
+            op.state = 'succeeded'
+            op.result = task.result()
+            self.succeeded += 1
+
+    def cancel(self, op_id: str) -> bool:
+        """Cancel a queued or running operation"""
+        op = self._operations.get(op_id)
+        if op is None or op.state not in ACTIVE_STATES:
+            return False
+        op.task.cancel()
+        return True
+
+    def get(self, op_id: str) -> Optional[Operation]:
+        return self._operations.get(op_id)
+
+    def operations(self, limit: int = 50) -> List[Operation]:
+        """Most recent operations, newest first"""
+        return list(reversed(self._operations.values()))[:limit]
+
+    def _trim_history(self):
+        while len(self._operations) > self.history:
+            oldest = next(iter(self._operations.values()))
+            if oldest.state in ACTIVE_STATES:
+                break
+            self._operations.popitem(last=False)
+
+    async def shutdown(self):
+        """Cancel outstanding operations and stop the pool"""
+        tasks = [op.task for op in self._operations.values() if op.state in ACTIVE_STATES]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+    def stats(self) -> Dict:
+        states = [op.state for op in self._operations.values()]
+        return {
+            'max_workers': self.max_workers,
+            'max_pending': self.max_pending,
+            'queued': states.count('queued'),
+            'running': states.count('running'),
+            'submitted': self.submitted,
+            'succeeded': self.succeeded,
+            'failed': self.failed,
+            'cancelled': self.cancelled,
+            'rejected': self.rejected,
+        }
@@ -0,0 +1,235 @@
+#!/usr/bin/env python3
+"""
+HEADY_BRAND:BEGIN
+╔══════════════════════════════════════════════════════════════════╗
+║  HeadySync MIDI Bridge - LED Renderer                             ║
+║  "The pads glow with the state of the stack"                      ║
+╚══════════════════════════════════════════════════════════════════╝
+HEADY_BRAND:END
+
+Owns the MIDI output. Callers change the model; the render loop puts the
+difference on the wire. Nothing in the input path sends MIDI.
+
+* The model has two layers. ``set`` gives a pad its persistent colour (for
+  example a container's status). ``flash`` lays a colour over it for a
+  while (for example feedback for a pad hit).
+* Flash expiries sit in a heap. The loop sleeps until the next one is due,
+  then reverts the pad to its base colour. That revert is the note-off, now
+  actually delayed, instead of being sent right after the note-on.
+* Frames go out at most every ``frame_interval`` seconds. Each frame sends
+  one message per pad whose wanted colour differs from what the device
+  last got. Changes between frames collapse into that one message.
+  ``max_rate`` caps messages per second; pads over the budget wait for the
+  next frame.
+
+On the Launchkey pads the velocity picks a palette colour and the channel
+picks the behaviour (static, flashing or pulsing).
+"""
+
+import asyncio
+import heapq
+import logging
+import time
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+import mido
+
+logger = logging.getLogger(__name__)
+
+# Novation palette indices
+OFF, WHITE, RED, AMBER, YELLOW, GREEN, BLUE = 0, 3, 5, 9, 13, 21, 45
+# Launchkey pad behaviour by MIDI channel
+STATIC, FLASHING, PULSING = 0, 1, 2
+
+
+class Led(NamedTuple):
+    color: int
+    channel: int = STATIC
+
+
+DARK = Led(OFF)
+STATUS_LEDS = {
+    'up': Led(GREEN),
+    'starting': Led(YELLOW, PULSING),
+    'deploying': Led(AMBER, PULSING),
+    'unhealthy': Led(AMBER, FLASHING),
+    'down': Led(RED),
+    'unknown': Led(WHITE),
+}
+
+
+def container_status(state: Optional[Dict]) -> str:
+    """Pad status for a ContainerStateCache entry"""
+    if not state:
+        return 'unknown'
+    status, health = state.get('status'), state.get('health')
+    if status == 'running':
+        return {'starting': 'starting', 'unhealthy': 'unhealthy'}.get(health, 'up')
+    if status in ('created', 'restarting'):
+        return 'deploying'
+    if status == 'error':
+        return 'unknown'
+    return 'down'
+
+
+def parse_pads(spec: str) -> Dict[str, int]:
+    """``"heady_mqtt=36,heady_oracle=38"`` -> {name: note}"""
+    pads = {}
+    for item in spec.split(','):
+        if '=' in item:
+            name, note = item.split('=', 1)
+            pads[name.strip()] = int(note)
+    return pads
+
+
+class LedRenderer:
+    """Frame-based LED state with delayed reverts and a rate-limited, coalesced output"""
+
+    def __init__(self, frame_interval: float = 0.02, max_rate: float = 500.0, flash_duration: float = 0.15):
+        self.frame_interval = frame_interval
+        self.max_rate = max_rate
+        self.flash_duration = flash_duration
+        self.port = None
+
+        self._base: Dict[int, Led] = {}
+        self._overlay: Dict[int, Tuple[Led, float]] = {}
+        self._expiries: List[Tuple[float, int, int]] = []
+        self._sequence = 0
+        self._sent: Dict[int, Led] = {}
+        self._dirty: Dict[int, None] = {}  # insertion-ordered set: oldest change goes out first
+        self._wake = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._last_frame = float('-inf')
+
+        self.frames = 0
+        self.messages = 0
+        self.coalesced = 0
+        self.deferred = 0
+        self.send_errors = 0
+
+    # Model
+
+    def set(self, note: int, led: Led):
+        """Persistent colour of ``note``"""
+        self._base[note] = led
+        self._touch(note)
+
+    def flash(self, note: int, color: int, duration: Optional[float] = None, channel: int = STATIC):
+        """Show ``color`` on ``note`` for ``duration`` seconds, then return to its base colour"""
+        expires_at = time.monotonic() + (duration if duration is not None else self.flash_duration)
+        self._overlay[note] = (Led(color, channel), expires_at)
+        self._sequence += 1
+        heapq.heappush(self._expiries, (expires_at, self._sequence, note))
+        self._touch(note)
+
+    def attach(self, port):
+        """Render to ``port``, replaying the whole model onto it"""
+        self.port = port
+        self._sent.clear()
+        for note in {**self._base, **self._overlay}:
+            self._touch(note)
+
+    def wanted(self, note: int) -> Led:
+        overlay = self._overlay.get(note)
+        return overlay[0] if overlay else self._base.get(note, DARK)
+
+    def _touch(self, note: int):
+        if note in self._dirty:
+            self.coalesced += 1
+        else:
+            self._dirty[note] = None
+        self._wake.set()
+
+    def _expire(self, now: float):
+        while self._expiries and self._expiries[0][0] <= now:
+            expires_at, _, note = heapq.heappop(self._expiries)
+            overlay = self._overlay.get(note)
+            # A later flash of the same pad replaced this one; its own entry is still queued
+            if overlay and overlay[1] == expires_at:
+                del self._overlay[note]
+                self._touch(note)
+
+    # Output
+
+    def _render(self):
+        """Send up to one frame's budget of changed pads"""
+        budget = max(1, int(self.max_rate * self.frame_interval))
+        for note in list(self._dirty):
+            led = self.wanted(note)
+            if self._sent.get(note, DARK) == led:
+                del self._dirty[note]
+                self.coalesced += 1
+                continue
+            if budget == 0:
+                self.deferred += 1
+                continue
+            try:
+                if led.color == OFF:
+                    self.port.send(mido.Message('note_off', note=note, channel=self._sent[note].channel))
+                else:
+                    self.port.send(mido.Message('note_on', note=note, velocity=led.color, channel=led.channel))
+            except Exception as e:
+                self.send_errors += 1
+                logger.error(f"Error sending MIDI feedback: {e}")
+            self._sent[note] = led
+            del self._dirty[note]
+            self.messages += 1
+            budget -= 1
+        self.frames += 1
+
+    async def _run(self):
+        while True:
+            self._wake.clear()
+            self._expire(time.monotonic())
+            if self._dirty and self.port is not None:
+                # Hold the frame back so changes arriving in the meantime are coalesced into it
+                wait = self._last_frame + self.frame_interval - time.monotonic()
+                if wait > 0:
+                    await asyncio.sleep(wait)
+                    self._expire(time.monotonic())
+                self._render()
+                self._last_frame = time.monotonic()
+                if self._dirty:
+                    continue
+
+            timeout = self._expiries[0][0] - time.monotonic() if self._expiries else None
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self, blank: bool = True):
+        """Stop rendering; ``blank`` switches off every lit pad first"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if blank and self.port is not None:
+            for note, led in list(self._sent.items()):
+                if led.color != OFF:
+                    try:
+                        self.port.send(mido.Message('note_off', note=note, channel=led.channel))
+                    except Exception as e:
+                        logger.error(f"Error blanking MIDI LEDs: {e}")
+                        break
+            self._sent.clear()
+
+    def stats(self) -> Dict:
+        return {
+            'attached': self.port is not None,
+            'lit': sum(1 for led in self._sent.values() if led.color != OFF),
+            'pending': len(self._dirty),
+            'flashes_scheduled': len(self._overlay),
+            'frames': self.frames,
+            'messages': self.messages,
+            'coalesced': self.coalesced,
+            'deferred': self.deferred,
+            'send_errors': self.send_errors,
+        }
@@ -12,28 +12,134 @@ import asyncio
 import json
 import logging
 import os
-from typing import Dict, Optional
+import shlex
+import time
+from datetime import datetime
+from typing import Dict, Optional, Set
 
-import docker
 import mido
-from fastapi import FastAPI
+from fastapi import Body, FastAPI, WebSocket, WebSocketDisconnect
+from fastapi.responses import JSONResponse
 import uvicorn
 
+from .autoscaler import Autoscaler, ScalingPolicy
+from .compose import ComposeRunner
+from .config_channel import ConfigChannel, LiveConfigError, RestartRequired
+from .container_state import ContainerStateCache
+from .docker_ops import DockerExecutor, OperationRejected, restart_container
+from .led_renderer import STATUS_LEDS, LedRenderer, container_status, parse_pads
+from .midi_devices import DeviceProfile, MidiDeviceManager
+from .midi_input import MidiInputStream, note_number_to_name
+from .rollout import blue_green_swap
+from .scheduler import ActionScheduler, parse_debounce
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 app = FastAPI(title="HeadySync MIDI Bridge", version="1.0.0")
 
+# Containers watched by the health report and status view
+HEADY_CONTAINERS = ['heady_mqtt', 'heady_vault', 'heady_oracle', 'heady_viz', 'heady_auditor']
+
+# How a container is recreated when a setting cannot be applied live: the readiness URL
+# of the replacement and variables that must differ between the two while both run
+ROLLOUT_PROFILES = {
+    'heady_oracle': {
+        'ready_url': 'http://{name}:8080/ready',
+        'alternates': {'ORACLE_SPOOL_DIR': ('/app/spool', '/app/spool/alt')},
+    },
+}
+
 class HeadyMIDIController:
     """Maps MIDI events to system administration actions"""
     
     def __init__(self):
-        self.docker_client = docker.from_env()
-        self.midi_input = None
+        self.docker = DockerExecutor(
+            max_workers=int(os.getenv('DOCKER_MAX_WORKERS', '4')),
+            max_pending=int(os.getenv('DOCKER_MAX_PENDING', '64')),
+            api_timeout=float(os.getenv('DOCKER_API_TIMEOUT', '60'))
+        )
+        self.restart_grace = int(os.getenv('DOCKER_RESTART_GRACE', '10'))
+        self.container_state = ContainerStateCache(
+            self.docker, HEADY_CONTAINERS,
+            reconcile_interval=float(os.getenv('CONTAINER_RECONCILE_INTERVAL', '30'))
+        )
+        self._background: Set[asyncio.Task] = set()
+        
+        # Settings go to running services over /config; restart-only keys fall back to a blue/green swap
+        self.config_channel = ConfigChannel(
+            {'heady_oracle': os.getenv('HEADY_ORACLE_URL', 'http://heady_oracle:8080')},
+            timeout=float(os.getenv('LIVE_CONFIG_TIMEOUT', '2.0'))
+        )
+        self.rollout_ready_timeout = float(os.getenv('ROLLOUT_READY_TIMEOUT', '120'))
+        self.maintenance_mode = os.getenv('MAINTENANCE_MODE', 'false').lower() in ('true', '1', 'yes', 'on')
+        
+        # Oracle worker count follows its load; the scaling pads override it
+        self.autoscaler = Autoscaler(
+            self.docker, 'heady_oracle', self._apply_oracle_workers,
+            metrics_url=f"{os.getenv('HEADY_ORACLE_URL', 'http://heady_oracle:8080')}/metrics",
+            policy=ScalingPolicy(
+                min_replicas=int(os.getenv('AUTOSCALE_MIN_WORKERS', '1')),
+                max_replicas=int(os.getenv('AUTOSCALE_MAX_WORKERS', '4')),
+                queue_high=float(os.getenv('AUTOSCALE_QUEUE_HIGH', '500')),
+                queue_low=float(os.getenv('AUTOSCALE_QUEUE_LOW', '50')),
+                latency_high=float(os.getenv('AUTOSCALE_LATENCY_HIGH_MS', '250')) / 1000,
+                latency_low=float(os.getenv('AUTOSCALE_LATENCY_LOW_MS', '50')) / 1000,
+                cpu_high=float(os.getenv('AUTOSCALE_CPU_HIGH', '80')),
+                cpu_low=float(os.getenv('AUTOSCALE_CPU_LOW', '30')),
+                memory_ceiling=float(os.getenv('AUTOSCALE_MEMORY_CEILING', '85')),
+                up_after=int(os.getenv('AUTOSCALE_UP_AFTER', '2')),
+                down_after=int(os.getenv('AUTOSCALE_DOWN_AFTER', '4')),
+                up_cooldown=float(os.getenv('AUTOSCALE_UP_COOLDOWN', '120')),
+                down_cooldown=float(os.getenv('AUTOSCALE_DOWN_COOLDOWN', '600'))
+            ),
+            interval=float(os.getenv('AUTOSCALE_INTERVAL', '15')),
+            override_hold=float(os.getenv('AUTOSCALE_OVERRIDE_HOLD', '900')),
+            enabled=os.getenv('AUTOSCALE_ENABLED', 'true').lower() == 'true'
+        )
+        
+        # docker-compose reads COMPOSE_FILE / COMPOSE_PROJECT_NAME itself; staging is a separate file and project
+        compose_settings = dict(
+            command=os.getenv('COMPOSE_COMMAND', 'docker-compose'),
+            timeout=float(os.getenv('COMPOSE_TIMEOUT', '600')),
+            kill_grace=float(os.getenv('COMPOSE_KILL_GRACE', '10')),
+            max_parallel=int(os.getenv('COMPOSE_PULL_PARALLEL', '4'))
+        )
+        self.compose = ComposeRunner('compose', **compose_settings)
+        staging_file = os.getenv('COMPOSE_STAGING_FILE')
+        self.staging_compose = ComposeRunner(
+            'staging', files=[staging_file], project_name=os.getenv('COMPOSE_STAGING_PROJECT', 'heady_staging'),
+            **compose_settings
+        ) if staging_file else None
+        self.compose_runners = [r for r in (self.compose, self.staging_compose) if r is not None]
+        self.report_dir = os.getenv('REPORT_DIR', 'reports')
+        self.last_log_rotation: Optional[datetime] = None
+        
+        self.scheduler = ActionScheduler(
+            debounce=float(os.getenv('ACTION_DEBOUNCE_SECONDS', '2.0')),
+            debounce_overrides=parse_debounce(os.getenv('ACTION_DEBOUNCE', '')),
+            cc_interval=float(os.getenv('CC_MIN_INTERVAL_MS', '50')) / 1000,
+            concurrency=int(os.getenv('ACTION_CONCURRENCY', '4'))
+        )
         self.midi_output = None
+        
+        # Pad LEDs: feedback flashes and per-container status colours, rendered off the input path
+        self.leds = LedRenderer(
+            frame_interval=float(os.getenv('LED_FRAME_MS', '20')) / 1000,
+            max_rate=float(os.getenv('LED_MAX_MESSAGES_PER_SECOND', '500')),
+            flash_duration=float(os.getenv('LED_FLASH_MS', '150')) / 1000
+        )
+        self.status_pads = parse_pads(os.getenv(
+            'LED_STATUS_PADS', 'heady_mqtt=40,heady_vault=41,heady_oracle=42,heady_viz=43,heady_auditor=44'))
+        self.container_state.add_listener(self._show_status)
+        self.midi_stream = MidiInputStream(max_queue=int(os.getenv('MIDI_INPUT_QUEUE_SIZE', '1024')))
         self.active_containers = {}
         
+        # Arrival-to-dispatch latency of the most recent and slowest MIDI message
+        self.last_dispatch_latency = 0.0
+        self.max_dispatch_latency = 0.0
+        
         # MIDI to Action Mapping
         self.action_map = {
             # Novation Launchkey MK4 mappings
@@ -61,92 +167,193 @@ class HeadyMIDIController:
             'CC3': self.adjust_backoff_rate,
         }
         
+        # Every matching device is opened, each with its own profile (MIDI_PROFILES); this map is the fallback
+        self.devices = MidiDeviceManager(
+            self.midi_stream,
+            fallback=DeviceProfile(
+                'default',
+                notes={key: handler for key, handler in self.action_map.items() if not key.startswith('CC')},
+                controls={key: handler for key, handler in self.action_map.items() if key.startswith('CC')}
+            ),
+            keywords=os.getenv('MIDI_DEVICE_KEYWORDS', 'launchkey,novation,pyle,midi').split(','),
+            actions={handler.__name__: handler for handler in self.action_map.values()},
+            profiles_path=os.getenv('MIDI_PROFILES', 'config/midi_profiles.json'),
+            scan_interval=float(os.getenv('MIDI_HOTPLUG_INTERVAL', '2')),
+            on_output=self._attach_output
+        )
+        
     async def initialize(self):
         """Initialize MIDI connections"""
+        # Devices plugged in later are picked up by the hot-plug scan, so always listen
+        asyncio.create_task(self._listen_for_midi())
         try:
-            # Find MIDI devices
-            midi_inputs = mido.get_input_names()
-            midi_outputs = mido.get_output_names()
-            
-            logger.info(f"Available MIDI inputs: {midi_inputs}")
-            logger.info(f"Available MIDI outputs: {midi_outputs}")
-            
-            # Try to connect to common devices
-            for device_name in midi_inputs:
-                if any(keyword in device_name.lower() for keyword in ['launchkey', 'novation', 'pyle', 'midi']):
-                    self.midi_input = mido.open_input(device_name)
-                    logger.info(f"Connected to MIDI input: {device_name}")
-                    break
-            
-            for device_name in midi_outputs:
-                if any(keyword in device_name.lower() for keyword in ['launchkey', 'novation', 'pyle', 'midi']):
-                    self.midi_output = mido.open_output(device_name)
-                    logger.info(f"Connected to MIDI output: {device_name}")
-                    break
-            
-            if self.midi_input:
-                # Start listening for MIDI messages
-                asyncio.create_task(self._listen_for_midi())
-            else:
-                logger.warning("No MIDI input device found - running in simulation mode")
-                
+            await self.devices.scan()
+            if not self.devices.devices:
+                logger.warning("No MIDI input device found - running in simulation mode until one is plugged in")
         except Exception as e:
             logger.error(f"Error initializing MIDI: {e}")
+        self.devices.start()
+    
+    def _attach_output(self, port):
+        """The feedback output appeared or went away"""
+        self.midi_output = port
+        self.leds.attach(port)
     
     async def _listen_for_midi(self):
-        """Listen for MIDI messages and trigger actions"""
+        """Dispatch MIDI messages from all devices as the input callbacks deliver them"""
         while True:
-            try:
-                for msg in self.midi_input.iter_pending():
-                    await self._process_midi_message(msg)
-                await asyncio.sleep(0.01)  # Small delay to prevent CPU spinning
-            except Exception as e:
-                logger.error(f"Error processing MIDI message: {e}")
-                await asyncio.sleep(1)
-    
-    async def _process_midi_message(self, msg):
+            msg, received_at, port_name = await self.midi_stream.get()
+            self.last_dispatch_latency = time.perf_counter() - received_at
+            self.max_dispatch_latency = max(self.max_dispatch_latency, self.last_dispatch_latency)
+            await self._process_midi_message(msg, self.devices.devices.get(port_name) or self.devices.fallback)
+    
+    async def _process_midi_message(self, msg, profile: Optional[DeviceProfile] = None):
         """Process individual MIDI message"""
+        profile = profile or self.devices.fallback
         try:
+            if profile.channel is not None and getattr(msg, 'channel', None) != profile.channel:
+                return
+            
             if msg.type == 'note_on' and msg.velocity > 0:
-                note_name = midi.note_number_to_name(msg.note)
-                logger.info(f"MIDI Note ON: {note_name} (velocity: {msg.velocity})")
+                handler = profile.notes[msg.note]
+                logger.info(f"MIDI Note ON: {note_number_to_name(msg.note)} (velocity: {msg.velocity}, "
+                            f"profile: {profile.name})")
                 
-                if note_name in self.action_map:
-                    await self.action_map[note_name]()
-                    self._send_feedback(msg.note, msg.velocity)
+                if handler is not None:
+                    outcome = self.scheduler.submit(handler)
+                    logger.info(f"Action {handler.__name__}: {outcome}")
+                    if profile.feedback:
+                        self._send_feedback(msg.note, msg.velocity)
                     
             elif msg.type == 'control_change':
-                controller_name = f"CC{msg.control}"
-                logger.info(f"MIDI CC: {controller_name} (value: {msg.value})")
+                handler = profile.controls[msg.control]
+                logger.debug(f"MIDI CC{msg.control} (value: {msg.value}, profile: {profile.name})")
                 
-                if controller_name in self.action_map:
-                    await self.action_map[controller_name](msg.value)
+                if handler is not None:
+                    self.scheduler.submit(handler, msg.value, continuous=True)
                     
         except Exception as e:
             logger.error(f"Error processing MIDI message {msg}: {e}")
     
     def _send_feedback(self, note: int, velocity: int):
         """Send visual feedback via MIDI output"""
-        if self.midi_output:
-            try:
-                # Send note back with different velocity for visual feedback
-                self.midi_output.send(mido.Message('note_on', note=note, velocity=min(velocity + 20, 127)))
-                asyncio.create_task(asyncio.sleep(0.1))
-                self.midi_output.send(mido.Message('note_off', note=note))
-            except Exception as e:
-                logger.error(f"Error sending MIDI feedback: {e}")
+        # Light the pad brighter than it was hit; the renderer switches it back off
+        self.leds.flash(note, min(velocity + 20, 127))
+    
+    def _show_status(self, name: str, state: Optional[Dict] = None):
+        """Colour a container's status pad from its state (default: the cached state)"""
+        if name in self.status_pads:
+            status = container_status(state or self.container_state.cached(name))
+            self.leds.set(self.status_pads[name], STATUS_LEDS[status])
+    
+    def _show_deploying(self, names):
+        for name in names:
+            if name in self.status_pads:
+                self.leds.set(self.status_pads[name], STATUS_LEDS['deploying'])
     
     # Action implementations
     async def deploy_production(self):
         """Deploy to production (C4 on Launchkey)"""
         logger.info("🚀 DEPLOYING TO PRODUCTION")
         try:
-            # Pull latest and restart services
-            await self._docker_compose('pull')
+            # Pull latest (per service, in parallel) and restart services
+            self._show_deploying(self.status_pads)
+            await self.compose.pull()
             await self._docker_compose('up -d')
             await self._notify_success("Production deployment complete")
         except Exception as e:
             await self._notify_error(f"Production deployment failed: {e}")
+        finally:
+            self._refresh_status()
+    
+    async def deploy_staging(self):
+        """Deploy to staging (D4 on Launchkey)"""
+        logger.info("🧪 DEPLOYING TO STAGING")
+        if self.staging_compose is None:
+            await self._notify_error("Staging deployment failed: COMPOSE_STAGING_FILE is not set")
+            return
+        try:
+            await self.staging_compose.pull()
+            await self.staging_compose.run(['up', '-d'])
+            await self._notify_success("Staging deployment complete")
+        except Exception as e:
+            await self._notify_error(f"Staging deployment failed: {e}")
+    
+    async def start_all_services(self):
+        """Start all services (Kick Drum)"""
+        logger.info("▶️ STARTING ALL SERVICES")
+        try:
+            self._show_deploying(self.status_pads)
+            await self._docker_compose('up -d')
+            await self._notify_success("All services started")
+        except Exception as e:
+            await self._notify_error(f"Start all services failed: {e}")
+        finally:
+            self._refresh_status()
+    
+    async def restart_all_services(self):
+        """Restart all services (Snare)"""
+        logger.info("🔄 RESTARTING ALL SERVICES")
+        try:
+            self._show_deploying(self.status_pads)
+            await self._docker_compose('restart')
+            await self._notify_success("All services restarted")
+        except Exception as e:
+            await self._notify_error(f"Restart all services failed: {e}")
+        finally:
+            self._refresh_status()
+    
+    async def backup_data(self):
+        """Back up InfluxDB into its data volume (A4 on Launchkey)"""
+        target = f"/var/lib/influxdb2/backups/heady-{datetime.now():%Y%m%d-%H%M%S}"
+        logger.info(f"💾 BACKING UP DATA to {target}")
+        try:
+            await self._docker_compose(f'exec -T influxdb influx backup {target}')
+            await self._notify_success(f"Backup written to {target}")
+        except Exception as e:
+            await self._notify_error(f"Backup failed: {e}")
+    
+    async def rotate_logs(self):
+        """Archive service logs since the last rotation (Low Tom)"""
+        logger.info("🗂️ ROTATING LOGS")
+        try:
+            now = datetime.now()
+            command = ['logs', '--no-color', '--timestamps']
+            if self.last_log_rotation:
+                command += ['--since', self.last_log_rotation.isoformat(timespec='seconds')]
+            job = await self.compose.run(command, capture=True, quiet=True)
+            path = os.path.join(self.report_dir, 'logs', f"heady-{now:%Y%m%d-%H%M%S}.log")
+            await asyncio.to_thread(self._write_file, path, '\n'.join(job.output) + '\n')
+            self.last_log_rotation = now
+            await self._notify_success(f"Archived {len(job.output)} log lines to {path}")
+        except Exception as e:
+            await self._notify_error(f"Log rotation failed: {e}")
+    
+    async def generate_report(self):
+        """Write a status report of containers, compose services and recent operations (Ride Cymbal)"""
+        logger.info("📝 GENERATING REPORT")
+        try:
+            now = datetime.now()
+            ps = await self.compose.run(['ps'], capture=True, quiet=True)
+            report = {
+                'generated_at': now.isoformat(),
+                'containers': await self.container_state.snapshot(),
+                'compose_ps': ps.output,
+                'docker_operations': [op.to_dict() for op in self.docker.operations()],
+                'compose_jobs': [job.to_dict() for job in self.compose.jobs()],
+                'scheduler': self.scheduler.stats()
+            }
+            path = os.path.join(self.report_dir, f"heady-report-{now:%Y%m%d-%H%M%S}.json")
+            await asyncio.to_thread(self._write_file, path, json.dumps(report, indent=2, default=str))
+            await self._notify_success(f"Report written to {path}")
+        except Exception as e:
+            await self._notify_error(f"Report generation failed: {e}")
+    
+    @staticmethod
+    def _write_file(path: str, content: str):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w') as f:
+            f.write(content)
     
     async def emergency_stop(self):
         """Emergency stop all services (Crash Cymbal)"""
@@ -160,40 +367,113 @@ class HeadyMIDIController:
     async def restart_oracle(self):
         """Restart Heady Oracle service"""
         logger.info("🔄 RESTARTING HEADY ORACLE")
+        self.queue_restart('heady_oracle', "Oracle")
+    
+    async def scale_oracle(self):
+        """Pin the oracle worker count, or hand it back to the autoscaler (G4 on Launchkey)"""
+        if self.autoscaler.toggle_hold():
+            logger.info(f"📌 ORACLE SCALING PINNED (workers: {self.autoscaler.replicas or 'not sampled yet'})")
+            await self._notify_success("Autoscaling paused until G4 is pressed again")
+        else:
+            logger.info("📈 ORACLE SCALING BACK ON AUTOPILOT")
+            await self._notify_success("Autoscaling resumed")
+    
+    async def scale_up_services(self):
+        """Add an oracle worker now, overriding the autoscaler (Hi tom)"""
+        logger.info("⬆️ SCALING UP")
+        await self._report_scaling(await self.autoscaler.step(+1))
+    
+    async def scale_down_services(self):
+        """Remove an oracle worker now, overriding the autoscaler (Mid tom)"""
+        logger.info("⬇️ SCALING DOWN")
+        await self._report_scaling(await self.autoscaler.step(-1))
+    
+    async def _report_scaling(self, decision: Optional[Dict]):
+        if decision is None:
+            return
+        if decision['applied']:
+            await self._notify_success(f"Oracle scaled to {decision['to']} workers")
+        else:
+            await self._notify_error(f"Oracle scaling to {decision['to']} workers failed")
+    
+    async def _apply_oracle_workers(self, workers: int) -> bool:
+        return await self.update_env('heady_oracle', {'ORACLE_WORKERS': str(workers)})
+    
+    async def restart_grafana(self):
+        """Restart Grafana dashboards (F4 on Launchkey)"""
+        logger.info("🔄 RESTARTING GRAFANA")
+        self.queue_restart('heady_viz', "Grafana")
+    
+    def queue_restart(self, container_name: str, label: str):
+        """Queue a container restart; the outcome is notified when it finishes"""
+        try:
+            op = self.docker.submit('restart', container_name, restart_container, container_name, self.restart_grace)
+        except OperationRejected as e:
+            self._spawn(self._notify_error(f"{label} restart not queued: {e}"))
+            return None
+        self._show_deploying([container_name])
+        self._spawn(self._report(op, f"{label} restarted", f"{label} restart failed"))
+        return op
+    
+    async def _report(self, op, success: str, failure: str):
+        """Notify the outcome of a Docker operation"""
         try:
-            container = self.docker_client.containers.get('heady_oracle')
-            container.restart()
-            await self._notify_success("Oracle restarted")
+            await self.docker.wait(op)
+            await self._notify_success(success)
+        except asyncio.CancelledError:
+            await self._notify_error(f"{failure}: cancelled")
         except Exception as e:
-            await self._notify_error(f"Oracle restart failed: {e}")
+            await self._notify_error(f"{failure}: {e}")
+        finally:
+            self._refresh_status([op.target])
+    
+    def _refresh_status(self, names=None):
+        """Recheck containers after an operation; events are not guaranteed if nothing changed"""
+        self._spawn(self.container_state.reconcile(names))
+        for name in names or self.status_pads:
+            self._show_status(name)
+    
+    def _spawn(self, coro):
+        """Run a coroutine in the background, keeping a reference until it finishes"""
+        task = asyncio.create_task(coro)
+        self._background.add(task)
+        task.add_done_callback(self._background.discard)
+        return task
     
     async def adjust_ai_temperature(self, value: int):
         """Adjust AI model temperature (CC1 knob)"""
         # Map MIDI value (0-127) to temperature (0.1-2.0)
         temperature = 0.1 + (value / 127.0) * 1.9
         logger.info(f"🌡️ Adjusting AI temperature to {temperature:.2f}")
-        
-        # TODO: Update environment variable in oracle container
-        await self._update_env_var('heady_oracle', 'AI_TEMPERATURE', str(temperature))
+        await self._update_env_var('heady_oracle', 'AI_TEMPERATURE', f"{temperature:.2f}")
+    
+    async def adjust_verification_threshold(self, value: int):
+        """Adjust the signature verification threshold (CC2 knob)"""
+        # Map MIDI value (0-127) to threshold (0.5-0.999)
+        threshold = 0.5 + (value / 127.0) * 0.499
+        logger.info(f"🔏 Adjusting verification threshold to {threshold:.3f}")
+        await self._update_env_var('heady_oracle', 'VERIFICATION_THRESHOLD', f"{threshold:.3f}")
+    
+    async def adjust_backoff_rate(self, value: int):
+        """Adjust the InfluxDB write backoff base delay (CC3 knob)"""
+        # Map MIDI value (0-127) to base delay (100-5000 ms)
+        delay_ms = int(100 + (value / 127.0) * 4900)
+        logger.info(f"⏱️ Adjusting backoff base delay to {delay_ms} ms")
+        await self._update_env_var('heady_oracle', 'BACKOFF_BASE_DELAY_MS', str(delay_ms))
+    
+    async def toggle_maintenance_mode(self):
+        """Toggle oracle maintenance mode (Hi-hat)"""
+        enabled = not self.maintenance_mode
+        logger.info(f"🚧 {'ENTERING' if enabled else 'LEAVING'} MAINTENANCE MODE")
+        if await self._update_env_var('heady_oracle', 'MAINTENANCE_MODE', str(enabled).lower()):
+            self.maintenance_mode = enabled
     
     async def system_health(self):
         """Generate system health report (B4 on Launchkey)"""
         logger.info("📊 GENERATING SYSTEM HEALTH REPORT")
         try:
-            health_status = {}
-            
-            # Check all Heady containers
-            containers = ['heady_mqtt', 'heady_vault', 'heady_oracle', 'heady_viz', 'heady_auditor']
-            
-            for container_name in containers:
-                try:
-                    container = self.docker_client.containers.get(container_name)
-                    health_status[container_name] = {
-                        'status': container.status,
-                        'health': container.attrs.get('State', {}).get('Health', {}).get('Status', 'unknown')
-                    }
-                except Exception as e:
-                    health_status[container_name] = {'status': 'error', 'error': str(e)}
+            # Answered from the event-fed container state view
+            health_status = await self.container_state.snapshot(HEADY_CONTAINERS)
             
             # Log and store report
             report = {
@@ -208,14 +488,51 @@ class HeadyMIDIController:
             await self._notify_error(f"Health report failed: {e}")
     
     async def _docker_compose(self, command: str):
-        """Execute docker-compose command"""
-        # TODO: Implement actual docker-compose execution
-        logger.info(f"Executing: docker-compose {command}")
+        """Execute docker-compose command, streaming its output; raises ComposeError on failure"""
+        return await self.compose.run(shlex.split(command))
     
-    async def _update_env_var(self, container_name: str, key: str, value: str):
+    async def _update_env_var(self, container_name: str, key: str, value: str) -> bool:
         """Update environment variable in container"""
-        # TODO: Implement environment variable update
-        logger.info(f"Updating {container_name}: {key}={value}")
+        return await self.update_env(container_name, {key: value})
+    
+    def configurable(self, container_name: str) -> bool:
+        """Whether settings can be pushed to ``container_name`` (live or by a swap)"""
+        return container_name in ROLLOUT_PROFILES or self.config_channel.supports(container_name)
+    
+    async def update_env(self, container_name: str, updates: Dict[str, str]) -> bool:
+        """Apply settings live over /config, or recreate the container blue/green when they need a restart"""
+        try:
+            result = await self.config_channel.update(container_name, updates)
+            logger.info(f"Live config on {container_name} (v{result.get('version')}): {updates}")
+            return True
+        except RestartRequired as e:
+            logger.info(f"{e}; swapping in a replacement container")
+        except LiveConfigError as e:
+            await self._notify_error(f"Config update failed: {e}")
+            return False
+        
+        # The replacement starts from the running container's environment plus earlier live changes
+        env = {**await self.config_channel.current(container_name), **updates}
+        profile = ROLLOUT_PROFILES.get(container_name, {})
+        self._show_deploying([container_name])
+        try:
+            result = await self.docker.run(
+                'swap', container_name, blue_green_swap, container_name, env,
+                profile.get('ready_url'), profile.get('alternates'), self.rollout_ready_timeout, self.restart_grace
+            )
+        except OperationRejected as e:
+            await self._notify_error(f"{container_name} swap not queued: {e}")
+            return False
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            await self._notify_error(f"{container_name} swap failed: {e}")
+            return False
+        finally:
+            self._refresh_status([container_name])
+        await self._notify_success(f"{container_name} recreated with {', '.join(sorted(updates))} "
+                                   f"(ready in {result['ready_seconds']}s)")
+        return True
     
     async def _notify_success(self, message: str):
         """Send success notification"""
@@ -233,35 +550,162 @@ midi_controller = HeadyMIDIController()
 @app.on_event("startup")
 async def startup_event():
     """Initialize MIDI bridge on startup"""
+    midi_controller.container_state.start()
+    midi_controller.leds.start()
+    midi_controller.autoscaler.start()
     await midi_controller.initialize()
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Release the MIDI ports and stop Docker operations"""
+    await midi_controller.leds.stop()
+    await midi_controller.devices.stop()
+    await midi_controller.autoscaler.stop()
+    await midi_controller.scheduler.shutdown()
+    await midi_controller.container_state.stop()
+    await midi_controller.config_channel.close()
+    await midi_controller.docker.shutdown()
+
 @app.get("/health")
 async def health_check():
     """Health check endpoint"""
+    scheduler = midi_controller.scheduler.stats()
     return {
         "status": "healthy",
-        "midi_input": midi_controller.midi_input is not None,
+        "midi_input": bool(midi_controller.devices.devices),
         "midi_output": midi_controller.midi_output is not None,
+        "midi_devices": midi_controller.devices.stats(),
+        "midi_stream": {
+            **midi_controller.midi_stream.stats(),
+            "last_dispatch_latency_ms": round(midi_controller.last_dispatch_latency * 1000, 3),
+            "max_dispatch_latency_ms": round(midi_controller.max_dispatch_latency * 1000, 3)
+        },
+        "docker_operations": midi_controller.docker.stats(),
+        "live_config": midi_controller.config_channel.stats(),
+        "leds": midi_controller.leds.stats(),
+        "scheduler": {"queue_depth": scheduler["queue_depth"], "running": scheduler["running"]},
         "service": "HeadySync MIDI Bridge",
         "version": "1.0.0"
     }
 
+@app.get("/health/containers")
+async def container_health():
+    """Status and health of the Heady containers from the in-memory state view"""
+    return {
+        "containers": await midi_controller.container_state.snapshot(),
+        "stats": midi_controller.container_state.stats()
+    }
+
 @app.get("/mappings")
 async def get_mappings():
     """Get current MIDI to action mappings"""
+    devices = midi_controller.devices
     return {
         "action_map": {k: v.__name__ for k, v in midi_controller.action_map.items()},
-        "total_mappings": len(midi_controller.action_map)
+        "total_mappings": len(midi_controller.action_map),
+        "profiles": {p.name: p.describe() for p in devices.profiles + [devices.fallback]},
+        "devices": devices.stats()["devices"]
     }
 
+@app.get("/compose/jobs")
+async def list_compose_jobs(limit: int = 20):
+    """Recent docker-compose runs with the tail of their output"""
+    runners = midi_controller.compose_runners
+    jobs = sorted((job for r in runners for job in r.jobs(limit)), key=lambda job: job.started_at, reverse=True)
+    return {
+        "jobs": [job.to_dict() for job in jobs[:limit]],
+        "stats": {r.name: r.stats() for r in runners}
+    }
+
+@app.delete("/compose/jobs/{job_id}")
+async def cancel_compose_job(job_id: str):
+    """Cancel a running docker-compose job (terminates the process)"""
+    runners = midi_controller.compose_runners
+    if not any(r.cancel(job_id) for r in runners):
+        return JSONResponse(status_code=409, content={"error": f"Compose job {job_id} is not running"})
+    return {"message": f"Cancelling {job_id}"}
+
+@app.websocket("/ws/compose")
+async def compose_output(websocket: WebSocket):
+    """Live docker-compose output, one JSON message per line"""
+    await websocket.accept()
+    runners = midi_controller.compose_runners
+    subscriber = midi_controller.compose.subscribe()
+    for runner in runners[1:]:
+        runner.subscribe(subscriber)
+    try:
+        while True:
+            await websocket.send_json(await subscriber.get())
+    except WebSocketDisconnect:
+        pass
+    finally:
+        for runner in runners:
+            runner.unsubscribe(subscriber)
+
+@app.get("/autoscaler")
+async def autoscaler_status():
+    """Oracle worker count, the last metrics sample and recent scaling decisions"""
+    return midi_controller.autoscaler.stats()
+
+@app.get("/scheduler")
+async def scheduler_stats():
+    """Action queue depth, debounce/coalesce counts and latencies"""
+    return midi_controller.scheduler.stats()
+
 @app.post("/simulate/{action}")
-async def simulate_midi_action(action: str):
-    """Simulate MIDI action for testing"""
+async def simulate_midi_action(action: str, value: Optional[int] = None):
+    """Simulate MIDI action for testing (``value`` for CC mappings)"""
     if action in midi_controller.action_map:
-        await midi_controller.action_map[action]()
-        return {"message": f"Executed {action}"}
+        handler = midi_controller.action_map[action]
+        if action.startswith('CC'):
+            outcome = midi_controller.scheduler.submit(handler, value if value is not None else 64, continuous=True)
+        else:
+            outcome = midi_controller.scheduler.submit(handler)
+        return {"message": f"Scheduled {action}", "outcome": outcome}
     else:
         return {"error": f"Unknown action: {action}"}
 
+@app.get("/operations")
+async def list_operations(limit: int = 50):
+    """Recent Docker operations, newest first"""
+    return {
+        "operations": [op.to_dict() for op in midi_controller.docker.operations(limit)],
+        "stats": midi_controller.docker.stats()
+    }
+
+@app.get("/operations/{op_id}")
+async def get_operation(op_id: str):
+    """Status of one Docker operation"""
+    op = midi_controller.docker.get(op_id)
+    if op is None:
+        return JSONResponse(status_code=404, content={"error": f"Unknown operation: {op_id}"})
+    return op.to_dict()
+
+@app.delete("/operations/{op_id}")
+async def cancel_operation(op_id: str):
+    """Cancel a queued or running Docker operation"""
+    if not midi_controller.docker.cancel(op_id):
+        return JSONResponse(status_code=409, content={"error": f"Operation {op_id} is not pending"})
+    return {"message": f"Cancelling {op_id}"}
+
+@app.post("/containers/{container_name}/restart")
+async def restart_container_endpoint(container_name: str):
+    """Queue a container restart and return its operation for polling"""
+    if container_name not in HEADY_CONTAINERS:
+        return JSONResponse(status_code=404, content={"error": f"No managed container {container_name}"})
+    op = midi_controller.queue_restart(container_name, container_name)
+    if op is None:
+        return JSONResponse(status_code=429, content={"error": "Docker operation queue full"})
+    return JSONResponse(status_code=202, content=op.to_dict())
+
+@app.put("/config/{container_name}")
+async def update_container_config(container_name: str, updates: Dict[str, str] = Body(...)):
+    """Apply settings to a container, live where it supports it, otherwise by a blue/green swap"""
+    if not midi_controller.configurable(container_name):
+        return JSONResponse(status_code=404, content={"error": f"No configurable container {container_name}"})
+    if not await midi_controller.update_env(container_name, updates):
+        return JSONResponse(status_code=502, content={"error": f"Could not apply {sorted(updates)} to {container_name}"})
+    return {"container": container_name, "applied": updates}
+
 if __name__ == "__main__":
     uvicorn.run(app, host="0.0.0.0", port=8081)
@@ -0,0 +1,292 @@
+#!/usr/bin/env python3
+"""
+HEADY_BRAND:BEGIN
+╔══════════════════════════════════════════════════════════════════╗
+║  HeadySync MIDI Bridge - Devices and Mapping Profiles             ║
+║  "Keys and drums, one band"                                       ║
+╚══════════════════════════════════════════════════════════════════╝
+HEADY_BRAND:END
+
+Every input whose name matches a keyword is opened and fed into the shared
+MidiInputStream. Each device gets a mapping profile. The first profile
+whose ``match`` keywords appear in the port name wins; otherwise the
+fallback profile applies.
+
+Profiles live in a JSON file (``MIDI_PROFILES``)::
+
+    {"profiles": {
+        "pyle_drums": {
+            "match": ["pyle"],
+            "channel": 9,
+            "feedback": false,
+            "notes": {"kick_drum": "start_all_services", "C4": "deploy_production", "60": "..."},
+            "controls": {"CC1": "adjust_ai_temperature"}
+        }
+    }}
+
+Note keys can be note numbers, pitch names (``C4``) or General MIDI drum
+names (``kick_drum`` is 36). A drum name covers all of its GM variants
+(for example the closed, pedal and open hi-hat). ``channel`` is 0-based
+(9 is the GM drum channel) and ignores messages on other channels.
+Actions name controller methods. A profile is compiled once into two 128-slot tables (note and
+controller number to handler), so dispatch is one index. Unknown names
+fail at load.
+
+Hot-plug: ``scan`` compares the port list with the open devices, opens the
+new ones and closes the ones that vanished. It also re-reads the profile
+file when it changes. mido has no port-change notification, so a
+background task scans every ``scan_interval`` seconds. Enumeration is
+cheap and runs off the event loop.
+"""
+
+import asyncio
+import json
+import logging
+import os
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+import mido
+
+from .midi_input import MidiInputStream, note_name_to_number
+
+logger = logging.getLogger(__name__)
+
+# General MIDI percussion key map (channel 10), primary note first
+GM_DRUMS = {
+    'kick_drum': (36, 35),
+    'snare': (38, 40, 37),
+    'hi_hat': (42, 44, 46),
+    'crash_cymbal': (49, 57, 55),
+    'ride_cymbal': (51, 59, 53),
+    'hi_tom': (50, 48),
+    'mid_tom': (47,),
+    'low_tom': (45, 43, 41),
+}
+
+
+def resolve_notes(key: str) -> Tuple[int, ...]:
+    """Note numbers a profile key stands for; raises ValueError for unknown keys"""
+    if key in GM_DRUMS:
+        return GM_DRUMS[key]
+    if key.isdigit() and int(key) <= 127:
+        return (int(key),)
+    note = note_name_to_number(key)
+    if note is None:
+        raise ValueError(f"unknown note {key!r}")
+    return (note,)
+
+
+def resolve_control(key: str) -> int:
+    number = key[2:] if key.upper().startswith('CC') else key
+    if not number.isdigit() or int(number) > 127:
+        raise ValueError(f"unknown controller {key!r}")
+    return int(number)
+
+
+class DeviceProfile:
+    """Compiled note and controller lookup tables for one kind of device"""
+
+    def __init__(self, name: str, notes: Dict[str, Callable], controls: Dict[str, Callable],
+                 match: Iterable[str] = (), channel: Optional[int] = None, feedback: bool = True):
+        self.name = name
+        self.match = [keyword.lower() for keyword in match]
+        self.channel = channel
+        self.feedback = feedback
+        self.notes: List[Optional[Callable]] = [None] * 128
+        self.controls: List[Optional[Callable]] = [None] * 128
+        # Later keys win, so a specific note number can override a drum name's variants
+        for key, handler in notes.items():
+            for note in resolve_notes(key):
+                self.notes[note] = handler
+        for key, handler in controls.items():
+            self.controls[resolve_control(key)] = handler
+
+    def matches(self, port_name: str) -> bool:
+        lowered = port_name.lower()
+        return any(keyword in lowered for keyword in self.match)
+
+    def describe(self) -> Dict:
+        return {
+            'match': self.match,
+            'channel': self.channel,
+            'feedback': self.feedback,
+            'notes': {note: handler.__name__ for note, handler in enumerate(self.notes) if handler},
+            'controls': {f"CC{cc}": handler.__name__ for cc, handler in enumerate(self.controls) if handler},
+        }
+
+
+def load_profiles(path: str, actions: Dict[str, Callable]) -> List[DeviceProfile]:
+    """Profiles from a JSON file, resolving action names against ``actions``"""
+    with open(path) as f:
+        spec = json.load(f)
+
+    def handler(profile: str, action: str) -> Callable:
+        if action not in actions:
+            raise ValueError(f"profile {profile}: unknown action {action!r}")
+        return actions[action]
+
+    profiles = []
+    for name, entry in spec.get('profiles', {}).items():
+        profiles.append(DeviceProfile(
+            name,
+            notes={key: handler(name, action) for key, action in entry.get('notes', {}).items()},
+            controls={key: handler(name, action) for key, action in entry.get('controls', {}).items()},
+            match=entry.get('match', [name]),
+            channel=entry.get('channel'),
+            feedback=entry.get('feedback', True)
+        ))
+    return profiles
+
+
+class MidiDeviceManager:
+    """Opens matching MIDI devices as they appear and assigns their profiles"""
+
+    def __init__(self, stream: MidiInputStream, fallback: DeviceProfile, keywords: Iterable[str],
+                 actions: Dict[str, Callable], profiles_path: Optional[str] = None,
+                 scan_interval: float = 2.0, on_output: Optional[Callable] = None):
+        self.stream = stream
+        self.fallback = fallback
+        self.keywords = [keyword.lower() for keyword in keywords]
+        self.actions = actions
+        self.profiles_path = profiles_path
+        self.scan_interval = scan_interval
+        self.on_output = on_output
+
+        self.profiles: List[DeviceProfile] = []
+        self._profiles_mtime: Optional[float] = None
+        self.devices: Dict[str, DeviceProfile] = {}
+        self.output_name: Optional[str] = None
+        self.output = None
+        self._task: Optional[asyncio.Task] = None
+
+        self.scans = 0
+        self.connects = 0
+        self.disconnects = 0
+        self.load_profiles()
+
+    def load_profiles(self):
+        """(Re)load the profile file if it changed; a broken file keeps the previous profiles"""
+        if not self.profiles_path:
+            return
+        try:
+            mtime = os.path.getmtime(self.profiles_path)
+        except OSError:
+            if self._profiles_mtime is None:
+                logger.info(f"No MIDI profiles at {self.profiles_path}; using the built-in mapping")
+                self._profiles_mtime = 0.0
+            return
+        if mtime == self._profiles_mtime:
+            return
+        self._profiles_mtime = mtime
+        try:
+            self.profiles = load_profiles(self.profiles_path, self.actions)
+        except (OSError, ValueError) as e:
+            logger.error(f"MIDI profiles {self.profiles_path} not loaded: {e}")
+            return
+        logger.info(f"Loaded MIDI profiles: {[p.name for p in self.profiles]}")
+        for port_name in self.devices:
+            self.devices[port_name] = self.profile_for(port_name)
+
+    def profile_for(self, port_name: str) -> DeviceProfile:
+        return next((p for p in self.profiles if p.matches(port_name)), self.fallback)
+
+    def wanted(self, port_name: str) -> bool:
+        lowered = port_name.lower()
+        return (any(keyword in lowered for keyword in self.keywords)
+                or any(p.matches(port_name) for p in self.profiles))
+
+    async def scan(self) -> Tuple[List[str], List[str]]:
+        """Open new matching inputs and close vanished ones; returns (connected, disconnected)"""
+        self.scans += 1
+        self.load_profiles()
+        inputs, outputs = await asyncio.to_thread(lambda: (mido.get_input_names(), mido.get_output_names()))
+        present = set(inputs)
+
+        disconnected = [name for name in self.devices if name not in present]
+        for name in disconnected:
+            self.stream.close(name)
+            del self.devices[name]
+            self.disconnects += 1
+            logger.info(f"MIDI input disconnected: {name}")
+
+        connected = []
+        for name in inputs:
+            if name in self.devices or not self.wanted(name):
+                continue
+            try:
+                self.stream.open(name)
+            except Exception as e:
+                logger.error(f"Could not open MIDI input {name}: {e}")
+                continue
+            self.devices[name] = self.profile_for(name)
+            self.connects += 1
+            connected.append(name)
+            logger.info(f"Connected to MIDI input: {name} (profile {self.devices[name].name})")
+
+        self._scan_output(outputs)
+        return connected, disconnected
+
+    def _scan_output(self, outputs: List[str]):
+        """Keep one feedback output open on a device whose profile wants feedback"""
+        if self.output_name is not None and self.output_name not in outputs:
+            logger.info(f"MIDI output disconnected: {self.output_name}")
+            self._set_output(None, None)
+        if self.output_name is None:
+            name = next((n for n in outputs if self.wanted(n) and self.profile_for(n).feedback), None)
+            if name is not None:
+                try:
+                    self._set_output(name, mido.open_output(name))
+                    logger.info(f"Connected to MIDI output: {name}")
+                except Exception as e:
+                    logger.error(f"Could not open MIDI output {name}: {e}")
+
+    def _set_output(self, name: Optional[str], port):
+        previous = self.output
+        self.output_name, self.output = name, port
+        if self.on_output is not None:
+            self.on_output(port)
+        if previous is not None:
+            try:
+                previous.close()
+            except Exception as e:
+                logger.warning(f"Error closing MIDI output: {e}")
+
+    async def _run(self):
+        failing = False
+        while True:
+            await asyncio.sleep(self.scan_interval)
+            try:
+                await self.scan()
+                failing = False
+            except Exception as e:
+                # Once per outage (e.g. no MIDI backend), not every scan
+                if not failing:
+                    logger.error(f"MIDI device scan failed: {e}")
+                failing = True
+
+    def start(self):
+        if self._task is None and self.scan_interval > 0:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        self.stream.close()
+        self.devices.clear()
+        if self.output is not None:
+            self._set_output(None, None)
+
+    def stats(self) -> Dict:
+        return {
+            'devices': {name: profile.name for name, profile in self.devices.items()},
+            'output': self.output_name,
+            'profiles': [p.name for p in self.profiles] or [self.fallback.name],
+            'scans': self.scans,
+            'connects': self.connects,
+            'disconnects': self.disconnects,
+        }
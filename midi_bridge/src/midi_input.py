@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+HEADY_BRAND:BEGIN
+╔══════════════════════════════════════════════════════════════════╗
+║  HeadySync MIDI Bridge - Event-Driven MIDI Input                  ║
+║  "Every pad hit lands the moment it is played"                    ║
+╚══════════════════════════════════════════════════════════════════╝
+HEADY_BRAND:END
+
+mido calls the port callback on the backend's (rtmidi) thread as each
+message arrives. The callback stamps the arrival time and hands the message
+to the event loop with ``call_soon_threadsafe``, so a waiting consumer wakes
+immediately and an idle bridge does not wake up at all.
+
+Any number of ports can be open at once. Their callbacks feed the same
+queue, so the consumer sees one stream in arrival order. Each item is
+tagged with the name of the port it came from.
+"""
+
+import asyncio
+import functools
+import logging
+import re
+import time
+from typing import Dict, Optional, Tuple
+
+import mido
+
+logger = logging.getLogger(__name__)
+
+NOTE_NAMES = ['C', 'C#', 'D', 'D#', 'E', 'F', 'F#', 'G', 'G#', 'A', 'A#', 'B']
+NOTE_NAME = re.compile(r'^([A-G]#?)(-?\d+)$')
+
+
+def note_number_to_name(note: int) -> str:
+    """MIDI note number to scientific pitch name (60 -> 'C4')"""
+    return f"{NOTE_NAMES[note % 12]}{note // 12 - 1}"
+
+
+def note_name_to_number(name: str) -> Optional[int]:
+    """Scientific pitch name to MIDI note number ('C4' -> 60); None if it is not one"""
+    match = NOTE_NAME.match(name)
+    if match is None:
+        return None
+    note = NOTE_NAMES.index(match.group(1)) + (int(match.group(2)) + 1) * 12
+    return note if 0 <= note <= 127 else None
+
+
+class MidiInputStream:
+    """Feeds messages from any number of mido input ports into one bounded asyncio queue"""
+
+    def __init__(self, max_queue: int = 1024):
+        self.max_queue = max_queue
+        self.ports: Dict[str, object] = {}
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=max_queue)
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+        self.received = 0
+        self.overflow = 0
+        self.received_by_port: Dict[str, int] = {}
+
+    def open(self, port_name: str, **kwargs):
+        """Open ``port_name`` with a callback bound to the running loop"""
+        self._loop = asyncio.get_running_loop()
+        port = mido.open_input(port_name, callback=functools.partial(self._on_message, port_name), **kwargs)
+        self.ports[port_name] = port
+        return port
+
+    def _on_message(self, port_name: str, msg):
+        # Backend thread: stamp and hand over, nothing else
+        self._loop.call_soon_threadsafe(self._enqueue, msg, time.perf_counter(), port_name)
+
+    def _enqueue(self, msg, received_at: float, port_name: str):
+        self.received += 1
+        self.received_by_port[port_name] = self.received_by_port.get(port_name, 0) + 1
+        try:
+            self._queue.put_nowait((msg, received_at, port_name))
+        except asyncio.QueueFull:
+            self.overflow += 1
+            logger.warning(f"MIDI input queue full; dropped {msg} from {port_name}")
+
+    async def get(self) -> Tuple[mido.Message, float, str]:
+        """Next ``(message, perf_counter arrival time, port name)``"""
+        return await self._queue.get()
+
+    def close(self, port_name: Optional[str] = None):
+        """Close one port, or all of them"""
+        for name in [port_name] if port_name is not None else list(self.ports):
+            port = self.ports.pop(name, None)
+            if port is None:
+                continue
+            try:
+                port.close()
+            except Exception as e:
+                # An unplugged device can fail to close cleanly; it is gone either way
+                logger.warning(f"Error closing MIDI input {name}: {e}")
+
+    def stats(self) -> Dict:
+        return {
+            "ports": list(self.ports),
+            "received": self.received,
+            "received_by_port": dict(self.received_by_port),
+            "overflow": self.overflow,
+            "queue_depth": self._queue.qsize(),
+        }
@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+HEADY_BRAND:BEGIN
+╔══════════════════════════════════════════════════════════════════╗
+║  HeadySync MIDI Bridge - Blue/Green Container Swap                ║
+║  "Swap the guitar mid-song without dropping a note"               ║
+╚══════════════════════════════════════════════════════════════════╝
+HEADY_BRAND:END
+
+Recreates a container with new environment values without taking it away.
+This is for settings a service only reads at startup.
+
+1. Inspect the running ("blue") container and copy its image, command,
+   labels, healthcheck, networks and its whole HostConfig (mounts, published
+   ports, resource limits, logging, capabilities, restart policy...).
+   Anonymous volumes are carried over too.
+2. Create ``<name>_green`` with the updated environment. On every network it
+   gets the blue container's aliases plus ``<name>``, so it answers on the
+   same DNS name while both run.
+3. Wait until green is ready: its readiness URL answers 200, or else its
+   Docker healthcheck is ``healthy``, or else it has kept running. If it
+   never gets there, remove it and leave blue untouched.
+4. Stop and remove blue, then rename green to ``<name>``.
+
+A container that publishes host ports cannot overlap with its replacement,
+because the second bind would fail. For those, blue is stopped just before
+green starts, and restarted if green does not come up. That leaves a short
+gap, which is still better than losing the ports.
+
+``alternates`` flips a variable between two values on every swap. This
+keeps state the two containers must not share during the overlap (the
+oracle's spool directory) apart, and the next swap picks up whatever the
+previous generation left there.
+
+These are blocking Docker SDK calls; run them through the DockerExecutor.
+"""
+
+import logging
+import time
+from typing import Dict, Optional, Tuple
+
+import docker
+import requests
+
+logger = logging.getLogger(__name__)
+
+
+def _wait_ready(client, container_id: str, ready_url: Optional[str], timeout: float, poll: float = 0.5):
+    deadline = time.monotonic() + timeout
+    running_polls = 0
+    while time.monotonic() < deadline:
+        attrs = client.api.inspect_container(container_id)
+        state = attrs['State']
+        if state.get('Status') in ('exited', 'dead'):
+            raise RuntimeError(f"green container exited with {state.get('ExitCode')}")
+        if ready_url:
+            try:
+                response = requests.get(ready_url, timeout=2)
+                # A service held in maintenance is up but deliberately not ready
+                if response.status_code == 200 or response.json().get('maintenance'):
+                    return
+            except (requests.RequestException, ValueError):
+                pass
+        elif 'Health' in state:
+            if state['Health'].get('Status') == 'healthy':
+                return
+        elif state.get('Running'):
+            running_polls += 1
+            if running_polls >= 3:
+                return
+        time.sleep(poll)
+    raise TimeoutError(f"green container not ready after {timeout:.0f}s")
+
+
+def blue_green_swap(client, name: str, env_updates: Dict[str, str], ready_url: Optional[str] = None,
+                    alternates: Optional[Dict[str, Tuple[str, str]]] = None,
+                    ready_timeout: float = 120.0, stop_grace: int = 30) -> Dict:
+    """Replace container ``name`` with a copy running ``env_updates``; ``ready_url`` may use ``{name}``"""
+    api = client.api
+    blue = api.inspect_container(name)
+    config, host = blue['Config'], blue['HostConfig']
+
+    env = dict(item.split('=', 1) for item in config.get('Env') or [] if '=' in item)
+    env.update(env_updates)
+    for key, (first, second) in (alternates or {}).items():
+        env[key] = second if env.get(key, first) == first else first
+
+    green_name = f"{name}_green"
+    try:
+        api.remove_container(green_name, force=True)  # left over from a failed swap
+    except docker.errors.NotFound:
+        pass
+
+    networks = blue['NetworkSettings']['Networks']
+    network_names = list(networks)
+
+    def aliases(network: str):
+        return sorted({name, *(networks[network].get('Aliases') or [])} - {blue['Id'][:12]})
+
+    # The inspected HostConfig is valid create input as it stands; only anonymous volumes live elsewhere
+    host_config = dict(host)
+    covered = {bind.split(':')[1] for bind in host.get('Binds') or [] if ':' in bind}
+    covered |= {mount.get('Target') for mount in host.get('Mounts') or []}
+    anonymous = [{'Type': 'volume', 'Source': m['Name'], 'Target': m['Destination'], 'ReadOnly': not m.get('RW', True)}
+                 for m in blue.get('Mounts', []) if m['Type'] == 'volume' and m['Destination'] not in covered]
+    if anonymous:
+        host_config['Mounts'] = list(host.get('Mounts') or []) + anonymous
+    publishes = any(binding.get('HostPort') for bindings in (host.get('PortBindings') or {}).values()
+                    for binding in bindings or [])
+    networking_config = api.create_networking_config(
+        {network_names[0]: api.create_endpoint_config(aliases=aliases(network_names[0]))}
+    ) if network_names else None
+
+    started = time.monotonic()
+    green = api.create_container(
+        image=config['Image'],
+        command=config.get('Cmd'),
+        entrypoint=config.get('Entrypoint'),
+        working_dir=config.get('WorkingDir') or None,
+        user=config.get('User') or None,
+        environment=[f"{key}={value}" for key, value in env.items()],
+        labels=config.get('Labels'),
+        healthcheck=config.get('Healthcheck'),
+        ports=[tuple(port.split('/', 1)) for port in config.get('ExposedPorts') or {}] or None,
+        name=green_name,
+        host_config=host_config,
+        networking_config=networking_config
+    )['Id']
+    try:
+        for network in network_names[1:]:
+            api.connect_container_to_network(green, network, aliases=aliases(network))
+        if publishes:
+            logger.info(f"{name} publishes host ports; stopping it before its replacement starts")
+            api.stop(blue['Id'], timeout=stop_grace)
+        api.start(green)
+        _wait_ready(client, green, ready_url.format(name=green_name) if ready_url else None, ready_timeout)
+    except Exception:
+        logger.error(f"Blue/green swap of {name} aborted; keeping the running container")
+        api.remove_container(green, force=True)
+        if publishes:
+            api.start(blue['Id'])
+        raise
+    ready_after = time.monotonic() - started
+
+    if not publishes:
+        api.stop(blue['Id'], timeout=stop_grace)
+    api.remove_container(blue['Id'])
+    api.rename(green, name)
+    logger.info(f"Blue/green swap of {name} complete: {blue['Id'][:12]} -> {green[:12]}")
+    return {
+        'container': name,
+        'previous': blue['Id'][:12],
+        'current': green[:12],
+        'updated': sorted(env_updates),
+        'ready_seconds': round(ready_after, 3),
+    }
@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+"""
+HEADY_BRAND:BEGIN
+╔══════════════════════════════════════════════════════════════════╗
+║  HeadySync MIDI Bridge - Action Scheduler                         ║
+║  "Play the riff once, however hard you hit the pad"               ║
+╚══════════════════════════════════════════════════════════════════╝
+HEADY_BRAND:END
+
+MIDI-triggered actions are scheduled here instead of running inline in the
+MIDI listener. Actions are keyed by handler name, so two pads mapped to the
+same action share one key.
+
+* Triggers (pads/keys) are debounced. A hit is dropped while the same
+  action is pending or running, or within its debounce window of the last
+  start.
+* Continuous controllers (knobs/sliders) coalesce, last value wins. At most
+  one execution is pending per controller action, and its value is replaced
+  by every newer one. Executions of one controller are at least
+  ``cc_interval`` apart, and the final knob position is always applied.
+* Preempting actions (``emergency_stop``) cancel everything pending and
+  running, then run immediately without waiting for a slot.
+
+At most ``concurrency`` actions run at once, and an action never overlaps
+itself.
+"""
+
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Callable, Deque, Dict, Iterable, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+
+def parse_debounce(spec: str) -> Dict[str, float]:
+    """``"restart_all_services=10,deploy_production=30"`` -> {action: seconds}"""
+    windows = {}
+    for item in spec.split(','):
+        if '=' in item:
+            name, value = item.split('=', 1)
+            windows[name.strip()] = float(value)
+    return windows
+
+
+class LatencyWindow:
+    """Recent latency samples (seconds) summarized in milliseconds"""
+
+    def __init__(self, size: int = 512):
+        self._samples: Deque[float] = deque(maxlen=size)
+        self.max = 0.0
+
+    def observe(self, seconds: float):
+        self._samples.append(seconds)
+        self.max = max(self.max, seconds)
+
+    def summary(self) -> Dict:
+        ordered = sorted(self._samples)
+        if not ordered:
+            return {'count': 0}
+        return {
+            'count': len(ordered),
+            'p50_ms': round(ordered[len(ordered) // 2] * 1000, 3),
+            'p99_ms': round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))] * 1000, 3),
+            'max_ms': round(self.max * 1000, 3),
+        }
+
+
+class ScheduledAction:
+    """One pending execution of an action"""
+
+    __slots__ = ('key', 'handler', 'args', 'continuous', 'submitted_at', 'not_before', 'task')
+
+    def __init__(self, key: str, handler: Callable, args: tuple, continuous: bool, not_before: float):
+        self.key = key
+        self.handler = handler
+        self.args = args
+        self.continuous = continuous
+        self.submitted_at = time.perf_counter()
+        self.not_before = not_before
+        self.task: Optional[asyncio.Task] = None
+
+
+class ActionScheduler:
+    """Debounces, coalesces and prioritizes MIDI-triggered actions"""
+
+    def __init__(self, debounce: float = 2.0, debounce_overrides: Optional[Dict[str, float]] = None,
+                 cc_interval: float = 0.05, concurrency: int = 4,
+                 preempting: Iterable[str] = ('emergency_stop',)):
+        self.debounce = debounce
+        self.debounce_overrides = debounce_overrides or {}
+        self.cc_interval = cc_interval
+        self.concurrency = concurrency
+        self.preempting = set(preempting)
+
+        self._slots = asyncio.Semaphore(concurrency)
+        self._pending: Dict[str, ScheduledAction] = {}
+        self._running: Dict[str, asyncio.Task] = {}
+        self._tasks: Set[asyncio.Task] = set()
+        self._last_started: Dict[str, float] = {}
+
+        self.queue_wait = LatencyWindow()
+        self.execution = LatencyWindow()
+        self.submitted = 0
+        self.executed = 0
+        self.debounced = 0
+        self.coalesced = 0
+        self.preempted = 0
+        self.failed = 0
+
+    def submit(self, handler: Callable, *args, continuous: bool = False) -> str:
+        """Schedule ``handler(*args)``; returns what happened to the request"""
+        key = handler.__name__
+        now = time.perf_counter()
+        self.submitted += 1
+
+        if key in self.preempting:
+            if key in self._running:
+                self.debounced += 1
+                return 'debounced'
+            self._preempt()
+            self._start(ScheduledAction(key, handler, args, continuous, now), preempting=True)
+            return 'preempting'
+
+        pending = self._pending.get(key)
+        if continuous:
+            if pending is not None:
+                pending.args = args
+                self.coalesced += 1
+                return 'coalesced'
+            not_before = self._last_started.get(key, -self.cc_interval) + self.cc_interval
+        else:
+            window = self.debounce_overrides.get(key, self.debounce)
+            if pending is not None or key in self._running or now - self._last_started.get(key, -window) < window:
+                self.debounced += 1
+                return 'debounced'
+            not_before = now
+
+        item = ScheduledAction(key, handler, args, continuous, not_before)
+        self._pending[key] = item
+        self._start(item)
+        return 'queued'
+
+    def _start(self, item: ScheduledAction, preempting: bool = False):
+        item.task = asyncio.create_task(self._run(item, preempting))
+        self._tasks.add(item.task)
+        item.task.add_done_callback(self._tasks.discard)
+
+    def _preempt(self):
+        """Cancel every pending and running action"""
+        for task in list(self._tasks):
+            task.cancel()
+        self.preempted += len(self._tasks)
+        if self._tasks:
+            logger.warning(f"Preempting {len(self._pending)} pending and {len(self._running)} running actions")
+        self._pending.clear()
+
+    async def _run(self, item: ScheduledAction, preempting: bool):
+        task = asyncio.current_task()
+        try:
+            delay = item.not_before - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            previous = self._running.get(item.key)
+            if previous is not None:
+                # An action never overlaps itself
+                await asyncio.wait([previous])
+            if preempting:
+                await self._execute(item, task)
+            else:
+                async with self._slots:
+                    await self._execute(item, task)
+        except asyncio.CancelledError:
+            logger.info(f"Action {item.key} cancelled")
+        except Exception as e:
+            self.failed += 1
+            logger.error(f"Action {item.key} failed: {e}")
+        finally:
+            if self._pending.get(item.key) is item:
+                del self._pending[item.key]
+            if self._running.get(item.key) is task:
+                del self._running[item.key]
+
+    async def _execute(self, item: ScheduledAction, task: asyncio.Task):
+        if self._pending.get(item.key) is item:
+            del self._pending[item.key]
+        self._running[item.key] = task
+        started = time.perf_counter()
+        self._last_started[item.key] = started
+        self.queue_wait.observe(started - item.submitted_at)
+        try:
+            await item.handler(*item.args)
+            self.executed += 1
+        finally:
+            self.execution.observe(time.perf_counter() - started)
+
+    async def shutdown(self):
+        for task in list(self._tasks):
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    def stats(self) -> Dict:
+        return {
+            'queue_depth': len(self._pending),
+            'pending': sorted(self._pending),
+            'running': sorted(self._running),
+            'concurrency': self.concurrency,
+            'submitted': self.submitted,
+            'executed': self.executed,
+            'debounced': self.debounced,
+            'coalesced': self.coalesced,
+            'preempted': self.preempted,
+            'failed': self.failed,
+            'queue_wait': self.queue_wait.summary(),
+            'execution': self.execution.summary(),
+        }
@@ -0,0 +1,304 @@
+#!/usr/bin/env python3
+"""
+HEADY_BRAND:BEGIN
+╔══════════════════════════════════════════════════════════════════╗
+║  HeadyField Bench - End-to-End Oracle Pipeline                    ║
+╚══════════════════════════════════════════════════════════════════╝
+HEADY_BRAND:END
+
+Drives the real HeadyOracle through a stand-in MQTT broker and a fake
+InfluxDB/HeadyBrain HTTP endpoint, both running in a separate traffic
+process so they do not share the oracle's event loop or GIL.
+
+For each stage (decode, _verify_signature, anomaly scoring,
+_analyze_with_brain, the brain HTTP call, _store_field_data and the InfluxDB
+batch write) it reports call count, calls/s over the run, serial capacity
+(calls per second of busy time), p50/p99 latency, plus process RSS. The workload is fully determined
+by the arguments and ``--seed``.
+
+Run from oracle_service/:
+
+    python -m benchmarks.bench_pipeline --messages 20000 --rate 2000
+    python -m benchmarks.bench_pipeline --json-out bench.json
+    python -m benchmarks.bench_pipeline --baseline bench.json --max-regression 0.15
+
+With ``--baseline`` the run exits non-zero if throughput drops, or any stage
+p99 grows, by more than ``--max-regression`` relative to the baseline.
+"""
+
+import argparse
+import asyncio
+import functools
+import json
+import logging
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+from typing import Dict, List
+
+from .loadgen import build_traffic, publish
+from .stub_broker import StubBroker
+from .stub_http import StubHTTPServer
+
+
+# ---------------------------------------------------------------------------
+# Traffic process: broker, fake HTTP services and load generator
+# ---------------------------------------------------------------------------
+
+def traffic_process(conn, args: Dict):
+    asyncio.run(_traffic(conn, args))
+
+
+async def _traffic(conn, args: Dict):
+    loop = asyncio.get_running_loop()
+    broker = StubBroker()
+    http = StubHTTPServer(write_latency=args['influx_latency'] / 1000.0,
+                          brain_latency=args['brain_latency'] / 1000.0)
+    mqtt_port = await broker.start()
+    http_port = await http.start()
+
+    keys, traffic = build_traffic(args['messages'], args['fields'], args['sensors'], args['values'],
+                                  args['duplicate_ratio'], args['codec'], args['seed'])
+    conn.send({'mqtt_port': mqtt_port, 'http_port': http_port, 'keys': keys})
+
+    while True:
+        command = await loop.run_in_executor(None, conn.recv)
+        if command == 'go':
+            elapsed = await publish('127.0.0.1', mqtt_port, traffic, args['rate'])
+            conn.send({'published': len(traffic), 'publish_seconds': elapsed})
+        elif command == 'stats':
+            conn.send({**http.stats(), 'broker_delivered': broker.delivered})
+        else:
+            break
+    await broker.stop()
+    await http.stop()
+
+
+# ---------------------------------------------------------------------------
+# Oracle side: stage instrumentation and reporting
+# ---------------------------------------------------------------------------
+
+class StageTimer:
+    """Collects per-call latencies for named stages"""
+
+    def __init__(self):
+        self.samples: Dict[str, List[float]] = {}
+
+    def wrap(self, name: str, fn):
+        samples = self.samples.setdefault(name, [])
+        if asyncio.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def timed_async(*a, **kw):
+                started = time.perf_counter()
+                try:
+                    return await fn(*a, **kw)
+                finally:
+                    samples.append(time.perf_counter() - started)
+            return timed_async
+
+        @functools.wraps(fn)
+        def timed(*a, **kw):
+            started = time.perf_counter()
+            try:
+                return fn(*a, **kw)
+            finally:
+                samples.append(time.perf_counter() - started)
+        return timed
+
+    def report(self, wall: float) -> Dict[str, Dict]:
+        out = {}
+        for name, samples in self.samples.items():
+            if not samples:
+                continue
+            ordered = sorted(samples)
+            busy = sum(ordered)
+            out[name] = {
+                'calls': len(ordered),
+                'calls_per_s': len(ordered) / wall,
+                'capacity_per_s': len(ordered) / busy if busy else 0.0,
+                'p50_ms': ordered[len(ordered) // 2] * 1000,
+                'p99_ms': ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))] * 1000,
+            }
+        return out
+
+
+def memory_kb() -> Dict[str, int]:
+    """Current and peak resident set size from /proc (Linux)"""
+    out = {'rss_kb': 0, 'peak_rss_kb': 0}
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    out['rss_kb'] = int(line.split()[1])
+                elif line.startswith('VmHWM:'):
+                    out['peak_rss_kb'] = int(line.split()[1])
+    except OSError:
+        pass
+    return out
+
+
+def instrument(oracle, timer: StageTimer):
+    oracle.decoder.decode = timer.wrap('decode', oracle.decoder.decode)
+    oracle._verify_signature = timer.wrap('verify', oracle._verify_signature)
+    if oracle.scorer:
+        oracle.scorer.score = timer.wrap('score', oracle.scorer.score)
+    oracle._analyze_with_brain = timer.wrap('analyze', oracle._analyze_with_brain)
+    oracle.brain.analyze = timer.wrap('brain_call', oracle.brain.analyze)
+    oracle._store_field_data = timer.wrap('store', oracle._store_field_data)
+    oracle.writer._write_batch = timer.wrap('influx_write', oracle.writer._write_batch)
+    if oracle.spool_drainer:
+        oracle.spool_drainer._write_batch = timer.wrap('spool_drain', oracle.spool_drainer._write_batch)
+
+
+async def run_oracle(conn, expected: int, timeout: float) -> Dict:
+    from src.oracle_server import oracle  # configured through the environment set in main()
+
+    logging.getLogger().setLevel(logging.WARNING)
+    timer = StageTimer()
+    instrument(oracle, timer)
+    memory_before = memory_kb()
+
+    await oracle.initialize()
+    deadline = time.monotonic() + 10
+    while not oracle.mqtt_client.is_connected() and time.monotonic() < deadline:
+        await asyncio.sleep(0.05)
+    await asyncio.sleep(0.2)  # let SUBACK land before publishing
+
+    loop = asyncio.get_running_loop()
+    started = time.perf_counter()
+    conn.send('go')
+    published = await loop.run_in_executor(None, conn.recv)
+
+    ingest = oracle.ingest
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if ingest.processed + ingest.dropped + ingest.failed + ingest.overflow >= expected:
+            break
+        await asyncio.sleep(0.01)
+    wall = time.perf_counter() - started
+
+    if oracle.spool:
+        while time.monotonic() < deadline and oracle.writer.stats()['queue_depth']:
+            await asyncio.sleep(0.05)
+        await asyncio.sleep(oracle.writer.flush_interval * 2)
+        while time.monotonic() < deadline and oracle.spool.stats()['bytes']:
+            await asyncio.sleep(0.05)
+    memory_after = memory_kb()
+    await oracle.shutdown()
+
+    conn.send('stats')
+    services = await loop.run_in_executor(None, conn.recv)
+    return {
+        'published': published['published'],
+        'publish_seconds': published['publish_seconds'],
+        'wall_seconds': wall,
+        'throughput_per_s': ingest.processed / wall,
+        'ingest': ingest.stats(),
+        'deduplication': oracle.replay_index.stats(),
+        'services': services,
+        'stages': timer.report(wall),
+        'memory': {'before': memory_before, 'after': memory_after},
+    }
+
+
+def print_report(result: Dict, args):
+    print(f"workload: {args.messages} msgs, {args.fields} fields x {args.sensors} sensors, "
+          f"codec={args.codec}, rate={args.rate or 'unpaced'}/s, seed={args.seed}, engine={args.engine}")
+    ingest = result['ingest']
+    print(f"processed {ingest['processed']}/{result['published']} in {result['wall_seconds']:.2f}s "
+          f"-> {result['throughput_per_s']:,.0f} msgs/s  "
+          f"(dropped {ingest['dropped']}, failed {ingest['failed']}, overflow {ingest['overflow']})")
+    services = result['services']
+    print(f"influx: {services['lines_written']} lines in {services['write_requests']} writes; "
+          f"brain: {services['brain_items']} items in {services['brain_requests']} calls")
+    print()
+    print(f"{'stage':<14} {'calls':>8} {'calls/s':>10} {'capacity/s':>12} {'p50 ms':>9} {'p99 ms':>9}")
+    for name, stage in result['stages'].items():
+        print(f"{name:<14} {stage['calls']:>8} {stage['calls_per_s']:>10,.0f} {stage['capacity_per_s']:>12,.0f} "
+              f"{stage['p50_ms']:>9.3f} {stage['p99_ms']:>9.3f}")
+    memory = result['memory']
+    print()
+    print(f"RSS: {memory['before']['rss_kb'] / 1024:.1f} MiB before, {memory['after']['rss_kb'] / 1024:.1f} MiB after, "
+          f"peak {memory['after']['peak_rss_kb'] / 1024:.1f} MiB")
+
+
+def compare(result: Dict, baseline: Dict, tolerance: float) -> List[str]:
+    """Regressions of ``result`` against ``baseline`` beyond ``tolerance``"""
+    problems = []
+    if result['throughput_per_s'] < baseline['throughput_per_s'] * (1 - tolerance):
+        problems.append(f"throughput {result['throughput_per_s']:,.0f}/s < baseline {baseline['throughput_per_s']:,.0f}/s")
+    for name, stage in result['stages'].items():
+        base = baseline.get('stages', {}).get(name)
+        if base and stage['p99_ms'] > base['p99_ms'] * (1 + tolerance):
+            problems.append(f"{name} p99 {stage['p99_ms']:.3f}ms > baseline {base['p99_ms']:.3f}ms")
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--messages', type=int, default=20000)
+    parser.add_argument('--rate', type=float, default=2000, help='messages/s, 0 = unpaced')
+    parser.add_argument('--fields', type=int, default=20)
+    parser.add_argument('--sensors', type=int, default=15, help='sensors per field')
+    parser.add_argument('--values', type=int, default=4, help='numeric values per reading')
+    parser.add_argument('--duplicate-ratio', type=float, default=0.0)
+    parser.add_argument('--codec', choices=['json', 'cbor', 'msgpack'], default='json')
+    parser.add_argument('--engine', choices=['paho', 'asyncio'], default='asyncio')
+    parser.add_argument('--influx-latency', type=float, default=2.0, help='fake write latency, ms')
+    parser.add_argument('--brain-latency', type=float, default=20.0, help='fake brain latency, ms')
+    parser.add_argument('--no-brain', action='store_true')
+    parser.add_argument('--ingest-workers', type=int, default=8)
+    parser.add_argument('--spool', action='store_true', help='route writes through the on-disk spool')
+    parser.add_argument('--timeout', type=float, default=300)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--json-out')
+    parser.add_argument('--baseline')
+    parser.add_argument('--max-regression', type=float, default=0.15)
+    args = parser.parse_args()
+
+    conn, child = multiprocessing.Pipe()
+    traffic = multiprocessing.Process(target=traffic_process, args=(child, vars(args)), daemon=True)
+    traffic.start()
+    ports = conn.recv()
+
+    workdir = tempfile.mkdtemp(prefix='heady-bench-')
+    keys_path = os.path.join(workdir, 'sensor_keys.json')
+    with open(keys_path, 'w') as f:
+        json.dump(ports['keys'], f)
+    os.environ.update({
+        'MQTT_BROKER': '127.0.0.1',
+        'MQTT_PORT': str(ports['mqtt_port']),
+        'MQTT_ENGINE': args.engine,
+        'INFLUX_URL': f"http://127.0.0.1:{ports['http_port']}",
+        'INFLUX_TOKEN': 'bench',
+        'SENSOR_KEYS_PATH': keys_path,
+        'SIGNATURE_MODE': 'strict',
+        'ORACLE_SPOOL_DIR': os.path.join(workdir, 'spool') if args.spool else '',
+        'HEADY_BRAIN_ENDPOINT': '' if args.no_brain else f"http://127.0.0.1:{ports['http_port']}/api/brain/analyze",
+        'HEADY_BRAIN_RATE_LIMIT': '1000',
+        'ORACLE_INGEST_WORKERS': str(args.ingest_workers),
+        # The workload's timestamps span messages * 10 ms; keep all of them inside the replay window
+        'REPLAY_WINDOW_SECONDS': str(max(600, int(args.messages * 0.01) + 600)),
+    })
+
+    result = asyncio.run(run_oracle(conn, args.messages, args.timeout))
+    conn.send('stop')
+    traffic.join(5)
+
+    print_report(result, args)
+    if args.json_out:
+        with open(args.json_out, 'w') as f:
+            json.dump({'args': vars(args), **result}, f, indent=2)
+    if args.baseline:
+        with open(args.baseline) as f:
+            problems = compare(result, json.load(f), args.max_regression)
+        if problems:
+            print("\nREGRESSION:\n  " + "\n  ".join(problems))
+            sys.exit(1)
+        print(f"\nno regression beyond {args.max_regression:.0%} of baseline")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+HEADY_BRAND:BEGIN
+╔══════════════════════════════════════════════════════════════════╗
+║  HeadyField Bench - Reading Representation: dict+Point vs Compact ║
+╚══════════════════════════════════════════════════════════════════╝
+HEADY_BRAND:END
+
+Compares the original storage path (json dict copied into an influx ``Point``)
+with ``SensorReading`` on two axes:
+
+* throughput of raw JSON bytes -> line-protocol record
+* retained memory per decoded reading (tracemalloc), i.e. the cost of holding
+  readings in buffers such as the write queue
+
+Run from oracle_service/:  python -m benchmarks.bench_records [--messages N]
+"""
+
+import argparse
+import gc
+import json
+import random
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+from influxdb_client import Point
+
+from src.records import SensorReading
+
+
+def build_messages(count: int, fields: int, sensors: int, seed: int):
+    rng = random.Random(seed)
+    names = ['soil_moisture', 'soil_temp', 'air_temp', 'humidity', 'ph', 'ec', 'lux', 'battery_mv'][:fields]
+    messages = []
+    for n in range(count):
+        data = {name: round(rng.uniform(0, 100), 3) for name in names}
+        data['battery_mv'] = rng.randint(3000, 4200)
+        messages.append((f"field-{rng.randrange(16):02d}", json.dumps({
+            'sensor_id': f"esp32-{rng.randrange(sensors):04d}",
+            'timestamp': 1_700_000_000 + n * 0.25,
+            'signature': '00' * 64,
+            'data': data,
+        }).encode()))
+    return messages
+
+
+def point_path(field_id: str, raw: bytes) -> str:
+    payload = json.loads(raw.decode())
+    point = Point("field_sensors") \
+        .tag("field_id", field_id) \
+        .tag("sensor_id", payload['sensor_id']) \
+        .time(datetime.fromtimestamp(payload['timestamp'], timezone.utc))
+    for key, value in payload['data'].items():
+        if isinstance(value, (int, float)):
+            point.field(key, value)
+    return point.to_line_protocol()
+
+
+def compact_path(field_id: str, raw: bytes) -> str:
+    return SensorReading.from_payload(field_id, json.loads(raw)).to_line_protocol()
+
+
+def throughput(fn, messages, repeat: int) -> float:
+    best = float('inf')
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for field_id, raw in messages:
+            fn(field_id, raw)
+        best = min(best, time.perf_counter() - started)
+    return len(messages) / best
+
+
+def retained_bytes(build, messages) -> float:
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    kept = [build(field_id, raw) for field_id, raw in messages]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del kept
+    return (after - before) / len(messages)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--messages', type=int, default=50000)
+    parser.add_argument('--fields', type=int, default=6)
+    parser.add_argument('--sensors', type=int, default=300)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    messages = build_messages(args.messages, args.fields, args.sensors, args.seed)
+    # Integers past 2**53 must not be rounded through the double array
+    edges = [('field-00', json.dumps({'sensor_id': 'esp32-edge', 'timestamp': 1_700_000_000.5, 'signature': '',
+                                      'data': {'counter': 2 ** 63 - 1, 'neg': -(2 ** 53) - 1, 'ok': 2 ** 53}}).encode())]
+    for field_id, raw in messages[:1000] + edges:
+        assert point_path(field_id, raw) == compact_path(field_id, raw)
+
+    old_rate = throughput(point_path, messages, args.repeat)
+    new_rate = throughput(compact_path, messages, args.repeat)
+    old_mem = retained_bytes(lambda f, raw: json.loads(raw.decode()), messages)
+    new_mem = retained_bytes(lambda f, raw: SensorReading.from_payload(f, json.loads(raw)), messages)
+
+    print(f"{'path':<22} {'records/s':>12} {'bytes/reading':>14}")
+    print(f"{'dict + Point':<22} {old_rate:>12,.0f} {old_mem:>14,.0f}")
+    print(f"{'SensorReading':<22} {new_rate:>12,.0f} {new_mem:>14,.0f}")
+    print(f"speedup x{new_rate / old_rate:.2f}, memory x{old_mem / new_mem:.2f} smaller")
+
+
+if __name__ == '__main__':
+    main()
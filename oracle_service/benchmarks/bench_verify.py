@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+HEADY_BRAND:BEGIN
+╔══════════════════════════════════════════════════════════════════╗
+║  HeadyField Bench - Signature Verification Throughput             ║
+╚══════════════════════════════════════════════════════════════════╝
+HEADY_BRAND:END
+
+Reports verifications per second per core for each supported algorithm,
+first inline on one core and then through SignatureVerifier's batched pool.
+
+Run from oracle_service/:  python -m benchmarks.bench_verify [--messages N]
+"""
+
+import argparse
+import asyncio
+import hashlib
+import hmac
+import json
+import os
+import random
+import tempfile
+import time
+
+from cryptography.hazmat.primitives.asymmetric.ed25519 import Ed25519PrivateKey
+from cryptography.hazmat.primitives.serialization import Encoding, PublicFormat
+
+from src.verification import (KeyStore, SensorKeyCache, SignatureVerifier,
+                              canonical_message, verify_batch)
+
+
+def build_fixture(alg: str, sensors: int, messages: int, seed: int):
+    """Keys for ``sensors`` sensors and ``messages`` signed payloads"""
+    rng = random.Random(seed)
+    keys, signers = {}, {}
+    for i in range(sensors):
+        sensor_id = f"esp32-{i:04d}"
+        if alg == 'ed25519':
+            private = Ed25519PrivateKey.generate()
+            public = private.public_key().public_bytes(Encoding.Raw, PublicFormat.Raw)
+            keys[sensor_id] = {"alg": alg, "key": public.hex()}
+            signers[sensor_id] = private.sign
+        else:
+            secret = rng.randbytes(32)
+            keys[sensor_id] = {"alg": alg, "key": secret.hex()}
+            signers[sensor_id] = lambda m, s=secret: hmac.new(s, m, hashlib.sha256).digest()
+
+    payloads = []
+    for n in range(messages):
+        sensor_id = f"esp32-{rng.randrange(sensors):04d}"
+        payload = {
+            'sensor_id': sensor_id,
+            'timestamp': 1_700_000_000 + n,
+            'data': {'soil_moisture': round(rng.uniform(10, 60), 2),
+                     'soil_temp': round(rng.uniform(5, 30), 2),
+                     'ph': round(rng.uniform(5.5, 7.5), 2)},
+        }
+        payload['signature'] = signers[sensor_id](canonical_message(payload)).hex()
+        payloads.append(payload)
+    return keys, payloads
+
+
+def bench_inline(alg: str, keys, payloads) -> float:
+    jobs = [(alg, bytes.fromhex(keys[p['sensor_id']]['key']), canonical_message(p),
+             bytes.fromhex(p['signature'])) for p in payloads]
+    started = time.perf_counter()
+    results = verify_batch(jobs)
+    elapsed = time.perf_counter() - started
+    assert all(results)
+    return len(jobs) / elapsed
+
+
+async def bench_pool(executor: str, keys, payloads, workers: int) -> float:
+    with tempfile.NamedTemporaryFile('w', suffix='.json', delete=False) as f:
+        json.dump(keys, f)
+    try:
+        verifier = SignatureVerifier(SensorKeyCache(KeyStore(f.name)), executor=executor, workers=workers)
+        verifier.start()
+        await asyncio.gather(*(verifier.verify(p) for p in payloads[:256]))  # warm pool and key cache
+        started = time.perf_counter()
+        results = await asyncio.gather(*(verifier.verify(p) for p in payloads))
+        elapsed = time.perf_counter() - started
+        await verifier.stop()
+    finally:
+        os.unlink(f.name)
+    assert all(results)
+    return len(payloads) / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--messages', type=int, default=20000)
+    parser.add_argument('--sensors', type=int, default=300)
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    print(f"{'algorithm':<12} {'mode':<16} {'verif/s':>12} {'verif/s/core':>14}")
+    for alg in ('ed25519', 'hmac-sha256'):
+        keys, payloads = build_fixture(alg, args.sensors, args.messages, args.seed)
+        rate = bench_inline(alg, keys, payloads)
+        print(f"{alg:<12} {'inline x1':<16} {rate:>12,.0f} {rate:>14,.0f}")
+        for executor in ('thread', 'process'):
+            rate = asyncio.run(bench_pool(executor, keys, payloads, args.workers))
+            label = f"{executor} x{args.workers}"
+            print(f"{alg:<12} {label:<16} {rate:>12,.0f} {rate / args.workers:>14,.0f}")
+
+
+if __name__ == '__main__':
+    main()
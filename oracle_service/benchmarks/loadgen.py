@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+HEADY_BRAND:BEGIN
+╔══════════════════════════════════════════════════════════════════╗
+║  HeadyField Bench - Synthetic field/+/sensors Traffic             ║
+╚══════════════════════════════════════════════════════════════════╝
+HEADY_BRAND:END
+
+Builds a deterministic, signed sensor workload from a seed and publishes it
+to an MQTT broker at a fixed rate. Everything (sensor keys, readings,
+duplicate republishes, ordering) derives from the seed, so two runs with the
+same arguments send byte-identical traffic.
+"""
+
+import asyncio
+import json
+import random
+import struct
+import time
+from typing import Dict, List, Tuple
+
+from cryptography.hazmat.primitives.asymmetric.ed25519 import Ed25519PrivateKey
+from cryptography.hazmat.primitives.serialization import Encoding, PublicFormat
+
+from src.verification import canonical_message
+
+VALUE_NAMES = ['soil_moisture', 'soil_temp', 'air_temp', 'humidity', 'ph', 'ec', 'lux', 'battery_mv']
+
+
+def build_traffic(messages: int, fields: int, sensors_per_field: int, values: int = 4,
+                  duplicate_ratio: float = 0.0, codec: str = 'json', seed: int = 42
+                  ) -> Tuple[Dict[str, Dict], List[Tuple[str, bytes]]]:
+    """Return (sensor key file contents, [(topic, payload)]) for the workload"""
+    rng = random.Random(seed)
+    names = VALUE_NAMES[:values]
+    sensors = []
+    keys = {}
+    for f in range(fields):
+        for s in range(sensors_per_field):
+            sensor_id = f"esp32-{f:03d}-{s:03d}"
+            private = Ed25519PrivateKey.from_private_bytes(rng.randbytes(32))
+            public = private.public_key().public_bytes(Encoding.Raw, PublicFormat.Raw)
+            keys[sensor_id] = {"alg": "ed25519", "key": public.hex()}
+            sensors.append((f"field-{f:03d}", sensor_id, private, {n: rng.uniform(10, 40) for n in names}))
+
+    encode = _encoder(codec)
+    suffix = '' if codec == 'json' else f"/{codec}"
+    traffic: List[Tuple[str, bytes]] = []
+    # Readings 10 ms apart ending now, so the oracle's replay freshness check accepts them
+    base_time = float(int(time.time())) - messages * 0.01
+    while len(traffic) < messages:
+        if traffic and rng.random() < duplicate_ratio:
+            traffic.append(traffic[rng.randrange(len(traffic))])
+            continue
+        field_id, sensor_id, private, state = sensors[rng.randrange(len(sensors))]
+        for name in names:
+            state[name] += rng.gauss(0, 0.2)
+        payload = {
+            'sensor_id': sensor_id,
+            'timestamp': round(base_time + len(traffic) * 0.01, 3),
+            'data': {name: round(value, 3) for name, value in state.items()},
+        }
+        payload['signature'] = private.sign(canonical_message(payload)).hex()
+        traffic.append((f"field/{field_id}/sensors{suffix}", encode(payload)))
+    return keys, traffic
+
+
+def _encoder(codec: str):
+    if codec == 'cbor':
+        import cbor2
+        return cbor2.dumps
+    if codec == 'msgpack':
+        import msgpack
+        return msgpack.packb
+    return lambda payload: json.dumps(payload, separators=(',', ':')).encode()
+
+
+def _mqtt_string(value: str) -> bytes:
+    data = value.encode()
+    return struct.pack('!H', len(data)) + data
+
+
+def _mqtt_packet(header: int, body: bytes) -> bytes:
+    length, encoded = len(body), bytearray()
+    while True:
+        byte, length = length % 128, length // 128
+        encoded.append(byte | 0x80 if length else byte)
+        if not length:
+            return bytes([header]) + bytes(encoded) + body
+
+
+async def publish(host: str, port: int, traffic: List[Tuple[str, bytes]], rate: float) -> float:
+    """Publish the workload at ``rate`` messages/s (0 = unpaced); returns elapsed seconds"""
+    reader, writer = await asyncio.open_connection(host, port)
+    connect = _mqtt_string('MQTT') + bytes([4, 0x02]) + struct.pack('!H', 60) + _mqtt_string('heady-loadgen')
+    writer.write(_mqtt_packet(0x10, connect))
+    await writer.drain()
+    await reader.readexactly(4)  # CONNACK
+
+    tick = 0.01
+    per_tick = max(1, int(rate * tick)) if rate else len(traffic)
+    started = time.perf_counter()
+    for offset in range(0, len(traffic), per_tick):
+        for topic, payload in traffic[offset:offset + per_tick]:
+            writer.write(_mqtt_packet(0x30, _mqtt_string(topic) + payload))
+        await writer.drain()
+        if rate:
+            due = started + (offset + per_tick) / rate
+            delay = due - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+    elapsed = time.perf_counter() - started
+    writer.write(b'\xe0\x00')
+    await writer.drain()
+    writer.close()
+    return elapsed
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+HEADY_BRAND:BEGIN
+╔══════════════════════════════════════════════════════════════════╗
+║  HeadyField Bench - Stand-in MQTT Broker                          ║
+╚══════════════════════════════════════════════════════════════════╝
+HEADY_BRAND:END
+
+In-process MQTT 3.1.1 broker with just enough protocol for the oracle:
+CONNECT/CONNACK, SUBSCRIBE/SUBACK (``+``/``#`` wildcards and ``$share``
+groups dispatched round-robin), QoS 0/1 PUBLISH fan-out and PINGREQ.
+"""
+
+import asyncio
+import itertools
+import struct
+from typing import Dict, List, Optional, Tuple
+
+
+def topic_matches(pattern: str, topic: str) -> bool:
+    """MQTT topic filter matching with ``+`` and ``#`` wildcards"""
+    p_parts, t_parts = pattern.split('/'), topic.split('/')
+    for i, part in enumerate(p_parts):
+        if part == '#':
+            return True
+        if i >= len(t_parts) or (part != '+' and part != t_parts[i]):
+            return False
+    return len(p_parts) == len(t_parts)
+
+
+def _length(n: int) -> bytes:
+    out = bytearray()
+    while True:
+        b = n % 128
+        n //= 128
+        out.append(b | 0x80 if n else b)
+        if not n:
+            return bytes(out)
+
+
+class StubBroker:
+    """Tiny asyncio MQTT broker for local testing and benchmarks"""
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 0):
+        self.host = host
+        self.port = port
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._subs: List[Tuple[str, Optional[str], asyncio.StreamWriter]] = []
+        self._share_cursor: Dict[Tuple[str, str], itertools.count] = {}
+        self.published = 0
+        self.delivered = 0
+
+    async def start(self) -> int:
+        self._server = await asyncio.start_server(self._client, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self.port
+
+    async def stop(self):
+        if self._server:
+            self._server.close()
+            for _, _, writer in self._subs:
+                writer.close()
+            await self._server.wait_closed()
+
+    async def _client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                header = (await reader.readexactly(1))[0]
+                length, mult = 0, 1
+                while True:
+                    b = (await reader.readexactly(1))[0]
+                    length += (b & 0x7F) * mult
+                    mult *= 128
+                    if not b & 0x80:
+                        break
+                body = await reader.readexactly(length) if length else b''
+                kind = header & 0xF0
+                if kind == 0x10:
+                    writer.write(b'\x20\x02\x00\x00')
+                elif kind == 0x80:
+                    packet_id, offset, codes = body[:2], 2, bytearray()
+                    while offset < len(body):
+                        n = struct.unpack_from('!H', body, offset)[0]
+                        topic = body[offset + 2:offset + 2 + n].decode()
+                        qos = body[offset + 2 + n]
+                        offset += 3 + n
+                        group = None
+                        if topic.startswith('$share/'):
+                            _, group, topic = topic.split('/', 2)
+                        self._subs.append((topic, group, writer))
+                        codes.append(min(qos, 1))
+                    writer.write(bytes([0x90]) + _length(2 + len(codes)) + packet_id + bytes(codes))
+                elif kind == 0x30:
+                    qos = (header >> 1) & 0x03
+                    n = struct.unpack_from('!H', body)[0]
+                    topic = body[2:2 + n].decode()
+                    payload = body[2 + n + (2 if qos else 0):]
+                    if qos == 1:
+                        writer.write(b'\x40\x02' + body[2 + n:4 + n])
+                    self.route(topic, payload)
+                elif kind == 0xC0:
+                    writer.write(b'\xd0\x00')
+                elif kind == 0xE0:
+                    break
+                await writer.drain()
+        except (asyncio.IncompleteReadError, asyncio.CancelledError, ConnectionError):
+            pass
+        finally:
+            self._subs = [s for s in self._subs if s[2] is not writer]
+            writer.close()
+
+    def route(self, topic: str, payload: bytes):
+        """Deliver a message to every matching subscriber (one per share group)"""
+        self.published += 1
+        body = struct.pack('!H', len(topic)) + topic.encode() + payload
+        packet = bytes([0x30]) + _length(len(body)) + body
+        groups: Dict[Tuple[str, str], List[asyncio.StreamWriter]] = {}
+        for pattern, group, writer in self._subs:
+            if not topic_matches(pattern, topic):
+                continue
+            if group:
+                groups.setdefault((group, pattern), []).append(writer)
+            else:
+                writer.write(packet)
+                self.delivered += 1
+        for key, members in groups.items():
+            cursor = self._share_cursor.setdefault(key, itertools.count())
+            members[next(cursor) % len(members)].write(packet)
+            self.delivered += 1
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+HEADY_BRAND:BEGIN
+╔══════════════════════════════════════════════════════════════════╗
+║  HeadyField Bench - Stand-in InfluxDB & HeadyBrain Endpoints      ║
+╚══════════════════════════════════════════════════════════════════╝
+HEADY_BRAND:END
+
+Keep-alive HTTP/1.1 server on asyncio streams that answers the handful of
+routes the oracle calls:
+
+* ``GET /health``            InfluxDB health check (always ``pass``)
+* ``POST /api/v2/write``     InfluxDB line-protocol write; lines are counted
+* ``POST /api/brain/analyze`` HeadyBrain analysis; echoes one result per item
+
+``write_latency`` and ``brain_latency`` add a fixed service time per request.
+"""
+
+import asyncio
+import json
+from typing import Dict, Optional
+
+
+class StubHTTPServer:
+    """Fake InfluxDB write endpoint and HeadyBrain analysis endpoint"""
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 0,
+                 write_latency: float = 0.0, brain_latency: float = 0.0):
+        self.host = host
+        self.port = port
+        self.write_latency = write_latency
+        self.brain_latency = brain_latency
+        self._server: Optional[asyncio.AbstractServer] = None
+
+        self.write_requests = 0
+        self.lines_written = 0
+        self.brain_requests = 0
+        self.brain_items = 0
+
+    async def start(self) -> int:
+        self._server = await asyncio.start_server(self._client, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self.port
+
+    async def stop(self):
+        if self._server:
+            self._server.close()
+            await self._server.wait_closed()
+
+    def stats(self) -> Dict:
+        return {
+            "write_requests": self.write_requests,
+            "lines_written": self.lines_written,
+            "brain_requests": self.brain_requests,
+            "brain_items": self.brain_items,
+        }
+
+    async def _client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                method, target, _ = request_line.decode().split(' ', 2)
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    name, _, value = line.decode().partition(':')
+                    headers[name.strip().lower()] = value.strip()
+                body = await reader.readexactly(int(headers.get('content-length', '0')))
+                status, payload = await self._route(method, target.split('?', 1)[0], body)
+                out = json.dumps(payload).encode() if payload is not None else b''
+                writer.write(f"HTTP/1.1 {status}\r\nContent-Type: application/json\r\n"
+                             f"Content-Length: {len(out)}\r\n\r\n".encode() + out)
+                await writer.drain()
+        except (asyncio.IncompleteReadError, asyncio.CancelledError, ConnectionError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def _route(self, method: str, path: str, body: bytes):
+        if path in ('/health', '/ping'):
+            return '200 OK', {'name': 'influxdb', 'status': 'pass', 'message': 'ready for queries and writes'}
+        if method == 'POST' and path == '/api/v2/write':
+            if self.write_latency:
+                await asyncio.sleep(self.write_latency)
+            self.write_requests += 1
+            self.lines_written += body.count(b'\n') + 1 if body else 0
+            return '204 No Content', None
+        if method == 'POST' and path == '/api/brain/analyze':
+            if self.brain_latency:
+                await asyncio.sleep(self.brain_latency)
+            request = json.loads(body)
+            items = request.get('items', [request])
+            self.brain_requests += 1
+            self.brain_items += len(items)
+            return '200 OK', {'results': [{'field_id': item.get('field_id'), 'anomaly': False} for item in items]}
+        return '404 Not Found', {'error': path}
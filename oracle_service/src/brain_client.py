@@ -0,0 +1,255 @@
+#!/usr/bin/env python3
+"""
+HEADY_BRAND:BEGIN
+╔══════════════════════════════════════════════════════════════════╗
+║  HeadyField Oracle - HeadyBrain Analysis Client                   ║
+║  "A fixed number of calls, however loud the field gets"           ║
+╚══════════════════════════════════════════════════════════════════╝
+HEADY_BRAND:END
+"""
+
+import asyncio
+import logging
+import time
+from typing import Dict, List, Optional, Tuple
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+
+class BrainUnavailable(Exception):
+    """Raised when the circuit breaker is open or the brain call failed"""
+
+
+class CircuitBreaker:
+    """CLOSED (normal) → OPEN (failing) → HALF_OPEN (testing) → CLOSED"""
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = "CLOSED"
+        self.failures = 0
+        self.opened_at = 0.0
+        self._trial_in_flight = False
+
+    def is_open(self) -> bool:
+        """True while requests are being refused outright"""
+        return self.state == "OPEN" and time.monotonic() - self.opened_at < self.reset_timeout
+
+    def allow(self) -> bool:
+        if self.state == "OPEN":
+            if time.monotonic() - self.opened_at < self.reset_timeout:
+                return False
+            self.state = "HALF_OPEN"
+        if self.state == "HALF_OPEN":
+            if self._trial_in_flight:
+                return False
+            self._trial_in_flight = True
+        return True
+
+    def record_success(self):
+        if self.state != "CLOSED":
+            logger.info("HeadyBrain circuit breaker CLOSED")
+        self.state = "CLOSED"
+        self.failures = 0
+        self._trial_in_flight = False
+
+    def record_failure(self):
+        self.failures += 1
+        self._trial_in_flight = False
+        if self.state == "HALF_OPEN" or self.failures >= self.failure_threshold:
+            if self.state != "OPEN":
+                logger.warning(f"HeadyBrain circuit breaker OPEN after {self.failures} failures")
+            self.state = "OPEN"
+            self.opened_at = time.monotonic()
+
+
+class RateLimiter:
+    """Token bucket enforcing a per-second request budget"""
+
+    def __init__(self, rate: float, burst: Optional[float] = None):
+        self.burst = burst
+        self.set_rate(rate)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def set_rate(self, rate: float):
+        """Change the budget; the bucket always holds at least one token so ``acquire`` can succeed"""
+        self.rate = rate
+        self.capacity = max(1.0, self.burst or rate)
+
+    async def acquire(self):
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+class BrainClient:
+    """Pooled, rate-limited HeadyBrain client that coalesces concurrent requests
+
+    Callers ``await analyze(payload)``. Payloads are collected in a pending
+    list and drained by exactly ``max_in_flight`` sender tasks, so the number
+    of concurrent HTTP calls is fixed regardless of how many sensors publish.
+    With ``batch`` enabled, each sender posts up to ``batch_size`` payloads as
+    one ``FIELD_DATA_ANALYSIS_BATCH`` request; while every sender is busy the
+    pending list simply grows into larger batches. Once ``max_pending``
+    payloads are waiting, further ones fail fast with ``BrainUnavailable``
+    (counted as shed) so a slow brain cannot grow memory without bound.
+    """
+
+    def __init__(self, endpoint: str, api_key: Optional[str] = None, max_in_flight: int = 4,
+                 rate_per_second: float = 20.0, batch: bool = True, batch_size: int = 50,
+                 batch_window: float = 0.05, timeout: float = 10.0,
+                 failure_threshold: int = 5, reset_timeout: float = 30.0,
+                 temperature: Optional[float] = None, max_pending: int = 10000):
+        self.endpoint = endpoint
+        self.api_key = api_key
+        self.max_in_flight = max_in_flight
+        self.batch = batch
+        self.batch_size = batch_size if batch else 1
+        self.batch_window = batch_window
+        self.max_pending = max_pending
+        self.timeout = timeout
+        self.temperature = temperature  # sampling temperature sent with each request; live-tunable
+        self.breaker = CircuitBreaker(failure_threshold, reset_timeout)
+        self.limiter = RateLimiter(rate_per_second)
+
+        self._client: Optional[httpx.AsyncClient] = None
+        self._senders: List[asyncio.Task] = []
+        self._pending: List[Tuple[Dict, asyncio.Future]] = []
+        self._has_pending = asyncio.Event()
+
+        self.requests = 0
+        self.payloads = 0
+        self.failures = 0
+        self.rejected = 0
+        self.shed = 0
+        self.in_flight = 0
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.endpoint)
+
+    def start(self):
+        """Open the connection pool and start the sender tasks"""
+        if not self.enabled or self._client is not None:
+            return
+        headers = {'Authorization': f'Bearer {self.api_key}'} if self.api_key else None
+        self._client = httpx.AsyncClient(
+            headers=headers,
+            timeout=self.timeout,
+            limits=httpx.Limits(max_connections=self.max_in_flight,
+                                max_keepalive_connections=self.max_in_flight)
+        )
+        loop = asyncio.get_running_loop()
+        self._senders = [loop.create_task(self._sender()) for _ in range(self.max_in_flight)]
+
+    async def stop(self):
+        """Stop sending and close pooled connections"""
+        for task in self._senders:
+            task.cancel()
+        await asyncio.gather(*self._senders, return_exceptions=True)
+        self._senders = []
+        for _, future in self._pending:
+            if not future.done():
+                future.set_exception(BrainUnavailable("Brain client stopped"))
+        self._pending = []
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def analyze(self, payload: Dict) -> Optional[Dict]:
+        """Queue one analysis payload and wait for its result"""
+        if self._client is None:
+            raise BrainUnavailable("Brain client not started")
+        if self.breaker.is_open():
+            self.rejected += 1
+            raise BrainUnavailable("HeadyBrain circuit breaker is OPEN")
+        if len(self._pending) >= self.max_pending:
+            self.shed += 1
+            raise BrainUnavailable(f"HeadyBrain backlog full ({self.max_pending} payloads pending)")
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((payload, future))
+        self._has_pending.set()
+        return await future
+
+    async def _sender(self):
+        while True:
+            await self._has_pending.wait()
+            if len(self._pending) < self.batch_size:
+                await asyncio.sleep(self.batch_window)  # let the batch fill
+            batch = self._pending[:self.batch_size]
+            del self._pending[:self.batch_size]
+            if not self._pending:
+                self._has_pending.clear()
+            if batch:
+                await self._send(batch)
+
+    async def _send(self, batch: List[Tuple[Dict, asyncio.Future]]):
+        if not self.breaker.allow():
+            self.rejected += len(batch)
+            self._fail(batch, BrainUnavailable("HeadyBrain circuit breaker is OPEN"))
+            return
+
+        await self.limiter.acquire()
+        if self.batch:
+            body = {'type': 'FIELD_DATA_ANALYSIS_BATCH', 'items': [payload for payload, _ in batch]}
+        else:
+            body = dict(batch[0][0])
+        if self.temperature is not None:
+            body['temperature'] = self.temperature
+
+        self.in_flight += 1
+        self.requests += 1
+        self.payloads += len(batch)
+        try:
+            response = await self._client.post(self.endpoint, json=body)
+            response.raise_for_status()
+            data = response.json()
+        except Exception as e:
+            self.failures += 1
+            self.breaker.record_failure()
+            logger.warning(f"HeadyBrain request for {len(batch)} payloads failed: {e}")
+            self._fail(batch, BrainUnavailable(str(e)))
+            return
+        finally:
+            self.in_flight -= 1
+
+        self.breaker.record_success()
+        results = data.get('results') if self.batch and isinstance(data, dict) else [data]
+        if not isinstance(results, list):
+            results = []
+        for i, (_, future) in enumerate(batch):
+            if not future.done():
+                future.set_result(results[i] if i < len(results) else None)
+
+    @staticmethod
+    def _fail(batch: List[Tuple[Dict, asyncio.Future]], error: Exception):
+        for _, future in batch:
+            if not future.done():
+                future.set_exception(error)
+
+    def stats(self) -> Dict:
+        return {
+            "enabled": self.enabled,
+            "circuit_state": self.breaker.state,
+            "max_in_flight": self.max_in_flight,
+            "rate_limit": self.limiter.rate,
+            "temperature": self.temperature,
+            "in_flight": self.in_flight,
+            "pending": len(self._pending),
+            "max_pending": self.max_pending,
+            "requests": self.requests,
+            "payloads": self.payloads,
+            "failures": self.failures,
+            "rejected": self.rejected,
+            "shed": self.shed,
+        }
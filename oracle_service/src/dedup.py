@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+HEADY_BRAND:BEGIN
+╔══════════════════════════════════════════════════════════════════╗
+║  HeadyField Oracle - Replay / Duplicate Suppression               ║
+║  "Every reading counts exactly once"                               ║
+╚══════════════════════════════════════════════════════════════════╝
+HEADY_BRAND:END
+"""
+
+import hashlib
+import time
+from collections import deque
+from typing import Deque, Dict, Set, Tuple
+
+
+class ReplayIndex:
+    """Time-windowed duplicate index built from a ring of hash sets
+
+    Each message is reduced to a 64-bit digest of (field_id, sensor_id,
+    timestamp, signature). ``seen`` checks it before verification so replays
+    cost no crypto; ``record`` adds it to the current time slice only after
+    the message verified, so a forged copy that arrives first cannot shadow
+    the genuine one.
+    The index is only a cache of recent keys, so a captured message replayed
+    after its key has left the window would look new. ``fresh`` closes that
+    gap: a message whose own timestamp is older than the window (or than what
+    the ring still covers after early evictions) or more than ``max_skew``
+    seconds in the future is refused before it is looked up.
+    Slices older than ``window`` seconds are dropped whole, so eviction is
+    O(1) per slice and memory stays proportional to the message rate times
+    the window. A slice that fills up during a burst is split, and if
+    ``max_entries`` is exceeded the oldest slice is dropped early, which
+    shortens the effective window instead of growing memory.
+    """
+
+    def __init__(self, window: float = 600.0, slices: int = 10, max_entries: int = 1_000_000,
+                 max_skew: float = 60.0):
+        self.window = window
+        self.max_skew = max_skew
+        self.slice_length = window / slices
+        self.max_entries = max_entries
+        self._slice_capacity = max(1, max_entries // slices)
+        self._ring: Deque[Tuple[int, Set[int]]] = deque()
+        self._entries = 0
+
+        self.lookups = 0
+        self.duplicates = 0
+        self.stale = 0
+        self.early_evictions = 0
+
+    @staticmethod
+    def digest(field_id: str, sensor_id: str, timestamp, signature: str) -> int:
+        key = f"{field_id}\x00{sensor_id}\x00{timestamp}\x00{signature}".encode()
+        return int.from_bytes(hashlib.blake2b(key, digest_size=8).digest(), 'little')
+
+    def fresh(self, timestamp: float) -> bool:
+        """Whether a message stamped ``timestamp`` (epoch seconds) is young enough for the index to judge"""
+        now = time.time()
+        covered = self.window
+        if self.early_evictions and self._ring:
+            covered = min(covered, time.monotonic() - self._ring[0][0] * self.slice_length)
+        if now - covered <= timestamp <= now + self.max_skew:
+            return True
+        self.stale += 1
+        return False
+
+    def seen(self, key: int) -> bool:
+        """Whether ``key`` is already in the window; records nothing"""
+        self.lookups += 1
+        self._rotate(time.monotonic())
+        if self._contains(key):
+            self.duplicates += 1
+            return True
+        return False
+
+    def record(self, key: int) -> bool:
+        """Add ``key`` once its message has verified; False if another copy got there first"""
+        current = self._rotate(time.monotonic())
+        if self._contains(key):
+            self.duplicates += 1
+            return False
+
+        current.add(key)
+        self._entries += 1
+        if len(current) >= self._slice_capacity:
+            # Burst within one slice: open a fresh set so the oldest can be evicted
+            self._ring.append((self._ring[-1][0], set()))
+        while self._entries > self.max_entries and len(self._ring) > 1:
+            _, dropped = self._ring.popleft()
+            self._entries -= len(dropped)
+            self.early_evictions += 1
+        return True
+
+    def _contains(self, key: int) -> bool:
+        return any(key in bucket for _, bucket in self._ring)
+
+    def _rotate(self, now: float) -> Set[int]:
+        index = int(now // self.slice_length)
+        oldest = index - int(self.window // self.slice_length)
+        while self._ring and self._ring[0][0] <= oldest:
+            _, dropped = self._ring.popleft()
+            self._entries -= len(dropped)
+        if not self._ring or self._ring[-1][0] != index:
+            self._ring.append((index, set()))
+        return self._ring[-1][1]
+
+    def stats(self) -> Dict:
+        return {
+            "window_seconds": self.window,
+            "entries": self._entries,
+            "lookups": self.lookups,
+            "duplicates": self.duplicates,
+            "stale": self.stale,
+            "max_skew_seconds": self.max_skew,
+            "hit_rate": self.duplicates / self.lookups if self.lookups else 0.0,
+            "early_evictions": self.early_evictions,
+        }
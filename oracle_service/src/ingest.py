@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+HEADY_BRAND:BEGIN
+╔══════════════════════════════════════════════════════════════════╗
+║  HeadyField Oracle - MQTT Ingest Bridge                           ║
+║  "From the network thread to the event loop, safely"              ║
+╚══════════════════════════════════════════════════════════════════╝
+HEADY_BRAND:END
+"""
+
+import asyncio
+import logging
+import time
+from typing import Awaitable, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class IngestBridge:
+    """Hands raw MQTT messages to a pool of async consumers through a bounded queue
+
+    ``submit_threadsafe`` may be called from any thread (paho runs its
+    callbacks on the ``loop_start()`` network thread); the message is moved
+    onto the event loop with ``call_soon_threadsafe`` and enqueued there.
+    When the queue is full the message is refused and counted as an overflow
+    rather than blocking the network thread.
+
+    Each message carries its receive time, so the optional ``queue_wait`` and
+    ``latency`` histograms record time spent queued and receive-to-done time.
+    """
+
+    def __init__(self, handler: Callable[[str, bytes], Awaitable[bool]],
+                 max_queue: int = 10000, workers: int = 8,
+                 queue_wait=None, latency=None):
+        self._handler = handler
+        self.max_queue = max_queue
+        self.worker_count = workers
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=max_queue)
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._workers: List[asyncio.Task] = []
+        self._queue_wait = queue_wait
+        self._latency = latency
+
+        # Counters surfaced on /status
+        self.in_flight = 0
+        self.received = 0
+        self.processed = 0
+        self.dropped = 0
+        self.failed = 0
+        self.overflow = 0
+
+    def start(self):
+        """Bind to the running loop and start the consumer workers"""
+        self._loop = asyncio.get_running_loop()
+        for i in range(self.worker_count):
+            self._workers.append(self._loop.create_task(self._worker(i)))
+
+    def submit_threadsafe(self, topic: str, payload: bytes):
+        """Queue a message from a foreign thread"""
+        if self._loop is None:
+            raise RuntimeError("Ingest bridge not started")
+        self._loop.call_soon_threadsafe(self.submit, topic, payload, time.perf_counter())
+
+    def submit(self, topic: str, payload: bytes, received_at: Optional[float] = None):
+        """Queue a message from the event loop thread"""
+        self.received += 1
+        try:
+            self._queue.put_nowait((topic, payload, received_at or time.perf_counter()))
+        except asyncio.QueueFull:
+            self.overflow += 1
+
+    async def _worker(self, index: int):
+        while True:
+            topic, payload, received_at = await self._queue.get()
+            if self._queue_wait is not None:
+                self._queue_wait.observe(time.perf_counter() - received_at)
+            self.in_flight += 1
+            try:
+                if await self._handler(topic, payload):
+                    self.processed += 1
+                else:
+                    self.dropped += 1
+            except Exception as e:
+                self.failed += 1
+                logger.error(f"Ingest worker {index} failed on {topic}: {e}")
+            finally:
+                self.in_flight -= 1
+                if self._latency is not None:
+                    self._latency.observe(time.perf_counter() - received_at)
+                self._queue.task_done()
+
+    async def stop(self, timeout: float = 10.0):
+        """Let queued messages drain, then stop the workers"""
+        if not self._workers:
+            return
+        try:
+            await asyncio.wait_for(self._queue.join(), timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"Ingest queue not drained within {timeout}s; "
+                           f"{self._queue.qsize()} messages abandoned")
+        for task in self._workers:
+            task.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+    def stats(self) -> Dict:
+        """Snapshot of bridge counters"""
+        return {
+            "queue_depth": self._queue.qsize(),
+            "queue_capacity": self.max_queue,
+            "workers": self.worker_count,
+            "in_flight": self.in_flight,
+            "received": self.received,
+            "processed": self.processed,
+            "dropped": self.dropped,
+            "failed": self.failed,
+            "overflow": self.overflow,
+        }
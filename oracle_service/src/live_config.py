@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+HEADY_BRAND:BEGIN
+╔══════════════════════════════════════════════════════════════════╗
+║  HeadyField Oracle - Live Configuration                           ║
+║  "Turn the knob, not the power switch"                            ║
+╚══════════════════════════════════════════════════════════════════╝
+HEADY_BRAND:END
+
+Settings that can change while the oracle runs. Each setting has a parser, a
+range check, and an ``apply`` callback that pushes the new value into the
+component that uses it. ``PUT /config`` applies a set of updates all or
+nothing: every value is parsed and checked before any is applied. Keys that
+are not registered here only take effect from the environment at startup.
+Those are reported as ``RestartRequired`` so the caller can fall back to
+recreating the container.
+"""
+
+import logging
+import math
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class RestartRequired(Exception):
+    """Raised for settings that cannot be changed without a restart"""
+
+    def __init__(self, keys: List[str]):
+        super().__init__(f"Not live-configurable (restart required): {', '.join(keys)}")
+        self.keys = keys
+
+
+def parse_bool(value: Any) -> bool:
+    if isinstance(value, bool):
+        return value
+    text = str(value).strip().lower()
+    if text in ('true', '1', 'yes', 'on'):
+        return True
+    if text in ('false', '0', 'no', 'off'):
+        return False
+    raise ValueError(f"not a boolean: {value!r}")
+
+
+class Setting:
+    """One live-configurable value"""
+
+    __slots__ = ('name', 'parse', 'apply', 'value', 'low', 'high')
+
+    def __init__(self, name: str, parse: Callable[[Any], Any], apply: Callable[[Any], None], value: Any,
+                 low: Optional[float] = None, high: Optional[float] = None):
+        self.name = name
+        self.parse = parse
+        self.apply = apply
+        self.value = value
+        self.low = low
+        self.high = high
+
+    def check(self, raw: Any) -> Any:
+        value = self.parse(raw)
+        # NaN passes every comparison below, so non-finite numbers are refused first
+        if isinstance(value, float) and not math.isfinite(value):
+            raise ValueError(f"{self.name}={value} is not a finite number")
+        if self.low is not None and value < self.low or self.high is not None and value > self.high:
+            raise ValueError(f"{self.name}={value} outside [{self.low}, {self.high}]")
+        return value
+
+
+class LiveConfig:
+    """Registry of settings that apply without a restart"""
+
+    def __init__(self):
+        self._settings: Dict[str, Setting] = {}
+        self.version = 0
+        self.updated_at: Optional[float] = None
+
+    def register(self, name: str, parse: Callable[[Any], Any], apply: Callable[[Any], None], value: Any,
+                 low: Optional[float] = None, high: Optional[float] = None):
+        self._settings[name] = Setting(name, parse, apply, value, low, high)
+
+    def update(self, updates: Dict[str, Any]) -> Dict[str, Any]:
+        """Validate then apply ``updates``; raises RestartRequired or ValueError without applying any"""
+        unknown = sorted(key for key in updates if key not in self._settings)
+        if unknown:
+            raise RestartRequired(unknown)
+        parsed = {key: self._settings[key].check(raw) for key, raw in updates.items()}
+
+        for key, value in parsed.items():
+            setting = self._settings[key]
+            if value != setting.value:
+                setting.apply(value)
+                logger.info(f"Live config: {key} {setting.value} -> {value}")
+                setting.value = value
+        self.version += 1
+        self.updated_at = time.time()
+        return parsed
+
+    def values(self) -> Dict[str, Any]:
+        return {name: setting.value for name, setting in self._settings.items()}
+
+    def as_env(self) -> Dict[str, str]:
+        """Current values as environment strings (for processes started later)"""
+        return {name: str(value).lower() if isinstance(value, bool) else str(value)
+                for name, value in self.values().items()}
+
+    def describe(self) -> Dict:
+        return {
+            "version": self.version,
+            "updated_at": self.updated_at,
+            "settings": {name: {"value": s.value, "low": s.low, "high": s.high}
+                         for name, s in self._settings.items()},
+        }
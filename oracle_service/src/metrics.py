@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+"""
+HEADY_BRAND:BEGIN
+╔══════════════════════════════════════════════════════════════════╗
+║  HeadyField Oracle - Hot-Path Metrics                             ║
+║  "Measure the tail, not the average"                              ║
+╚══════════════════════════════════════════════════════════════════╝
+HEADY_BRAND:END
+
+Dependency-free counters, gauges and fixed-bucket histograms rendered in the
+Prometheus text exposition format. Observing a value is a ``bisect`` into a
+tuple of bucket bounds plus two additions, cheap enough for every message.
+Everything runs on the event loop thread, so no locking is needed; values
+computed elsewhere (queue depths, existing counters) are exported through
+callbacks evaluated at scrape time instead of being mirrored on the hot path.
+"""
+
+import math
+from bisect import bisect_left
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+# Seconds; spans sub-millisecond decode up to multi-second InfluxDB stalls
+LATENCY_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025,
+                   0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+Labels = Tuple[Tuple[str, str], ...]
+# (sample name, labels, value)
+Sample = Tuple[str, Labels, float]
+
+
+def _format_labels(labels: Labels) -> str:
+    if not labels:
+        return ''
+    escaped = (str(v).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for _, v in labels)
+    return '{' + ','.join(f'{k}="{v}"' for (k, _), v in zip(labels, escaped)) + '}'
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return '+Inf'
+    if isinstance(value, int) or float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class Histogram:
+    """Cumulative fixed-bucket histogram for one label set"""
+
+    __slots__ = ('bounds', 'counts', 'sum', 'count')
+
+    def __init__(self, bounds: Sequence[float] = LATENCY_BUCKETS):
+        self.bounds = tuple(bounds)
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def samples(self, name: str, labels: Labels) -> List[Sample]:
+        out: List[Sample] = []
+        running = 0
+        for bound, count in zip(self.bounds + (math.inf,), self.counts):
+            running += count
+            out.append((f"{name}_bucket", labels + (('le', _format_value(bound)),), running))
+        out.append((f"{name}_sum", labels, self.sum))
+        out.append((f"{name}_count", labels, self.count))
+        return out
+
+
+class Counter:
+    """Monotonic counter for one label set"""
+
+    __slots__ = ('value',)
+
+    def __init__(self):
+        self.value = 0
+
+    def inc(self, amount: float = 1):
+        self.value += amount
+
+
+class Family:
+    """A named metric with a fixed set of label names and one child per label set"""
+
+    def __init__(self, kind: str, name: str, help_text: str, label_names: Sequence[str] = (),
+                 buckets: Sequence[float] = LATENCY_BUCKETS,
+                 callback: Optional[Callable[[], object]] = None):
+        self.kind = kind
+        self.name = name
+        self.help = help_text
+        self.label_names = tuple(label_names)
+        self.buckets = tuple(buckets)
+        self.callback = callback
+        self._children: Dict[Tuple[str, ...], object] = {}
+
+    def labels(self, *values: str):
+        """Child metric for these label values; cache the result on hot paths"""
+        child = self._children.get(values)
+        if child is None:
+            if len(values) != len(self.label_names):
+                raise ValueError(f"{self.name} expects labels {self.label_names}")
+            child = Histogram(self.buckets) if self.kind == 'histogram' else Counter()
+            self._children[values] = child
+        return child
+
+    def samples(self) -> List[Sample]:
+        if self.callback is not None:
+            return self._callback_samples()
+        out: List[Sample] = []
+        for values, child in self._children.items():
+            labels = tuple(zip(self.label_names, values))
+            if isinstance(child, Histogram):
+                out.extend(child.samples(self.name, labels))
+            else:
+                out.append((self.name, labels, child.value))
+        return out
+
+    def _callback_samples(self) -> List[Sample]:
+        """Callbacks return a number, or a dict of label value (tuple) -> number"""
+        result = self.callback()
+        if isinstance(result, dict):
+            out = []
+            for values, value in result.items():
+                values = values if isinstance(values, tuple) else (values,)
+                out.append((self.name, tuple(zip(self.label_names, values)), value))
+            return out
+        return [(self.name, (), result)]
+
+
+class MetricsRegistry:
+    """Holds metric families and renders them as Prometheus text"""
+
+    def __init__(self, prefix: str = 'heady_oracle'):
+        self.prefix = prefix
+        self._families: Dict[str, Family] = {}
+
+    def _register(self, family: Family) -> Family:
+        if family.name in self._families:
+            raise ValueError(f"Metric {family.name} already registered")
+        self._families[family.name] = family
+        return family
+
+    def histogram(self, name: str, help_text: str, label_names: Sequence[str] = (),
+                  buckets: Sequence[float] = LATENCY_BUCKETS) -> Family:
+        return self._register(Family('histogram', f"{self.prefix}_{name}", help_text, label_names, buckets))
+
+    def counter(self, name: str, help_text: str, label_names: Sequence[str] = (),
+                callback: Optional[Callable[[], object]] = None) -> Family:
+        return self._register(Family('counter', f"{self.prefix}_{name}", help_text, label_names,
+                                     callback=callback))
+
+    def gauge(self, name: str, help_text: str, label_names: Sequence[str] = (),
+              callback: Optional[Callable[[], object]] = None) -> Family:
+        """Gauges are always callback-driven: they report a value owned elsewhere"""
+        return self._register(Family('gauge', f"{self.prefix}_{name}", help_text, label_names,
+                                     callback=callback))
+
+    def collect(self) -> List[Tuple[str, str, str, List[Sample]]]:
+        """(name, type, help, samples) for every family"""
+        return [(f.name, f.kind, f.help, f.samples()) for f in self._families.values()]
+
+    def render(self) -> str:
+        return render_text(self.collect())
+
+
+def render_text(families: Iterable[Tuple[str, str, str, List[Sample]]]) -> str:
+    """Prometheus text exposition format (version 0.0.4)"""
+    lines: List[str] = []
+    for name, kind, help_text, samples in families:
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {kind}")
+        for sample_name, labels, value in samples:
+            lines.append(f"{sample_name}{_format_labels(labels)} {_format_value(value)}")
+    return "\n".join(lines) + "\n"
+
+
+def merge_families(collections: Iterable[Tuple[str, List[Tuple[str, str, str, List[Sample]]]]]
+                   ) -> List[Tuple[str, str, str, List[Sample]]]:
+    """Combine the registries of several processes, each given as (shard name, families)
+
+    Used to aggregate worker processes. Counters and histograms are summed
+    over identical names and labels; histograms share bucket bounds, so
+    summing their cumulative buckets, sums and counts is exact. Gauges do not
+    add up (N connected flags are not N connections), so every process keeps
+    its own gauge samples under an extra ``shard`` label.
+    """
+    merged: Dict[str, Tuple[str, str, Dict[Tuple[str, Labels], float]]] = {}
+    for shard, families in collections:
+        for name, kind, help_text, samples in families:
+            entry = merged.setdefault(name, (kind, help_text, {}))
+            values = entry[2]
+            for sample_name, labels, value in samples:
+                if kind == 'gauge':
+                    values[(sample_name, labels + (('shard', shard),))] = value
+                else:
+                    key = (sample_name, labels)
+                    values[key] = values.get(key, 0) + value
+    return [(name, kind, help_text, [(sample_name, labels, value) for (sample_name, labels), value in values.items()])
+            for name, (kind, help_text, values) in merged.items()]
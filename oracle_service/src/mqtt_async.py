@@ -0,0 +1,254 @@
+#!/usr/bin/env python3
+"""
+HEADY_BRAND:BEGIN
+╔══════════════════════════════════════════════════════════════════╗
+║  HeadyField Oracle - Native asyncio MQTT Client                   ║
+║  "No threads between the broker and the oracle"                   ║
+╚══════════════════════════════════════════════════════════════════╝
+HEADY_BRAND:END
+
+Minimal MQTT 3.1.1 subscriber built on asyncio streams. It implements only
+what the oracle needs: CONNECT with username/password, SUBSCRIBE (including
+``$share/<group>/...`` shared subscriptions), QoS 0/1 PUBLISH receipt with
+PUBACK, keepalive pings and reconnects driven by FibonacciBackoff.
+"""
+
+import asyncio
+import logging
+import struct
+import uuid
+from typing import Callable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Control packet types (upper nibble of the fixed header)
+CONNECT = 0x10
+CONNACK = 0x20
+PUBLISH = 0x30
+PUBACK = 0x40
+SUBSCRIBE = 0x80
+SUBACK = 0x90
+PINGREQ = 0xC0
+PINGRESP = 0xD0
+DISCONNECT = 0xE0
+
+CONNACK_CODES = {
+    1: "unacceptable protocol version",
+    2: "identifier rejected",
+    3: "server unavailable",
+    4: "bad user name or password",
+    5: "not authorized",
+}
+
+
+def shared_topic(topic: str, group: Optional[str]) -> str:
+    """Wrap a topic filter in a ``$share/<group>/`` shared subscription"""
+    return f"$share/{group}/{topic}" if group else topic
+
+
+def _encode_string(value: str) -> bytes:
+    data = value.encode()
+    return struct.pack("!H", len(data)) + data
+
+
+def _encode_length(length: int) -> bytes:
+    out = bytearray()
+    while True:
+        byte = length % 128
+        length //= 128
+        if length:
+            byte |= 0x80
+        out.append(byte)
+        if not length:
+            return bytes(out)
+
+
+def _packet(header: int, body: bytes = b"") -> bytes:
+    return bytes([header]) + _encode_length(len(body)) + body
+
+
+class MQTTProtocolError(Exception):
+    """Raised when the broker sends something we cannot handle"""
+
+
+class MQTTSubscriptionRefused(MQTTProtocolError):
+    """Raised when the broker answers SUBSCRIBE with a failure return code"""
+
+
+class AsyncMQTTClient:
+    """Subscribe-only MQTT client running entirely on the asyncio event loop"""
+
+    def __init__(self, host: str, port: int, on_message: Callable[[str, bytes], None],
+                 backoff, username: Optional[str] = None, password: Optional[str] = None,
+                 client_id: Optional[str] = None, keepalive: int = 60):
+        self.host = host
+        self.port = port
+        self.on_message = on_message
+        self.backoff = backoff
+        self.username = username
+        self.password = password
+        self.client_id = client_id or f"heady-oracle-{uuid.uuid4().hex[:8]}"
+        self.keepalive = keepalive
+
+        self._topics: List[Tuple[str, int]] = []
+        self._writer: Optional[asyncio.StreamWriter] = None
+        self._task: Optional[asyncio.Task] = None
+        self._packet_id = 0
+        self._connected = asyncio.Event()
+        self.reconnects = 0
+
+    def is_connected(self) -> bool:
+        return self._connected.is_set()
+
+    async def wait_connected(self, timeout: Optional[float] = None):
+        await asyncio.wait_for(self._connected.wait(), timeout)
+
+    def start(self, topics: List[Tuple[str, int]]):
+        """Start the connect/read/reconnect loop for the given topic filters"""
+        self._topics = list(topics)
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        """Disconnect cleanly and stop reconnecting"""
+        if self._task is None:
+            return
+        if self._writer is not None and self.is_connected():
+            try:
+                self._writer.write(_packet(DISCONNECT))
+                await self._writer.drain()
+            except Exception:
+                pass
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+
+    async def _run(self):
+        attempt = 0
+        while True:
+            try:
+                await self._session()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"MQTT session to {self.host}:{self.port} ended: {e}")
+            finally:
+                if self._connected.is_set():
+                    attempt = 0  # a session was established, restart the backoff
+                self._connected.clear()
+                self._close_writer()
+
+            delay = self.backoff.get_delay(attempt) / 1000.0
+            attempt += 1
+            self.reconnects += 1
+            logger.info(f"Reconnecting to MQTT broker in {delay}s")
+            await asyncio.sleep(delay)
+
+    async def _session(self):
+        reader, writer = await asyncio.open_connection(self.host, self.port)
+        self._writer = writer
+
+        writer.write(self._connect_packet())
+        await writer.drain()
+        header, body = await asyncio.wait_for(self._read_packet(reader), self.keepalive)
+        if header & 0xF0 != CONNACK or len(body) < 2:
+            raise MQTTProtocolError(f"Expected CONNACK, got 0x{header:02x}")
+        if body[1] != 0:
+            raise MQTTProtocolError(f"Connection refused: {CONNACK_CODES.get(body[1], body[1])}")
+
+        writer.write(self._subscribe_packet())
+        await writer.drain()
+        await asyncio.wait_for(self._await_suback(reader, writer), self.keepalive)
+
+        self._connected.set()
+        logger.info(f"MQTT connection established to {self.host}:{self.port} "
+                    f"({', '.join(t for t, _ in self._topics)})")
+
+        pinger = asyncio.get_running_loop().create_task(self._ping(writer))
+        try:
+            while True:
+                # The broker must answer our pings, so silence means a dead link
+                header, body = await asyncio.wait_for(self._read_packet(reader), self.keepalive * 1.5)
+                await self._dispatch(header, body, writer)
+        finally:
+            pinger.cancel()
+
+    async def _await_suback(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """Read until the broker grants our SUBSCRIBE; a refusal ends the session"""
+        while True:
+            header, body = await self._read_packet(reader)
+            if header & 0xF0 != SUBACK:
+                await self._dispatch(header, body, writer)
+                continue
+            if len(body) < 2 or struct.unpack_from("!H", body)[0] != self._packet_id:
+                logger.debug("Ignoring SUBACK for another packet id")
+                continue
+            if len(body) < 2 + len(self._topics) or any(code == 0x80 for code in body[2:]):
+                raise MQTTSubscriptionRefused(f"Subscription refused for {self._topics}")
+            return
+
+    async def _dispatch(self, header: int, body: bytes, writer: asyncio.StreamWriter):
+        kind = header & 0xF0
+        if kind == PUBLISH:
+            qos = (header >> 1) & 0x03
+            topic_len = struct.unpack_from("!H", body)[0]
+            topic = body[2:2 + topic_len].decode()
+            offset = 2 + topic_len
+            if qos:
+                packet_id = body[offset:offset + 2]
+                offset += 2
+                if qos == 1:
+                    writer.write(_packet(PUBACK, packet_id))
+                else:
+                    raise MQTTProtocolError("QoS 2 delivery not supported")
+            self.on_message(topic, body[offset:])
+        elif kind == PINGRESP:
+            pass
+        else:
+            logger.debug(f"Ignoring MQTT packet 0x{header:02x}")
+
+    async def _ping(self, writer: asyncio.StreamWriter):
+        interval = max(self.keepalive / 2, 1)
+        while True:
+            await asyncio.sleep(interval)
+            writer.write(_packet(PINGREQ))
+            await writer.drain()
+
+    @staticmethod
+    async def _read_packet(reader: asyncio.StreamReader) -> Tuple[int, bytes]:
+        header = (await reader.readexactly(1))[0]
+        length, multiplier = 0, 1
+        while True:
+            byte = (await reader.readexactly(1))[0]
+            length += (byte & 0x7F) * multiplier
+            if not byte & 0x80:
+                break
+            multiplier *= 128
+            if multiplier > 128 ** 3:
+                raise MQTTProtocolError("Malformed remaining length")
+        body = await reader.readexactly(length) if length else b""
+        return header, body
+
+    def _connect_packet(self) -> bytes:
+        flags = 0x02  # clean session
+        payload = _encode_string(self.client_id)
+        if self.username:
+            flags |= 0x80
+            payload += _encode_string(self.username)
+            if self.password:
+                flags |= 0x40
+                payload += _encode_string(self.password)
+        variable = _encode_string("MQTT") + bytes([4, flags]) + struct.pack("!H", self.keepalive)
+        return _packet(CONNECT, variable + payload)
+
+    def _subscribe_packet(self) -> bytes:
+        self._packet_id = self._packet_id % 0xFFFF + 1
+        body = struct.pack("!H", self._packet_id)
+        for topic, qos in self._topics:
+            body += _encode_string(topic) + bytes([qos])
+        return _packet(SUBSCRIBE | 0x02, body)
+
+    def _close_writer(self):
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
@@ -14,13 +14,31 @@ import logging
 import os
 import time
 from datetime import datetime, timezone
-from typing import Dict, List, Optional
+from typing import Any, Dict, List, Optional
 
 import uvicorn
-from fastapi import FastAPI, HTTPException, status
+from fastapi import Body, FastAPI, HTTPException, Query, status
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
 from paho.mqtt.client import Client as MQTTClient
-from influxdb_client import InfluxDBClient, Point
+from influxdb_client import InfluxDBClient
 from influxdb_client.client.write_api import SYNCHRONOUS
+from influxdb_client.rest import ApiException
+
+from .brain_client import BrainClient, BrainUnavailable
+from .dedup import ReplayIndex
+from .ingest import IngestBridge
+from .live_config import LiveConfig, RestartRequired, parse_bool
+from .metrics import MetricsRegistry, merge_families, render_text
+from .mqtt_async import AsyncMQTTClient, shared_topic
+from .payload_codecs import PayloadDecoder
+from .recent import MAX_LIMIT, RecentReadings, clamp_limit
+from .records import SensorReading
+from .rollups import StreamingRollups
+from .scoring import AnomalyScorer, Verdict, parse_limits, parse_ranges
+from .sharding import ShardSupervisor
+from .spool import SegmentSpool, SpoolDrainer, SpoolFull, spool_writable
+from .verification import KeyStore, SensorKeyCache, SignatureVerifier
+from .write_pipeline import BatchedWriter
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -47,21 +65,69 @@ class FibonacciBackoff:
             return self.sequence[-1] * self.base_delay
         return self.sequence[attempt] * self.base_delay
 
+def influx_rejected(error: Exception) -> bool:
+    """A 4xx other than 429: InfluxDB refuses the body itself, so retrying cannot help"""
+    return isinstance(error, ApiException) and error.status is not None and 400 <= error.status < 500 \
+        and error.status != 429
+
 class HeadyOracle:
     """Main oracle service for cryptographic verification of field data"""
     
     def __init__(self):
-        self.mqtt_client = MQTTClient()
         self.influx_client = None
         self.write_api = None
-        self.backoff = FibonacciBackoff()
+        self.influx_ready = asyncio.Event()
+        self._startup_tasks: List[asyncio.Task] = []
+        self._started_at: Optional[float] = None
+        self.startup_seconds: Dict[str, float] = {}
+        self._mqtt_enabled = True
+        # BACKOFF_BASE_DELAY_MS is also live; reading it here keeps a live change across respawns and swaps
+        self.backoff = FibonacciBackoff(
+            max_retries=int(os.getenv('FIBONACCI_MAX_RETRIES', '13')),
+            base_delay=int(os.getenv('BACKOFF_BASE_DELAY_MS', os.getenv('FIBONACCI_BASE_DELAY', '1000')))
+        )
         self.verification_threshold = float(os.getenv('VERIFICATION_THRESHOLD', '0.95'))
+        self.maintenance = parse_bool(os.getenv('MAINTENANCE_MODE', 'false'))
+        
+        # Hot-path instrumentation, exported on /metrics
+        self.metrics = MetricsRegistry()
+        stage_latency = self.metrics.histogram(
+            'stage_duration_seconds', 'Per-message time spent in each pipeline stage', ['stage'])
+        self._stage_latency = {stage: stage_latency.labels(stage) for stage in (
+            'queue_wait', 'decode', 'verify', 'score', 'brain', 'store', 'total')}
+        write_latency = self.metrics.histogram(
+            'write_duration_seconds', 'Time to write one batch to its sink', ['sink'])
+        dropped = self.metrics.counter(
+            'messages_dropped_total', 'Messages discarded before storage', ['reason'])
+        self._dropped = {reason: dropped.labels(reason) for reason in (
+            'decode_error', 'stale', 'duplicate', 'invalid_signature', 'malformed', 'implausible')}
         
         # MQTT Configuration
         self.mqtt_broker = os.getenv('MQTT_BROKER', 'heady_mqtt')
         self.mqtt_port = int(os.getenv('MQTT_PORT', '1883'))
         self.mqtt_username = os.getenv('MQTT_USERNAME', 'heady_field')
         self.mqtt_password = os.getenv('MQTT_PASSWORD', '')
+        self.mqtt_engine = os.getenv('MQTT_ENGINE', 'paho').lower()  # paho | asyncio
+        self.mqtt_shared_group = os.getenv('MQTT_SHARED_GROUP', '')
+        # One delivery guarantee whichever client runs; duplicates from QoS 1 redelivery hit the replay index
+        self.mqtt_qos = int(os.getenv('MQTT_QOS', '1'))
+        if self.mqtt_qos not in (0, 1):
+            raise ValueError(f"MQTT_QOS must be 0 or 1, not {self.mqtt_qos}")
+        self.mqtt_topics = [shared_topic(topic, self.mqtt_shared_group)
+                            for topic in PayloadDecoder.topics("field/+/sensors")]
+        self.decoder = PayloadDecoder()
+        
+        if self.mqtt_engine == 'asyncio':
+            self.mqtt_client = AsyncMQTTClient(
+                self.mqtt_broker,
+                self.mqtt_port,
+                self._on_async_mqtt_message,
+                self.backoff,
+                username=self.mqtt_username,
+                password=self.mqtt_password
+            )
+        else:
+            self.mqtt_client = MQTTClient()
         
         # InfluxDB Configuration
         self.influx_url = os.getenv('INFLUX_URL', 'http://heady_vault:8086')
@@ -69,24 +135,280 @@ class HeadyOracle:
         self.influx_org = os.getenv('INFLUX_ORG', 'HeadyConnection')
         self.influx_bucket = os.getenv('INFLUX_BUCKET', 'field_data')
         
+        # Duplicate / replay suppression
+        self.replay_index = ReplayIndex(
+            window=float(os.getenv('REPLAY_WINDOW_SECONDS', '600')),
+            max_entries=int(os.getenv('REPLAY_MAX_ENTRIES', '1000000')),
+            max_skew=float(os.getenv('REPLAY_MAX_SKEW_SECONDS', '60'))
+        )
+        
+        # Sensor signature verification; strict mode needs provisioned keys, or every reading is rejected
+        key_store = KeyStore(os.getenv('SENSOR_KEYS_PATH', 'config/sensor_keys.json'))
+        signature_mode = os.getenv('SIGNATURE_MODE', 'presence').lower()  # strict | presence
+        if signature_mode == 'strict':
+            try:
+                key_store.check()
+            except (OSError, ValueError) as e:
+                raise RuntimeError(f"SIGNATURE_MODE=strict needs sensor keys: {e}. Provision them "
+                                   f"(see config/sensor_keys.example.json) or set SIGNATURE_MODE=presence") from e
+        self.verifier = SignatureVerifier(
+            SensorKeyCache(
+                key_store,
+                max_size=int(os.getenv('SENSOR_KEY_CACHE_SIZE', '10000')),
+                ttl=float(os.getenv('SENSOR_KEY_TTL', '300'))
+            ),
+            mode=signature_mode,
+            executor=os.getenv('ORACLE_VERIFY_EXECUTOR', 'thread').lower(),  # thread | process
+            workers=int(os.getenv('ORACLE_VERIFY_WORKERS', '0')) or None,
+            batch_size=int(os.getenv('ORACLE_VERIFY_BATCH_SIZE', '256')),
+            batch_window=int(os.getenv('ORACLE_VERIFY_BATCH_WINDOW_MS', '2')) / 1000.0
+        )
+        
+        # Durable write-ahead spool in front of InfluxDB (empty ORACLE_SPOOL_DIR disables it)
+        flush_interval = int(os.getenv('INFLUX_FLUSH_INTERVAL_MS', '1000')) / 1000.0
+        spool_dir = os.getenv('ORACLE_SPOOL_DIR', 'spool')
+        # Unlocked spool directories under the root (swap alternates, old shards) are adopted and drained
+        spool_root = os.getenv('ORACLE_SPOOL_ROOT') or spool_dir
+        if spool_dir and not spool_writable(spool_dir):
+            # e.g. a bind mount Docker created as root while the oracle runs as uid 1000
+            logger.warning(f"Spool disabled; buffering writes in memory until InfluxDB is ready "
+                           f"(fix the ownership of {spool_dir} to make them durable)")
+            spool_dir = ''
+        self.spool = None
+        self.spool_drainer = None
+        if spool_dir:
+            self.spool = SegmentSpool(
+                spool_dir,
+                segment_bytes=int(os.getenv('ORACLE_SPOOL_SEGMENT_MB', '64')) * 1024 * 1024,
+                max_bytes=int(os.getenv('ORACLE_SPOOL_MAX_MB', '1024')) * 1024 * 1024,
+                fsync=os.getenv('ORACLE_SPOOL_FSYNC', 'true').lower() == 'true',
+                root=spool_root
+            )
+            self.spool_drainer = SpoolDrainer(self.spool, self._write_lines, self.backoff,
+                                              seal_after=flush_interval,
+                                              write_latency=write_latency.labels('influxdb'),
+                                              rejected=influx_rejected)
+        
+        # Streaming rollups ahead of storage (empty ROLLUP_WINDOWS disables them)
+        rollup_windows = [int(w) for w in os.getenv('ROLLUP_WINDOWS', '60,3600').split(',') if w.strip()]
+        self.rollups = StreamingRollups(
+            rollup_windows,
+            grace=float(os.getenv('ROLLUP_GRACE_SECONDS', '5')),
+            raw_interval=float(os.getenv('RAW_SAMPLE_INTERVAL', '0')),
+            idle_ttl=float(os.getenv('ROLLUP_IDLE_TTL_SECONDS', '7200'))
+        ) if rollup_windows else None
+        self._rollup_task: Optional[asyncio.Task] = None
+        
+        # Local anomaly scoring; only suspicious readings are escalated to HeadyBrain
+        self.scorer = AnomalyScorer(
+            threshold=self.verification_threshold,
+            alpha=float(os.getenv('ANOMALY_EWMA_ALPHA', '0.05')),
+            warmup=int(os.getenv('ANOMALY_WARMUP', '20')),
+            min_std=float(os.getenv('ANOMALY_MIN_STD', '0.01')),
+            reject_sigma=float(os.getenv('ANOMALY_REJECT_SIGMA', '0')),
+            rate_limits=parse_limits(os.getenv('ANOMALY_RATE_LIMITS', '')),
+            ranges=parse_ranges(os.getenv('ANOMALY_RANGES', '')),
+            max_series=int(os.getenv('ANOMALY_MAX_SERIES', '200000'))
+        ) if os.getenv('ANOMALY_SCORING', 'true').lower() == 'true' else None
+        
+        # In-memory recent readings for the read API (ORACLE_RECENT_PER_SENSOR=0 disables it)
+        recent_per_sensor = int(os.getenv('ORACLE_RECENT_PER_SENSOR', '360'))
+        self.recent = RecentReadings(
+            per_sensor=recent_per_sensor,
+            max_age=float(os.getenv('ORACLE_RECENT_SECONDS', '3600')),
+            max_series=int(os.getenv('ORACLE_RECENT_MAX_SERIES', '5000')),
+            max_readings=int(os.getenv('ORACLE_RECENT_MAX_READINGS', '500000'))
+        ) if recent_per_sensor > 0 else None
+        
+        # Batched write pipeline
+        self.writer = BatchedWriter(
+            self.spool.append if self.spool else self._write_lines,
+            self.backoff,
+            batch_size=int(os.getenv('INFLUX_BATCH_SIZE', '5000')),
+            flush_interval=flush_interval,
+            max_queue=int(os.getenv('INFLUX_WRITE_QUEUE_SIZE', '50000')),
+            write_latency=write_latency.labels('spool' if self.spool else 'influxdb'),
+            # Without a spool, hold batches in memory until InfluxDB answers
+            ready=None if self.spool else self.influx_ready,
+            # A full spool pushes back on ingest until the drainer frees space; nothing is dropped
+            full_errors=(SpoolFull,),
+            # Straight to InfluxDB, a 4xx batch is dropped at once instead of retried for minutes
+            rejected=influx_rejected
+        )
+        
+        # MQTT thread -> event loop handoff
+        self.ingest = IngestBridge(
+            self._process_message,
+            max_queue=int(os.getenv('ORACLE_INGEST_QUEUE_SIZE', '10000')),
+            workers=int(os.getenv('ORACLE_INGEST_WORKERS', '8')),
+            queue_wait=self._stage_latency['queue_wait'],
+            latency=self._stage_latency['total']
+        )
+        
         # HeadyBrain Integration
         self.brain_endpoint = os.getenv('HEADY_BRAIN_ENDPOINT', 'https://headyio.com/api/brain/analyze')
+        self.brain = BrainClient(
+            self.brain_endpoint,
+            api_key=os.getenv('HEADY_BRAIN_API_KEY'),
+            max_in_flight=int(os.getenv('HEADY_BRAIN_MAX_IN_FLIGHT', '4')),
+            rate_per_second=float(os.getenv('HEADY_BRAIN_RATE_LIMIT', '20')),
+            batch=os.getenv('HEADY_BRAIN_BATCH', 'true').lower() == 'true',
+            batch_size=int(os.getenv('HEADY_BRAIN_BATCH_SIZE', '50')),
+            batch_window=int(os.getenv('HEADY_BRAIN_BATCH_WINDOW_MS', '50')) / 1000.0,
+            timeout=float(os.getenv('HEADY_BRAIN_TIMEOUT', '10')),
+            max_pending=int(os.getenv('HEADY_BRAIN_MAX_PENDING', '10000')),
+            temperature=float(os.getenv('AI_TEMPERATURE', '0.7'))
+        )
         
-    async def initialize(self):
-        """Initialize all connections"""
-        await self._setup_mqtt()
-        await self._setup_influxdb()
-        logger.info("HeadyField Oracle initialized successfully")
+        # Multi-process mode: this process only routes MQTT messages to field-sharded workers
+        workers = os.getenv('ORACLE_WORKERS', '1')
+        workers = (os.cpu_count() or 1) if workers == 'auto' else int(workers)
+        self.shard_index = os.getenv('ORACLE_SHARD_INDEX')
+        self.shards = ShardSupervisor(
+            workers,
+            spool_dir=spool_dir,
+            spool_root=spool_root if spool_dir else '',
+            batch_size=int(os.getenv('ORACLE_SHARD_BATCH_SIZE', '256')),
+            batch_window=int(os.getenv('ORACLE_SHARD_BATCH_WINDOW_MS', '5')) / 1000.0
+        ) if workers > 1 else None
+        self._register_metrics()
+        self.config = LiveConfig()
+        self._register_live_config()
+        
+    def _register_live_config(self):
+        """Settings the MIDI bridge (or an operator) can change through /config without a restart"""
+        def set_threshold(value: float):
+            self.verification_threshold = value
+            if self.scorer:
+                self.scorer.set_threshold(value)
+
+        self.config.register('VERIFICATION_THRESHOLD', float, set_threshold,
+                             self.verification_threshold, low=0.5, high=0.9999)
+        self.config.register('AI_TEMPERATURE', float, lambda value: setattr(self.brain, 'temperature', value),
+                             self.brain.temperature, low=0.0, high=2.0)
+        self.config.register('HEADY_BRAIN_RATE_LIMIT', float, self.brain.limiter.set_rate,
+                             self.brain.limiter.rate, low=0.1, high=1000.0)
+        self.config.register('BACKOFF_BASE_DELAY_MS', int, lambda value: setattr(self.backoff, 'base_delay', value),
+                             self.backoff.base_delay, low=10, high=60000)
+        self.config.register('MAINTENANCE_MODE', parse_bool, lambda value: setattr(self, 'maintenance', value),
+                             self.maintenance)
+    
+    def _register_metrics(self):
+        """Export component counters and gauges, evaluated at scrape time"""
+        self.metrics.counter('messages_total', 'MQTT messages by ingest outcome', ['outcome'],
+                             callback=lambda: {outcome: getattr(self.ingest, outcome) for outcome in (
+                                 'received', 'processed', 'dropped', 'failed', 'overflow')})
+        self.metrics.counter('signatures_total', 'Signature verification results', ['result'],
+                             callback=lambda: {'verified': self.verifier.verified,
+                                               'rejected': self.verifier.rejected})
+        self.metrics.counter('brain_requests_total', 'HeadyBrain HTTP requests by result', ['result'],
+                             callback=lambda: {'sent': self.brain.requests, 'failed': self.brain.failures,
+                                               'rejected': self.brain.rejected, 'shed': self.brain.shed})
+        if self.scorer:
+            self.metrics.counter('readings_scored_total', 'Readings scored locally by verdict', ['verdict'],
+                                 callback=lambda: {'suspicious': self.scorer.suspicious,
+                                                   'rejected': self.scorer.rejected,
+                                                   'untracked': self.scorer.untracked,
+                                                   'total': self.scorer.scored})
+            self.metrics.counter('scoring_series_evicted_total', 'Idle series evicted from a full scoring table',
+                                 callback=lambda: self.scorer.evicted)
+        self.metrics.counter('records_written_total', 'Line-protocol records accepted by the write pipeline',
+                             callback=lambda: self.writer.records_written)
+        self.metrics.counter('records_dropped_total', 'Line-protocol records dropped after exhausting retries',
+                             callback=lambda: self.writer.records_dropped)
+        self.metrics.counter('records_rejected_total', 'Line-protocol records InfluxDB rejected, dropped unretried',
+                             callback=lambda: self.writer.records_rejected)
+        self.metrics.counter('write_retries_total', 'Batch write retries',
+                             callback=lambda: self.writer.retries)
+        self.metrics.gauge('in_flight', 'Work currently in progress', ['component'],
+                           callback=lambda: {'ingest': self.ingest.in_flight, 'brain': self.brain.in_flight})
+        self.metrics.gauge('queue_depth', 'Items waiting in internal queues', ['queue'],
+                           callback=lambda: {'ingest': self.ingest.stats()['queue_depth'],
+                                             'write': self.writer.stats()['queue_depth'],
+                                             'brain': self.brain.stats()['pending']})
+        self.metrics.gauge('mqtt_connected', 'Whether the MQTT client is connected',
+                           callback=lambda: int(bool(self.mqtt_client.is_connected())))
+        self.metrics.gauge('influx_connected', 'Whether the InfluxDB write API is initialized',
+                           callback=lambda: int(self.write_api is not None))
+        if self.shards:
+            self.metrics.counter('shard_messages_total', 'Messages handed to each worker process', ['shard', 'result'],
+                                 callback=lambda: {
+                                     **{(str(i), 'routed'): n for i, n in enumerate(self.shards.routed)},
+                                     **{(str(i), 'overflow'): n for i, n in enumerate(self.shards.overflow)}})
+        if self.spool:
+            self.metrics.gauge('spool_bytes', 'Bytes held in the on-disk spool',
+                               callback=lambda: self.spool.stats()['bytes'])
+            self.metrics.counter('spool_records_quarantined_total', 'Spooled batches InfluxDB rejected for good',
+                                 callback=lambda: self.spool_drainer.records_quarantined)
+        
+    async def initialize(self, connect_mqtt: bool = True):
+        """Start the pipeline and bring MQTT and InfluxDB up concurrently in the background"""
+        self._started_at = time.monotonic()
+        self._mqtt_enabled = connect_mqtt
+        if self.shards:
+            self.shards.start()
+            self._startup_tasks = [asyncio.create_task(self._keep_trying('mqtt', self._setup_mqtt))]
+            logger.info(f"HeadyField Oracle supervising {self.shards.workers} shard workers")
+            return
+        if self.spool:
+            # May wait for a spool lock held by another oracle's adoption pass
+            await asyncio.to_thread(self.spool.open)
+        self.writer.start()
+        self.verifier.start()
+        self.brain.start()
+        self.ingest.start()
+        if self.rollups:
+            self._rollup_task = asyncio.create_task(self._flush_rollups())
+        if self.spool:
+            self.spool_drainer.start()
+        
+        # Neither connection waits for the other; ingest runs as soon as MQTT is up and
+        # verified readings buffer in the spool or the write queue until InfluxDB is ready
+        self._startup_tasks = [asyncio.create_task(self._keep_trying('influxdb', self._setup_influxdb))]
+        if connect_mqtt:
+            self._startup_tasks.append(asyncio.create_task(self._keep_trying('mqtt', self._setup_mqtt)))
+        logger.info("HeadyField Oracle started; connecting to MQTT and InfluxDB")
+    
+    async def shutdown(self):
+        """Stop ingest and flush pending writes"""
+        if self._mqtt_enabled:
+            if self.mqtt_engine == 'asyncio':
+                await self.mqtt_client.stop()
+            else:
+                self.mqtt_client.loop_stop()
+                self.mqtt_client.disconnect()
+        for task in self._startup_tasks:
+            task.cancel()
+        if self.shards:
+            await self.shards.stop()
+            logger.info("HeadyField Oracle shut down")
+            return
+        await self.ingest.stop()
+        await self.verifier.stop()
+        await self.brain.stop()
+        if self.rollups:
+            self._rollup_task.cancel()
+            for line in self.rollups.flush_all():
+                await self.writer.submit(line)
+        await self.writer.stop()
+        if self.spool:
+            await self.spool_drainer.stop()
+            self.spool.close()
+        if self.influx_client:
+            self.influx_client.close()
+        logger.info("HeadyField Oracle shut down")
     
     async def _setup_mqtt(self):
         """Setup MQTT connection with Fibonacci backoff"""
+        if self.mqtt_engine == 'asyncio':
+            # Reconnects are handled inside the client's own loop
+            self.mqtt_client.start([(topic, self.mqtt_qos) for topic in self.mqtt_topics])
+            await self.mqtt_client.wait_connected()
+            return
+        
         for attempt in range(self.backoff.max_retries):
             try:
-                self.mqtt_client.username_pw_set(self.mqtt_username, self.mqtt_password)
-                self.mqtt_client.connect(self.mqtt_broker, self.mqtt_port, 60)
-                self.mqtt_client.on_message = self._on_mqtt_message
-                self.mqtt_client.subscribe("field/+/sensors")
-                self.mqtt_client.loop_start()
+                await asyncio.to_thread(self._connect_mqtt)
                 logger.info("MQTT connection established")
                 return
             except Exception as e:
@@ -96,25 +418,24 @@ class HeadyOracle:
         
         raise Exception("Failed to establish MQTT connection after maximum retries")
     
+    def _connect_mqtt(self):
+        """Connect, subscribe and start the paho network thread (blocking)"""
+        self.mqtt_client.username_pw_set(self.mqtt_username, self.mqtt_password)
+        self.mqtt_client.on_message = self._on_mqtt_message
+        self.mqtt_client.connect(self.mqtt_broker, self.mqtt_port, 60)
+        self.mqtt_client.subscribe([(topic, self.mqtt_qos) for topic in self.mqtt_topics])
+        self.mqtt_client.loop_start()
+    
     async def _setup_influxdb(self):
         """Setup InfluxDB connection with Fibonacci backoff"""
         for attempt in range(self.backoff.max_retries):
             try:
-                self.influx_client = InfluxDBClient(
-                    url=self.influx_url,
-                    token=self.influx_token,
-                    org=self.influx_org
-                )
-                self.write_api = self.influx_client.write_api(write_options=SYNCHRONOUS)
-                
-                # Test connection
-                health = self.influx_client.health()
-                if health.status == "pass":
-                    logger.info("InfluxDB connection established")
-                    return
-                else:
-                    raise Exception(f"InfluxDB health check failed: {health.message}")
-                    
+                client = await asyncio.to_thread(self._connect_influxdb)
+                self.influx_client = client
+                self.write_api = client.write_api(write_options=SYNCHRONOUS)
+                self.influx_ready.set()
+                logger.info("InfluxDB connection established")
+                return
             except Exception as e:
                 delay = self.backoff.get_delay(attempt) / 1000.0
                 logger.warning(f"InfluxDB connection attempt {attempt + 1} failed: {e}. Retrying in {delay}s")
@@ -122,71 +443,247 @@ class HeadyOracle:
         
         raise Exception("Failed to establish InfluxDB connection after maximum retries")
     
+    def _connect_influxdb(self) -> InfluxDBClient:
+        """Create an InfluxDB client and check its health (blocking)"""
+        client = InfluxDBClient(
+            url=self.influx_url,
+            token=self.influx_token,
+            org=self.influx_org
+        )
+        try:
+            health = client.health()
+            if health.status != "pass":
+                raise Exception(f"InfluxDB health check failed: {health.message}")
+        except Exception:
+            client.close()
+            raise
+        return client
+    
+    async def _keep_trying(self, name: str, setup):
+        """Run a connection setup until it succeeds, restarting its backoff after each round"""
+        while True:
+            try:
+                await setup()
+                self.startup_seconds[name] = round(time.monotonic() - self._started_at, 3)
+                return
+            except Exception as e:
+                logger.error(f"{e}; still retrying {name} in the background")
+    
     def _on_mqtt_message(self, client, userdata, message):
-        """Handle incoming MQTT sensor data"""
+        """Hand incoming MQTT sensor data from the paho thread to the event loop"""
+        if self.shards:
+            self.shards.route(message.topic, message.payload)
+            return
+        try:
+            self.ingest.submit_threadsafe(message.topic, message.payload)
+        except RuntimeError as e:
+            logger.error(f"Dropping MQTT message on {message.topic}: {e}")
+    
+    def _on_async_mqtt_message(self, topic: str, payload: bytes):
+        """Handle incoming MQTT sensor data from the asyncio client"""
+        if self.shards:
+            self.shards.route(topic, payload)
+        else:
+            self.ingest.submit(topic, payload)
+    
+    async def _process_message(self, topic: str, raw: bytes) -> bool:
+        """Verify, analyze and store a single sensor message"""
+        started = time.perf_counter()
         try:
-            topic_parts = message.topic.split('/')
+            topic_parts = topic.split('/')
             field_id = topic_parts[1]  # Extract field ID from topic
             
-            payload = json.loads(message.payload.decode())
-            
-            # Verify cryptographic signature
-            if not self._verify_signature(payload):
-                logger.error(f"Invalid signature for field {field_id}")
-                return
-            
-            # Analyze with HeadyBrain
-            asyncio.create_task(self._analyze_with_brain(field_id, payload))
-            
+            payload = self.decoder.decode(topic_parts, raw)
         except Exception as e:
-            logger.error(f"Error processing MQTT message: {e}")
+            logger.error(f"Error decoding MQTT message on {topic}: {e}")
+            self._dropped['decode_error'].inc()
+            return False
+        decoded = time.perf_counter()
+        self._stage_latency['decode'].observe(decoded - started)
+        
+        # Drop republished / replayed messages before spending any crypto on them
+        replay_key = None
+        try:
+            replay_key = ReplayIndex.digest(field_id, payload['sensor_id'], payload['timestamp'],
+                                            payload['signature'])
+            timestamp = float(payload['timestamp'])
+        except (KeyError, TypeError, ValueError):
+            pass  # Malformed payloads are rejected by signature verification
+        else:
+            # Older than the window, the index may have forgotten it: a replay would look new
+            if not self.replay_index.fresh(timestamp):
+                self._dropped['stale'].inc()
+                return False
+        if replay_key is not None and self.replay_index.seen(replay_key):
+            self._dropped['duplicate'].inc()
+            return False
+        
+        # Verify cryptographic signature
+        started = time.perf_counter()
+        verified = await self._verify_signature(payload)
+        self._stage_latency['verify'].observe(time.perf_counter() - started)
+        if not verified:
+            logger.error(f"Invalid signature for field {field_id}")
+            self._dropped['invalid_signature'].inc()
+            return False
+        
+        # Only a verified message claims its key; a concurrent copy that verified first wins
+        if replay_key is not None and not self.replay_index.record(replay_key):
+            self._dropped['duplicate'].inc()
+            return False
+        
+        try:
+            reading = SensorReading.from_payload(field_id, payload)
+        except (KeyError, TypeError, ValueError, AttributeError) as e:
+            logger.error(f"Malformed sensor data for field {field_id}: {e}")
+            self._dropped['malformed'].inc()
+            return False
+        
+        # Score locally before spending a HeadyBrain call on it
+        verdict = None
+        if self.scorer:
+            started = time.perf_counter()
+            verdict = await self.scorer.score(reading)
+            self._stage_latency['score'].observe(time.perf_counter() - started)
+            if verdict.rejected:
+                logger.warning(f"Rejected implausible reading from {reading.sensor_id} "
+                               f"in field {field_id}: {', '.join(verdict.reasons)}")
+                self._dropped['implausible'].inc()
+                return False
+        
+        # Analyze with HeadyBrain
+        await self._analyze_with_brain(field_id, payload, reading, verdict)
+        return True
     
-    def _verify_signature(self, payload: Dict) -> bool:
+    async def _verify_signature(self, payload: Dict) -> bool:
         """Verify cryptographic signature of sensor data"""
-        # TODO: Implement actual cryptographic verification
-        # For now, check required fields
-        required_fields = ['timestamp', 'sensor_id', 'signature', 'data']
-        return all(field in payload for field in required_fields)
+        return await self.verifier.verify(payload)
     
-    async def _analyze_with_brain(self, field_id: str, payload: Dict):
-        """Send data to HeadyBrain for analysis"""
+    async def _analyze_with_brain(self, field_id: str, payload: Dict, reading: SensorReading,
+                                  verdict: Optional[Verdict] = None):
+        """Send suspicious data to HeadyBrain for analysis, then store it"""
         try:
-            analysis_payload = {
-                'type': 'FIELD_DATA_ANALYSIS',
-                'field_id': field_id,
-                'timestamp': payload['timestamp'],
-                'sensor_data': payload['data'],
-                'verification_threshold': self.verification_threshold
-            }
-            
-            # TODO: Implement actual HeadyBrain API call
-            # For now, simulate analysis
-            await asyncio.sleep(0.1)  # Simulate network latency
+            if self.brain.enabled and (verdict is None or verdict.suspicious):
+                analysis_payload = {
+                    'type': 'FIELD_DATA_ANALYSIS',
+                    'field_id': field_id,
+                    'timestamp': payload['timestamp'],
+                    'sensor_data': payload['data'],
+                    'verification_threshold': self.verification_threshold
+                }
+                if verdict is not None:
+                    analysis_payload['anomaly_score'] = verdict.score
+                    analysis_payload['anomaly_reasons'] = verdict.reasons
+                
+                started = time.perf_counter()
+                try:
+                    await self.brain.analyze(analysis_payload)
+                except BrainUnavailable as e:
+                    # Analysis is advisory; a brain outage must not lose verified readings
+                    logger.debug(f"HeadyBrain analysis skipped for field {field_id}: {e}")
+                self._stage_latency['brain'].observe(time.perf_counter() - started)
             
             # Store verified data
-            await self._store_field_data(field_id, payload)
+            started = time.perf_counter()
+            await self._store_field_data(reading)
+            self._stage_latency['store'].observe(time.perf_counter() - started)
             
         except Exception as e:
             logger.error(f"Error in HeadyBrain analysis: {e}")
     
-    async def _store_field_data(self, field_id: str, payload: Dict):
-        """Store verified field data in InfluxDB"""
+    async def _store_field_data(self, reading: SensorReading):
+        """Queue verified field data for batched storage in InfluxDB"""
         try:
-            point = Point("field_sensors") \
-                .tag("field_id", field_id) \
-                .tag("sensor_id", payload['sensor_id']) \
-                .time(datetime.fromtimestamp(payload['timestamp'], timezone.utc))
-            
-            # Add sensor measurements
-            for key, value in payload['data'].items():
-                if isinstance(value, (int, float)):
-                    point.field(key, value)
+            if self.recent:
+                self.recent.add(reading)
+            if self.rollups:
+                for line in self.rollups.add(reading):
+                    await self.writer.submit(line)
+                if not self.rollups.keep_raw(reading):
+                    return
             
-            self.write_api.write(bucket=self.influx_bucket, record=point)
-            logger.info(f"Stored verified data for field {field_id}")
+            record = reading.to_line_protocol()
+            if record:
+                await self.writer.submit(record)
             
         except Exception as e:
             logger.error(f"Error storing field data: {e}")
+    
+    async def _flush_rollups(self):
+        """Periodically emit rollup windows for sensors that have gone quiet"""
+        while True:
+            await asyncio.sleep(self.rollups.grace)
+            for line in self.rollups.flush_expired():
+                await self.writer.submit(line)
+    
+    def _write_lines(self, body: str):
+        """Write a line-protocol batch to InfluxDB (blocking, runs off the event loop)"""
+        if self.write_api is None:
+            raise Exception("InfluxDB write API not initialized")
+        self.write_api.write(bucket=self.influx_bucket, record=body)
+    
+    def recent_readings(self, method: str, **query) -> List[Dict]:
+        """Serialized readings from this process's recent cache (``latest`` or ``window``)"""
+        if not self.recent:
+            return []
+        return [reading.to_dict() for reading in getattr(self.recent, method)(**query)]
+    
+    async def query_recent(self, method: str, **query) -> List[Dict]:
+        """Recent readings, gathered from the owning shard workers when sharded"""
+        if not self.shards:
+            return self.recent_readings(method, **query)
+        readings = await self.shards.query_recent(method, query)
+        if method == 'window':
+            readings.sort(key=lambda reading: reading['timestamp'])
+            return readings[-clamp_limit(query.get('limit', 10000)):]
+        return readings[:clamp_limit(query.get('limit', 1000))]
+    
+    def mqtt_status(self) -> Dict:
+        """MQTT subscription state"""
+        return {
+            "mqtt_connected": self.mqtt_client.is_connected(),
+            "mqtt_engine": self.mqtt_engine,
+            "mqtt_topics": self.mqtt_topics,
+            "mqtt_qos": self.mqtt_qos,
+        }
+    
+    def readiness(self) -> Dict:
+        """Whether this process can accept and durably store readings"""
+        mqtt_ready = not self._mqtt_enabled or bool(self.mqtt_client.is_connected())
+        influx_ready = self.influx_ready.is_set()
+        return {
+            "ready": mqtt_ready and (influx_ready or self.spool is not None) and not self.maintenance,
+            "mqtt": mqtt_ready,
+            "influxdb": influx_ready,
+            "spool": self.spool is not None,
+            "maintenance": self.maintenance,
+            "startup_seconds": self.startup_seconds,
+        }
+    
+    def status(self) -> Dict:
+        """Detailed status of this process's pipeline"""
+        return {
+            **self.mqtt_status(),
+            "readiness": self.readiness(),
+            "shard_index": self.shard_index,
+            "payload_codecs": self.decoder.stats(),
+            "ingest": self.ingest.stats(),
+            "influx_health": "connected" if self.influx_client else "disconnected",
+            "verification_threshold": self.verification_threshold,
+            "live_config": self.config.values(),
+            "signatures": self.verifier.stats(),
+            "deduplication": self.replay_index.stats(),
+            "brain": self.brain.stats(),
+            "fibonacci_backoff": {
+                "max_retries": self.backoff.max_retries,
+                "base_delay": self.backoff.base_delay
+            },
+            "anomaly_scoring": self.scorer.stats() if self.scorer else None,
+            "rollups": self.rollups.stats() if self.rollups else None,
+            "recent_readings": self.recent.stats() if self.recent else None,
+            "write_pipeline": self.writer.stats(),
+            "spool": {**self.spool.stats(), **self.spool_drainer.stats()} if self.spool else None
+        }
 
 # Global oracle instance
 oracle = HeadyOracle()
@@ -196,9 +693,14 @@ async def startup_event():
     """Initialize oracle on startup"""
     await oracle.initialize()
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Flush buffered writes on shutdown"""
+    await oracle.shutdown()
+
 @app.get("/health")
 async def health_check():
-    """Health check endpoint"""
+    """Liveness: the process is up and serving (see /ready for dependencies)"""
     return {
         "status": "healthy",
         "timestamp": datetime.now(timezone.utc).isoformat(),
@@ -206,18 +708,122 @@ async def health_check():
         "version": "1.0.0"
     }
 
+@app.get("/ready")
+async def readiness_check():
+    """Readiness: MQTT subscribed and somewhere durable to put readings"""
+    readiness = oracle.readiness()
+    if oracle.shards:
+        reports = await oracle.shards.collect()
+        shards = [report_status["readiness"] for report_status, _ in reports]
+        readiness["shards"] = shards
+        readiness["ready"] = (readiness["mqtt"] and not readiness["maintenance"]
+                              and len(shards) == oracle.shards.workers and all(shard["ready"] for shard in shards))
+    return JSONResponse(readiness, status_code=status.HTTP_200_OK if readiness["ready"]
+                        else status.HTTP_503_SERVICE_UNAVAILABLE)
+
 @app.get("/status")
 async def get_status():
     """Get detailed oracle status"""
-    return {
-        "mqtt_connected": oracle.mqtt_client.is_connected(),
-        "influx_health": "connected" if oracle.influx_client else "disconnected",
-        "verification_threshold": oracle.verification_threshold,
-        "fibonacci_backoff": {
-            "max_retries": oracle.backoff.max_retries,
-            "base_delay": oracle.backoff.base_delay
+    if oracle.shards:
+        reports = await oracle.shards.collect()
+        return {
+            **oracle.mqtt_status(),
+            "sharding": oracle.shards.stats(),
+            "shards": [status for status, _ in reports]
         }
-    }
+    return oracle.status()
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics():
+    """Prometheus metrics in text exposition format"""
+    families = oracle.metrics.collect()
+    if oracle.shards:
+        # Worker counters and histograms are summed into the supervisor's; gauges keep a shard label
+        reports = await oracle.shards.collect()
+        families = merge_families([('supervisor', families)] + [(str(report_status['shard_index']), worker_families)
+                                                                for report_status, worker_families in reports])
+    return PlainTextResponse(render_text(families), media_type="text/plain; version=0.0.4")
+
+@app.get("/config")
+async def get_config():
+    """Live-configurable settings and their current values"""
+    return oracle.config.describe()
+
+@app.put("/config")
+async def update_config(updates: Dict[str, Any] = Body(...)):
+    """Apply settings without a restart; 409 lists keys that need one, 422 rejects bad values"""
+    try:
+        applied = oracle.config.update(updates)
+    except RestartRequired as e:
+        return JSONResponse({"error": str(e), "restart_required": e.keys}, status_code=status.HTTP_409_CONFLICT)
+    except (TypeError, ValueError) as e:
+        return JSONResponse({"error": str(e)}, status_code=status.HTTP_422_UNPROCESSABLE_ENTITY)
+    result = {"applied": applied, "version": oracle.config.version}
+    if oracle.shards:
+        replies = await oracle.shards.configure(updates, oracle.config.as_env())
+        result["shards"] = {shard: replies[shard] for shard in sorted(replies)}
+    return result
+
+def _require_recent():
+    if oracle.recent is None and not oracle.shards:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                            detail="Recent readings cache disabled (ORACLE_RECENT_PER_SENSOR=0)")
+
+@app.get("/readings/latest")
+async def latest_readings(field_id: Optional[str] = None, sensor_id: Optional[str] = None,
+                          limit: int = Query(1000, ge=1, le=MAX_LIMIT)):
+    """Newest reading per sensor, served from memory"""
+    _require_recent()
+    readings = await oracle.query_recent('latest', field_id=field_id, sensor_id=sensor_id, limit=limit)
+    return {"count": len(readings), "readings": readings}
+
+@app.get("/readings/window")
+async def window_readings(field_id: str, seconds: float = 3600, since: Optional[float] = None,
+                          until: Optional[float] = None, sensor_id: Optional[str] = None,
+                          limit: int = Query(10000, ge=1, le=MAX_LIMIT)):
+    """Readings for a field in a recent time window (epoch seconds), served from memory"""
+    _require_recent()
+    if since is None:
+        since = (until if until is not None else time.time()) - seconds
+    readings = await oracle.query_recent('window', field_id=field_id, since=since, until=until,
+                                         sensor_id=sensor_id, limit=limit)
+    return {"count": len(readings), "since": since, "until": until, "readings": readings}
+
+@app.get("/readings/stream")
+async def stream_readings(field_id: Optional[str] = None):
+    """Server-sent events feed of verified readings as they arrive"""
+    _require_recent()
+    return StreamingResponse(_reading_events(field_id), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache"})
+
+async def _reading_events(field_id: Optional[str], keepalive: float = 15.0):
+    if oracle.shards:
+        # Readings live in the workers; poll the owning shard(s) for anything newer
+        since, sent = time.time(), set()
+        while True:
+            readings = await oracle.query_recent('window', field_id=field_id, since=since)
+            for reading in readings:
+                key = (reading['field_id'], reading['sensor_id'], reading['timestamp'])
+                if key not in sent:
+                    yield f"data: {json.dumps(reading)}\n\n"
+            if readings:
+                since = readings[-1]['timestamp']
+                sent = {(r['field_id'], r['sensor_id'], r['timestamp']) for r in readings if r['timestamp'] == since}
+            else:
+                yield ": keepalive\n\n"
+            await asyncio.sleep(1.0)
+    
+    subscriber = oracle.recent.subscribe(field_id)
+    try:
+        while True:
+            try:
+                reading = await asyncio.wait_for(subscriber.get(), keepalive)
+            except asyncio.TimeoutError:
+                yield ": keepalive\n\n"
+                continue
+            yield f"data: {json.dumps(reading.to_dict())}\n\n"
+    finally:
+        oracle.recent.unsubscribe(subscriber)
 
 if __name__ == "__main__":
     uvicorn.run(app, host="0.0.0.0", port=8080)
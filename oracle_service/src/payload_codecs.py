@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+HEADY_BRAND:BEGIN
+╔══════════════════════════════════════════════════════════════════╗
+║  HeadyField Oracle - Sensor Payload Codecs                        ║
+║  "Fewer bytes on the air, fewer cycles in the oracle"             ║
+╚══════════════════════════════════════════════════════════════════╝
+HEADY_BRAND:END
+
+Sensors may publish JSON, CBOR or MessagePack. The codec is chosen from an
+explicit topic suffix (``field/<id>/sensors/cbor``) or, on the plain
+``field/<id>/sensors`` topic, sniffed from the first payload byte: every
+sensor message is a map, and JSON objects (``{``), CBOR maps (0xA0-0xBB,
+0xBF) and MessagePack maps (0x80-0x8F, 0xDE, 0xDF) never share a lead byte.
+
+JSON is parsed straight from bytes, with orjson when it is installed. The
+binary codecs are optional dependencies; a message for a codec that is not
+installed is rejected with ``CodecUnavailable``.
+"""
+
+import json
+from typing import Callable, Dict, List, Optional
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import cbor2
+except ImportError:
+    cbor2 = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+
+class CodecUnavailable(Exception):
+    """Raised when a payload needs a codec whose library is not installed"""
+
+
+def _decode_json(raw: bytes):
+    return orjson.loads(raw) if orjson is not None else json.loads(raw)
+
+
+def _decode_cbor(raw: bytes):
+    if cbor2 is None:
+        raise CodecUnavailable("CBOR payload received but cbor2 is not installed")
+    return cbor2.loads(raw)
+
+
+def _decode_msgpack(raw: bytes):
+    if msgpack is None:
+        raise CodecUnavailable("MessagePack payload received but msgpack is not installed")
+    return msgpack.unpackb(raw, raw=False)
+
+
+DECODERS: Dict[str, Callable[[bytes], Dict]] = {
+    'json': _decode_json,
+    'cbor': _decode_cbor,
+    'msgpack': _decode_msgpack,
+}
+
+
+def sniff_codec(raw: bytes) -> str:
+    """Guess the codec from the payload's first byte"""
+    if not raw:
+        return 'json'
+    lead = raw[0]
+    if 0xA0 <= lead <= 0xBB or lead == 0xBF:
+        return 'cbor'
+    if 0x80 <= lead <= 0x8F or lead in (0xDE, 0xDF):
+        return 'msgpack'
+    return 'json'
+
+
+class PayloadDecoder:
+    """Picks a codec per message and counts what arrives in each format"""
+
+    def __init__(self):
+        self.counts = {name: 0 for name in DECODERS}
+
+    @staticmethod
+    def topics(base: str) -> List[str]:
+        """Topic filters to subscribe to: the plain topic plus per-codec suffixes"""
+        return [base, f"{base}/+"]
+
+    def decode(self, topic_parts: List[str], raw: bytes) -> Dict:
+        codec: Optional[str] = topic_parts[3] if len(topic_parts) > 3 else None
+        if codec is None:
+            codec = sniff_codec(raw)
+        elif codec not in DECODERS:
+            raise CodecUnavailable(f"Unknown payload codec '{codec}'")
+        payload = DECODERS[codec](raw)
+        self.counts[codec] += 1
+        if not isinstance(payload, dict):
+            raise ValueError(f"{codec} payload is not a map")
+        return payload
+
+    def stats(self) -> Dict:
+        return {
+            "messages": dict(self.counts),
+            "available": {
+                "orjson": orjson is not None,
+                "cbor": cbor2 is not None,
+                "msgpack": msgpack is not None,
+            },
+        }
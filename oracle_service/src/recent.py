@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+HEADY_BRAND:BEGIN
+╔══════════════════════════════════════════════════════════════════╗
+║  HeadyField Oracle - Recent Readings Cache                        ║
+║  "The last hour lives in memory, not in the vault"                ║
+╚══════════════════════════════════════════════════════════════════╝
+HEADY_BRAND:END
+
+Keeps the most recent verified ``SensorReading`` objects per
+(field_id, sensor_id) in fixed-size ring buffers so dashboards can ask for
+the latest values or a recent window without querying InfluxDB. Memory is
+bounded three ways. Each series holds at most ``per_sensor`` readings.
+Readings older than ``max_age`` seconds behind the series' newest reading
+are trimmed. When ``max_series`` or ``max_readings`` is exceeded, the
+least recently updated series are evicted. Live subscribers get every new
+reading through a bounded queue; a subscriber that falls behind loses
+readings rather than holding memory.
+"""
+
+import asyncio
+from collections import OrderedDict, deque
+from typing import Deque, Dict, List, Optional, Set, Tuple
+
+from .records import SensorReading
+
+SeriesKey = Tuple[str, str]
+
+# Most readings one query may return
+MAX_LIMIT = 100000
+
+
+def clamp_limit(limit: int) -> int:
+    """Keep a requested result count within 1..MAX_LIMIT (``out[-0:]`` would return everything)"""
+    return min(max(int(limit), 1), MAX_LIMIT)
+
+
+class RecentReadings:
+    """Bounded per-sensor ring buffers of recent readings with live subscribers"""
+
+    def __init__(self, per_sensor: int = 360, max_age: float = 3600.0,
+                 max_series: int = 5000, max_readings: int = 500000, subscriber_queue: int = 1000):
+        self.per_sensor = per_sensor
+        self.max_age = max_age
+        self.max_series = max_series
+        self.max_readings = max_readings
+        self.subscriber_queue = subscriber_queue
+
+        self._series: "OrderedDict[SeriesKey, Deque[SensorReading]]" = OrderedDict()
+        self._by_field: Dict[str, Set[str]] = {}
+        self._size = 0
+        self._subscribers: Dict[asyncio.Queue, Optional[str]] = {}
+
+        self.added = 0
+        self.evicted_series = 0
+        self.subscriber_drops = 0
+
+    def add(self, reading: SensorReading):
+        """Record a verified reading and fan it out to subscribers"""
+        key = (reading.field_id, reading.sensor_id)
+        ring = self._series.get(key)
+        if ring is None:
+            ring = self._series[key] = deque(maxlen=self.per_sensor)
+            self._by_field.setdefault(reading.field_id, set()).add(reading.sensor_id)
+        else:
+            self._series.move_to_end(key)
+            self._size -= len(ring)
+
+        ring.append(reading)
+        horizon = reading.timestamp - self.max_age
+        while ring[0].timestamp < horizon:
+            ring.popleft()
+        self._size += len(ring)
+        self.added += 1
+
+        while self._series and (len(self._series) > self.max_series or self._size > self.max_readings):
+            self._evict_oldest_series()
+
+        for subscriber, field_id in self._subscribers.items():
+            if field_id is None or field_id == reading.field_id:
+                try:
+                    subscriber.put_nowait(reading)
+                except asyncio.QueueFull:
+                    self.subscriber_drops += 1
+
+    def _evict_oldest_series(self):
+        (field_id, sensor_id), ring = self._series.popitem(last=False)
+        self._size -= len(ring)
+        sensors = self._by_field[field_id]
+        sensors.discard(sensor_id)
+        if not sensors:
+            del self._by_field[field_id]
+        self.evicted_series += 1
+
+    def _keys(self, field_id: Optional[str], sensor_id: Optional[str]) -> List[SeriesKey]:
+        if field_id is None:
+            return [key for key in self._series if sensor_id is None or key[1] == sensor_id]
+        if sensor_id is not None:
+            return [(field_id, sensor_id)] if (field_id, sensor_id) in self._series else []
+        return [(field_id, sensor) for sensor in sorted(self._by_field.get(field_id, ()))]
+
+    def latest(self, field_id: Optional[str] = None, sensor_id: Optional[str] = None,
+               limit: int = 1000) -> List[SensorReading]:
+        """Newest reading of each matching series"""
+        return [self._series[key][-1] for key in self._keys(field_id, sensor_id)[:clamp_limit(limit)]]
+
+    def window(self, field_id: Optional[str], since: float, until: Optional[float] = None,
+               sensor_id: Optional[str] = None, limit: int = 10000) -> List[SensorReading]:
+        """Matching readings with ``since <= timestamp <= until``, oldest first"""
+        out: List[SensorReading] = []
+        for key in self._keys(field_id, sensor_id):
+            out.extend(reading for reading in self._series[key]
+                       if reading.timestamp >= since and (until is None or reading.timestamp <= until))
+        out.sort(key=lambda reading: reading.timestamp)
+        return out[-clamp_limit(limit):]
+
+    def subscribe(self, field_id: Optional[str] = None) -> asyncio.Queue:
+        """Queue that receives every new reading (optionally for one field)"""
+        subscriber: asyncio.Queue = asyncio.Queue(maxsize=self.subscriber_queue)
+        self._subscribers[subscriber] = field_id
+        return subscriber
+
+    def unsubscribe(self, subscriber: asyncio.Queue):
+        self._subscribers.pop(subscriber, None)
+
+    def stats(self) -> Dict:
+        return {
+            "series": len(self._series),
+            "readings": self._size,
+            "per_sensor": self.per_sensor,
+            "max_age": self.max_age,
+            "max_series": self.max_series,
+            "max_readings": self.max_readings,
+            "added": self.added,
+            "evicted_series": self.evicted_series,
+            "subscribers": len(self._subscribers),
+            "subscriber_drops": self.subscriber_drops,
+        }
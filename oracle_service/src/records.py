@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+HEADY_BRAND:BEGIN
+╔══════════════════════════════════════════════════════════════════╗
+║  HeadyField Oracle - Compact Sensor Readings                      ║
+║  "Small records, straight to line protocol"                       ║
+╚══════════════════════════════════════════════════════════════════╝
+HEADY_BRAND:END
+
+``SensorReading`` keeps one decoded message in a slotted object: interned
+field ids, sensor ids and value names, numeric values packed in an ``array('d')``
+and one type code per value (``i`` int, ``f`` float, ``b`` bool) so the
+InfluxDB field types stay exactly what the old ``Point`` path produced.
+Integers a double cannot hold exactly (beyond 2**53) are also kept as Python
+ints in ``exact``, keyed by position; the array keeps their float
+approximation for scoring and rollups.
+``to_line_protocol`` renders the record directly, byte-for-byte identical to
+``Point.to_line_protocol()``, without building a ``Point``.
+"""
+
+import math
+import sys
+from array import array
+from typing import Dict, Optional, Tuple
+
+_ESCAPE_MEASUREMENT = str.maketrans({',': r'\,', ' ': r'\ ', '\n': r'\n', '\t': r'\t', '\r': r'\r'})
+_ESCAPE_KEY = str.maketrans({',': r'\,', '=': r'\=', ' ': r'\ ', '\n': r'\n', '\t': r'\t', '\r': r'\r'})
+
+# Escaped forms of the (small, repetitive) set of tag values and field names
+_ESCAPED: Dict[str, str] = {}
+_ESCAPED_MAX = 65536
+
+
+def escape_key(value: str) -> str:
+    """Escape a tag key/value or field name for line protocol (cached)"""
+    escaped = _ESCAPED.get(value)
+    if escaped is None:
+        escaped = value.translate(_ESCAPE_KEY)
+        if escaped.endswith('\\'):
+            escaped += ' '
+        if len(_ESCAPED) >= _ESCAPED_MAX:
+            _ESCAPED.clear()
+        _ESCAPED[value] = escaped
+    return escaped
+
+
+def format_float(value: float) -> str:
+    """Format a float field value the way influxdb_client does"""
+    text = str(value)
+    return text[:-2] if text.endswith('.0') else text
+
+
+def timestamp_ns(timestamp: float) -> int:
+    """Epoch seconds to nanoseconds, rounded to microseconds exactly as ``datetime`` does"""
+    frac, whole = math.modf(timestamp)
+    micros = round(frac * 1e6)
+    return (int(whole) * 1_000_000 + micros) * 1000
+
+
+class SensorReading:
+    """One verified sensor message in compact form"""
+
+    __slots__ = ('field_id', 'sensor_id', 'timestamp', 'names', 'values', 'kinds', 'exact')
+
+    def __init__(self, field_id: str, sensor_id: str, timestamp: float,
+                 names: Tuple[str, ...], values: array, kinds: str,
+                 exact: Optional[Dict[int, int]] = None):
+        self.field_id = field_id
+        self.sensor_id = sensor_id
+        self.timestamp = timestamp
+        self.names = names
+        self.values = values
+        self.kinds = kinds
+        self.exact = exact
+
+    @classmethod
+    def from_payload(cls, field_id: str, payload: Dict) -> 'SensorReading':
+        """Build a reading from a decoded sensor payload, keeping numeric values only"""
+        names = []
+        values = array('d')
+        kinds = []
+        exact = None
+        for key, value in sorted(payload['data'].items()):
+            if value.__class__ is bool:
+                kind = 'b'
+            elif isinstance(value, int):
+                kind = 'i'
+                if not -2 ** 53 <= value <= 2 ** 53:
+                    if exact is None:
+                        exact = {}
+                    exact[len(values)] = int(value)
+                    value = float(value)
+            elif isinstance(value, float):
+                if not math.isfinite(value):
+                    continue
+                kind = 'f'
+            else:
+                continue
+            names.append(sys.intern(key))
+            values.append(value)
+            kinds.append(kind)
+        return cls(sys.intern(field_id), sys.intern(str(payload['sensor_id'])),
+                   float(payload['timestamp']), tuple(names), values, ''.join(kinds), exact)
+
+    def fields(self):
+        """Iterate ``(name, value)`` pairs with their original Python types"""
+        for index, (name, value, kind) in enumerate(zip(self.names, self.values, self.kinds)):
+            if kind == 'i':
+                yield name, self._int(index, value)
+            elif kind == 'b':
+                yield name, bool(value)
+            else:
+                yield name, value
+
+    def _int(self, index: int, value: float) -> int:
+        return self.exact[index] if self.exact and index in self.exact else int(value)
+
+    def to_dict(self) -> Dict:
+        """JSON-ready form for the read API"""
+        return {
+            'field_id': self.field_id,
+            'sensor_id': self.sensor_id,
+            'timestamp': self.timestamp,
+            'data': dict(self.fields()),
+        }
+
+    def to_line_protocol(self, measurement: str = 'field_sensors') -> str:
+        """Render as an InfluxDB line-protocol record ('' if there are no fields)"""
+        if not self.names:
+            return ''
+        parts = []
+        for index, (name, value, kind) in enumerate(zip(self.names, self.values, self.kinds)):
+            if kind == 'f':
+                parts.append(f"{escape_key(name)}={format_float(value)}")
+            elif kind == 'i':
+                parts.append(f"{escape_key(name)}={self._int(index, value)}i")
+            else:
+                parts.append(f"{escape_key(name)}={'true' if value else 'false'}")
+
+        tags = ''
+        if self.field_id:
+            tags += f",field_id={escape_key(self.field_id)}"
+        if self.sensor_id:
+            tags += f",sensor_id={escape_key(self.sensor_id)}"
+        return (f"{measurement.translate(_ESCAPE_MEASUREMENT)}{tags} "
+                f"{','.join(parts)} {timestamp_ns(self.timestamp)}")
@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+"""
+HEADY_BRAND:BEGIN
+╔══════════════════════════════════════════════════════════════════╗
+║  HeadyField Oracle - Streaming Rollups & Downsampling              ║
+║  "Dashboards read minutes and hours, not every heartbeat"         ║
+╚══════════════════════════════════════════════════════════════════╝
+HEADY_BRAND:END
+
+Maintains min/max/mean/count per (field_id, sensor_id, value name) in
+tumbling windows keyed on reading (event) time. Each series tracks a
+watermark, the highest event time it has reported. A window is closed and
+emitted as one ``field_sensors_rollup`` line per sensor once the watermark
+passes the window end plus ``grace`` (the allowed lateness). For a sensor
+that went quiet the watermark is carried forward by the time elapsed since
+its last reading arrived, so windows close on the sensor's own clock whether
+it runs ahead of or behind ours. Readings for a window that has been emitted,
+or that the watermark has already passed by ``grace``, are counted as late
+and left out of rollups.
+That late check and raw downsampling keep a little state per series. Entries
+for series that have not produced a window or raw point for ``idle_ttl``
+seconds are pruned, so sensors that come and go do not grow memory forever.
+"""
+
+import time
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from .records import SensorReading, escape_key, format_float
+
+
+def window_label(seconds: int) -> str:
+    if seconds % 3600 == 0:
+        return f"{seconds // 3600}h"
+    if seconds % 60 == 0:
+        return f"{seconds // 60}m"
+    return f"{seconds}s"
+
+
+class _Window:
+    """Running aggregates for one sensor in one window"""
+
+    __slots__ = ('start', 'stats')
+
+    def __init__(self, start: int):
+        self.start = start
+        # value name -> [min, max, sum, count]
+        self.stats: Dict[str, List[float]] = {}
+
+    def add(self, reading: SensorReading):
+        for name, value, kind in zip(reading.names, reading.values, reading.kinds):
+            if kind == 'b':
+                continue
+            entry = self.stats.get(name)
+            if entry is None:
+                self.stats[name] = [value, value, value, 1]
+            else:
+                if value < entry[0]:
+                    entry[0] = value
+                if value > entry[1]:
+                    entry[1] = value
+                entry[2] += value
+                entry[3] += 1
+
+
+class StreamingRollups:
+    """Tumbling-window aggregation with optional raw-point downsampling"""
+
+    def __init__(self, windows: Sequence[int] = (60, 3600), measurement: str = 'field_sensors_rollup',
+                 grace: float = 5.0, raw_interval: float = 0.0, max_series: int = 100000,
+                 idle_ttl: float = 7200.0):
+        self.windows = tuple(sorted(windows))
+        self.measurement = measurement
+        self.grace = grace
+        self.raw_interval = raw_interval
+        self.max_series = max_series
+        self.idle_ttl = idle_ttl
+
+        # (window seconds, field_id, sensor_id) -> open windows by start
+        self._open: Dict[Tuple[int, str, str], Dict[int, _Window]] = {}
+        # (highest event time seen, monotonic time it arrived) for series with open windows
+        self._watermark: Dict[Tuple[int, str, str], Tuple[float, float]] = {}
+        # (end of the last emitted window, monotonic time it was emitted)
+        self._closed_until: Dict[Tuple[int, str, str], Tuple[int, float]] = {}
+        # (timestamp of the last kept raw point, monotonic time it was kept)
+        self._last_raw: Dict[Tuple[str, str], Tuple[float, float]] = {}
+        self._next_prune = time.monotonic() + idle_ttl / 4
+
+        self.readings = 0
+        self.late = 0
+        self.windows_emitted = 0
+        self.raw_kept = 0
+        self.raw_skipped = 0
+        self.pruned = 0
+
+    def add(self, reading: SensorReading) -> List[str]:
+        """Fold a reading into every window; returns lines for windows it closed"""
+        self.readings += 1
+        emitted: List[str] = []
+        arrived = time.monotonic()
+        for seconds in self.windows:
+            key = (seconds, reading.field_id, reading.sensor_id)
+            start = int(reading.timestamp // seconds) * seconds
+            closed = self._closed_until.get(key)
+            mark = self._watermark.get(key)
+            if (closed is not None and start < closed[0]) or (mark is not None and start + seconds + self.grace <= mark[0]):
+                self.late += 1
+                continue
+            windows = self._open.get(key)
+            if windows is None:
+                if len(self._open) >= self.max_series:
+                    continue
+                windows = self._open[key] = {}
+            window = windows.get(start)
+            if window is None:
+                window = windows[start] = _Window(start)
+            window.add(reading)
+            if mark is None or reading.timestamp > mark[0]:
+                self._watermark[key] = (reading.timestamp, arrived)
+                self._emit_passed(emitted, key, reading.timestamp)
+        return emitted
+
+    def keep_raw(self, reading: SensorReading) -> bool:
+        """Whether this raw reading should be written given ``raw_interval``"""
+        if self.raw_interval <= 0:
+            self.raw_kept += 1
+            return True
+        key = (reading.field_id, reading.sensor_id)
+        last = self._last_raw.get(key)
+        if last is None or reading.timestamp - last[0] >= self.raw_interval or reading.timestamp < last[0]:
+            self._last_raw[key] = (reading.timestamp, time.monotonic())
+            self.raw_kept += 1
+            return True
+        self.raw_skipped += 1
+        return False
+
+    def flush_expired(self, now: Optional[float] = None) -> List[str]:
+        """Emit windows of quiet sensors whose carried-forward watermark passed end plus grace"""
+        now = time.monotonic() if now is None else now
+        emitted: List[str] = []
+        for key, (mark, arrived) in list(self._watermark.items()):
+            self._emit_passed(emitted, key, mark + (now - arrived))
+        if now >= self._next_prune:
+            self._prune(now)
+        return emitted
+
+    def _emit_passed(self, emitted: List[str], key: Tuple[int, str, str], watermark: float):
+        """Emit the series' open windows that ``watermark`` has passed by more than ``grace``"""
+        windows = self._open[key]
+        for start in sorted(windows):
+            if start + key[0] + self.grace > watermark:
+                break
+            self._emit_into(emitted, key, windows[start])
+
+    def _prune(self, now: float):
+        """Forget late-check and downsampling state of series idle for ``idle_ttl``"""
+        cutoff = now - self.idle_ttl
+        for state in (self._closed_until, self._last_raw):
+            idle = [key for key, (_, touched) in state.items() if touched <= cutoff]
+            for key in idle:
+                del state[key]
+            self.pruned += len(idle)
+        self._next_prune = now + self.idle_ttl / 4
+
+    def flush_all(self) -> List[str]:
+        """Emit every open window (used on shutdown)"""
+        emitted: List[str] = []
+        for key, windows in list(self._open.items()):
+            for start in sorted(windows):
+                self._emit_into(emitted, key, windows[start])
+        return emitted
+
+    def _emit_into(self, emitted: List[str], key: Tuple[int, str, str], window: _Window):
+        """Close a window and append its rollup line (if it had numeric values)"""
+        seconds, field_id, sensor_id = key
+        windows = self._open[key]
+        del windows[window.start]
+        if not windows:
+            del self._open[key]
+            del self._watermark[key]
+        self._closed_until[key] = (window.start + seconds, time.monotonic())
+        self.windows_emitted += 1
+
+        parts = []
+        for name in sorted(window.stats):
+            low, high, total, count = window.stats[name]
+            name = escape_key(name)
+            parts.append(f"{name}_count={count}i,{name}_max={format_float(high)},"
+                         f"{name}_mean={format_float(total / count)},{name}_min={format_float(low)}")
+        if parts:
+            emitted.append(f"{self.measurement},field_id={escape_key(field_id)},sensor_id={escape_key(sensor_id)},"
+                           f"window={window_label(seconds)} {','.join(parts)} {window.start * 1_000_000_000}")
+
+    def stats(self) -> Dict:
+        return {
+            "windows": [window_label(s) for s in self.windows],
+            "open_windows": sum(len(windows) for windows in self._open.values()),
+            "tracked_series": len(self._closed_until) + len(self._last_raw),
+            "pruned": self.pruned,
+            "readings": self.readings,
+            "late_readings": self.late,
+            "windows_emitted": self.windows_emitted,
+            "raw_interval": self.raw_interval,
+            "raw_kept": self.raw_kept,
+            "raw_skipped": self.raw_skipped,
+        }
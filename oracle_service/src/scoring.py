@@ -0,0 +1,340 @@
+#!/usr/bin/env python3
+"""
+HEADY_BRAND:BEGIN
+╔══════════════════════════════════════════════════════════════════╗
+║  HeadyField Oracle - Local Anomaly & Plausibility Scoring         ║
+║  "Ask the brain only about what looks strange"                    ║
+╚══════════════════════════════════════════════════════════════════╝
+HEADY_BRAND:END
+
+Scores verified readings in micro-batches with NumPy before storage. Every
+(field_id, sensor_id, value name) series has a slot in flat arrays holding
+an exponentially weighted mean and variance plus the previous value and
+timestamp. For each value in a batch:
+
+* ``z`` is the distance from the EWMA mean in EWMA standard deviations
+  (judged only after ``warmup`` samples);
+* the rate of change since the previous value is checked against an
+  optional per-name limit (units per second);
+* the value is checked against an optional per-name plausible range.
+
+A reading is *suspicious* when any value breaks a rate limit, or when its
+largest ``z`` exceeds the two-sided quantile of ``VERIFICATION_THRESHOLD``,
+Šidák-corrected for the k values judged in that reading (``threshold **
+(1/k)``). The quantile is Student-t rather than normal because the EWMA
+variance is itself an estimate (0.95 -> 2.02 sigma for one value, 2.61 for
+four). Noise alone then escalates about ``1 - threshold`` of readings however
+many values they carry. Only suspicious readings are escalated to HeadyBrain.
+A reading is *rejected* (not stored) when a value is outside its plausible
+range, or beyond ``reject_sigma`` when that is set. Rejected values do not
+update the running statistics.
+
+Once ``max_series`` slots are taken, a new series is left unscored for the
+current batch (not escalated, counted as untracked) and the least recently
+scored 1% of slots are freed for the series that follow.
+"""
+
+import asyncio
+import logging
+from statistics import NormalDist
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .records import SensorReading
+
+logger = logging.getLogger(__name__)
+
+
+def parse_limits(spec: str) -> Dict[str, float]:
+    """``"soil_temp=0.5,air_temp=2"`` -> {name: limit}"""
+    limits = {}
+    for item in spec.split(','):
+        if '=' in item:
+            name, value = item.split('=', 1)
+            limits[name.strip()] = float(value)
+    return limits
+
+
+def parse_ranges(spec: str) -> Dict[str, Tuple[float, float]]:
+    """``"ph=0:14,humidity=0:100"`` -> {name: (low, high)}"""
+    ranges = {}
+    for item in spec.split(','):
+        if '=' in item:
+            name, bounds = item.split('=', 1)
+            low, high = bounds.split(':', 1)
+            ranges[name.strip()] = (float(low) if low else -np.inf, float(high) if high else np.inf)
+    return ranges
+
+
+def t_quantile(p: float, dof: float) -> float:
+    """Student-t quantile from the normal one (Cornish-Fisher expansion, fine for dof >= 5)"""
+    z = NormalDist().inv_cdf(p)
+    return (z + (z ** 3 + z) / (4 * dof) + (5 * z ** 5 + 16 * z ** 3 + 3 * z) / (96 * dof ** 2)
+            + (3 * z ** 7 + 19 * z ** 5 + 17 * z ** 3 - 15 * z) / (384 * dof ** 3))
+
+
+class Verdict:
+    """Outcome of scoring one reading"""
+
+    __slots__ = ('score', 'suspicious', 'rejected', 'reasons')
+
+    def __init__(self, score: float = 0.0, suspicious: bool = False, rejected: bool = False,
+                 reasons: Optional[List[str]] = None):
+        self.score = score
+        self.suspicious = suspicious
+        self.rejected = rejected
+        self.reasons = reasons or []
+
+
+UNSCORED = Verdict(suspicious=True, reasons=['unscored'])
+UNTRACKED = Verdict(reasons=['untracked'])
+
+
+class AnomalyScorer:
+    """Micro-batched EWMA, rate-of-change and range checks over per-series state arrays"""
+
+    def __init__(self, threshold: float = 0.95, alpha: float = 0.05, warmup: int = 20,
+                 min_std: float = 0.01, reject_sigma: float = 0.0,
+                 rate_limits: Optional[Dict[str, float]] = None,
+                 ranges: Optional[Dict[str, Tuple[float, float]]] = None,
+                 max_series: int = 200000, batch_size: int = 512, batch_window: float = 0.002):
+        self.alpha = alpha
+        self.set_threshold(threshold)
+        self.warmup = warmup
+        self.min_std = min_std
+        self.reject_sigma = reject_sigma
+        self.rate_limits = rate_limits or {}
+        self.ranges = ranges or {}
+        self.max_series = max_series
+        self.batch_size = batch_size
+        self.batch_window = batch_window
+
+        self._slots: Dict[Tuple[str, str, str], int] = {}
+        self._keys: List[Tuple[str, str, str]] = []
+        self._free: List[int] = []
+        self._tick = 0
+        self._overflowed = False
+        capacity = 1024
+        self._mean = np.zeros(capacity)
+        self._var = np.zeros(capacity)
+        self._count = np.zeros(capacity, dtype=np.int64)
+        self._last_value = np.zeros(capacity)
+        self._last_time = np.zeros(capacity)
+        self._rate_limit = np.full(capacity, np.inf)
+        self._low = np.full(capacity, -np.inf)
+        self._high = np.full(capacity, np.inf)
+        self._used = np.zeros(capacity, dtype=np.int64)  # tick of the batch that last scored the slot
+
+        self._pending: List[Tuple[SensorReading, asyncio.Future]] = []
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+
+        self.scored = 0
+        self.suspicious = 0
+        self.rejected = 0
+        self.untracked = 0
+        self.evicted = 0
+        self.batches = 0
+
+    def set_threshold(self, threshold: float):
+        """Change the escalation threshold (two-sided normal quantile) for subsequent batches"""
+        self.threshold = threshold
+        self._z_limits: List[float] = [np.inf]
+        self.z_limit = float(self._limits_for(np.array([1]))[0])
+
+    def _limits_for(self, judged: np.ndarray) -> np.ndarray:
+        """Per-value ``z`` limit for readings with ``judged`` values past warmup (Šidák)"""
+        for k in range(len(self._z_limits), int(judged.max(initial=0)) + 1):
+            # The EWMA's own variance estimate makes z Student-t-like with about (2 - alpha) / alpha dof
+            self._z_limits.append(t_quantile(0.5 + self.threshold ** (1 / k) / 2, (2 - self.alpha) / self.alpha))
+        return np.asarray(self._z_limits)[judged]
+
+    async def score(self, reading: SensorReading) -> Verdict:
+        """Score one reading; batches with concurrent callers"""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((reading, future))
+        if len(self._pending) >= self.batch_size:
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(self.batch_window, self._flush)
+        return await future
+
+    def _flush(self):
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        if not self._pending:
+            return
+        pending, self._pending = self._pending, []
+        self.batches += 1
+        try:
+            verdicts = self.score_batch([reading for reading, _ in pending])
+        except Exception as e:
+            logger.error(f"Anomaly scoring of {len(pending)} readings failed: {e}")
+            verdicts = [UNSCORED] * len(pending)
+        for (_, future), verdict in zip(pending, verdicts):
+            if not future.done():
+                future.set_result(verdict)
+
+    def _slot(self, field_id: str, sensor_id: str, name: str) -> Optional[int]:
+        key = (field_id, sensor_id, name)
+        slot = self._slots.get(key)
+        if slot is None:
+            if self._free:
+                slot = self._free.pop()
+                self._keys[slot] = key
+            elif len(self._keys) < self.max_series:
+                slot = len(self._keys)
+                if slot == len(self._mean):
+                    self._grow()
+                self._keys.append(key)
+            else:
+                self._overflowed = True
+                return None
+            self._slots[key] = slot
+            self._rate_limit[slot] = self.rate_limits.get(name, np.inf)
+            self._low[slot], self._high[slot] = self.ranges.get(name, (-np.inf, np.inf))
+        return slot
+
+    def _evict(self):
+        """Free the least recently scored 1% of slots; slots scored in this batch are kept"""
+        self._overflowed = False
+        count = min(max(1, self.max_series // 100), len(self._keys))
+        used = self._used[:len(self._keys)]
+        victims = np.argpartition(used, count - 1)[:count]
+        victims = victims[used[victims] < self._tick]
+        for slot in victims.tolist():
+            del self._slots[self._keys[slot]]
+            self._free.append(slot)
+        self._mean[victims] = self._var[victims] = self._count[victims] = 0
+        self._last_value[victims] = self._last_time[victims] = 0
+        self.evicted += len(victims)
+
+    def _grow(self):
+        """Double every state array, filling new slots with their neutral value"""
+        for attr, fill in (('_mean', 0), ('_var', 0), ('_count', 0), ('_last_value', 0), ('_last_time', 0),
+                           ('_rate_limit', np.inf), ('_low', -np.inf), ('_high', np.inf), ('_used', 0)):
+            current = getattr(self, attr)
+            grown = np.full(len(current) * 2, fill, dtype=current.dtype)
+            grown[:len(current)] = current
+            setattr(self, attr, grown)
+
+    def score_batch(self, readings: List[SensorReading]) -> List[Verdict]:
+        """Score readings in order, updating per-series state"""
+        self._tick += 1
+        slots, values, times, owners, ranks = [], [], [], [], []
+        seen: Dict[int, int] = {}
+        tracked = [False] * len(readings)
+        for i, reading in enumerate(readings):
+            for name, value, kind in zip(reading.names, reading.values, reading.kinds):
+                if kind == 'b':
+                    continue
+                slot = self._slot(reading.field_id, reading.sensor_id, name)
+                if slot is None:
+                    continue
+                # A series repeated within the batch is applied in later rounds, in order
+                rank = seen.get(slot, 0)
+                seen[slot] = rank + 1
+                slots.append(slot)
+                values.append(value)
+                times.append(reading.timestamp)
+                owners.append(i)
+                ranks.append(rank)
+                tracked[i] = True
+
+        n = len(slots)
+        slots_a = np.asarray(slots, dtype=np.int64)
+        x_all = np.asarray(values, dtype=np.float64)
+        t_all = np.asarray(times, dtype=np.float64)
+        owners_a = np.asarray(owners, dtype=np.int64)
+        ranks_a = np.asarray(ranks, dtype=np.int64)
+        self._used[slots_a] = self._tick
+        z = np.zeros(n)
+        judged = np.zeros(n, dtype=bool)
+        rate_bad = np.zeros(n, dtype=bool)
+        range_bad = np.zeros(n, dtype=bool)
+
+        for rank in range(int(ranks_a.max()) + 1 if n else 0):
+            mask = np.flatnonzero(ranks_a == rank)
+            idx = slots_a[mask]
+            x, t = x_all[mask], t_all[mask]
+            mean, var, count = self._mean[idx], self._var[idx], self._count[idx]
+
+            std = np.maximum(np.sqrt(var), self.min_std)
+            judged_round = count >= self.warmup
+            z_round = np.where(judged_round, np.abs(x - mean) / std, 0.0)
+            dt = t - self._last_time[idx]
+            with np.errstate(divide='ignore', invalid='ignore'):
+                rate = np.where((count > 0) & (dt > 0), np.abs(x - self._last_value[idx]) / dt, 0.0)
+            rate_round = rate > self._rate_limit[idx]
+            range_round = (x < self._low[idx]) | (x > self._high[idx])
+            reject = range_round | ((self.reject_sigma > 0) & (z_round > self.reject_sigma))
+
+            z[mask], judged[mask], rate_bad[mask], range_bad[mask] = z_round, judged_round, rate_round, range_round
+
+            keep = ~reject
+            idx, x, t, mean, var, count = idx[keep], x[keep], t[keep], mean[keep], var[keep], count[keep]
+            diff = x - mean
+            increment = self.alpha * diff
+            first = count == 0
+            self._mean[idx] = np.where(first, x, mean + increment)
+            self._var[idx] = np.where(first, 0.0, (1 - self.alpha) * (var + diff * increment))
+            self._count[idx] = count + 1
+            self._last_value[idx] = x
+            self._last_time[idx] = t
+
+        rejected_values = range_bad | ((self.reject_sigma > 0) & (z > self.reject_sigma))
+        reading_judged = np.bincount(owners_a, weights=judged, minlength=len(readings)).astype(np.int64)
+        z_limits = self._limits_for(reading_judged)[owners_a]
+        suspicious_values = (z > z_limits) | rate_bad
+        reading_score = np.zeros(len(readings))
+        np.maximum.at(reading_score, owners_a, z)
+        reading_rejected = np.zeros(len(readings), dtype=bool)
+        np.logical_or.at(reading_rejected, owners_a, rejected_values)
+        reading_suspicious = np.zeros(len(readings), dtype=bool)
+        np.logical_or.at(reading_suspicious, owners_a, suspicious_values)
+
+        # Reasons are only spelled out for the (rare) flagged values
+        reasons: Dict[int, List[str]] = {}
+        for j in np.flatnonzero(suspicious_values | rejected_values):
+            name = self._keys[slots_a[j]][2]
+            why = reasons.setdefault(int(owners_a[j]), [])
+            if range_bad[j]:
+                why.append(f"{name}:out_of_range")
+            if rate_bad[j]:
+                why.append(f"{name}:rate_of_change")
+            if z[j] > z_limits[j]:
+                why.append(f"{name}:z={z[j]:.1f}")
+
+        verdicts = []
+        for i in range(len(readings)):
+            if not tracked[i]:
+                # No slot (table full) or no numeric values: nothing to judge, so no escalation
+                self.untracked += 1
+                verdicts.append(UNTRACKED)
+                continue
+            verdict = Verdict(float(reading_score[i]), bool(reading_suspicious[i]),
+                              bool(reading_rejected[i]), reasons.get(i))
+            self.suspicious += verdict.suspicious and not verdict.rejected
+            self.rejected += verdict.rejected
+            verdicts.append(verdict)
+        self.scored += len(readings)
+        if self._overflowed:
+            self._evict()
+        return verdicts
+
+    def stats(self) -> Dict:
+        return {
+            "threshold": self.threshold,
+            "z_limit": round(self.z_limit, 3),
+            "alpha": self.alpha,
+            "warmup": self.warmup,
+            "series": len(self._slots),
+            "scored": self.scored,
+            "suspicious": self.suspicious,
+            "rejected": self.rejected,
+            "untracked": self.untracked,
+            "evicted": self.evicted,
+            "batches": self.batches,
+        }
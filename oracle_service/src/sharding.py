@@ -0,0 +1,291 @@
+#!/usr/bin/env python3
+"""
+HEADY_BRAND:BEGIN
+╔══════════════════════════════════════════════════════════════════╗
+║  HeadyField Oracle - Multi-Process Field Sharding                 ║
+║  "One field, one worker, every core busy"                         ║
+╚══════════════════════════════════════════════════════════════════╝
+HEADY_BRAND:END
+
+With ``ORACLE_WORKERS`` > 1 the uvicorn process becomes a supervisor. It keeps
+the MQTT subscription and routes each message by ``field_id`` over a
+consistent-hash ring to one of N worker processes. Every worker runs a full
+HeadyOracle pipeline (verification, dedup, rollups, brain client, writer and
+its own spool directory) with no MQTT client. Because a field always lands on
+the same worker, per-field state such as replay windows and rollups stays
+local. When the worker count changes, only about 1/N of the fields move.
+
+Messages cross the process boundary in small batches over one
+``multiprocessing`` queue per worker. Status, metric and recent-reading
+requests use a separate control queue so they do not wait behind a backlog
+of readings.
+"""
+
+import asyncio
+import hashlib
+import itertools
+import logging
+import multiprocessing
+import os
+import queue
+import threading
+import time
+from bisect import bisect
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+def _hash(key: str) -> int:
+    return int.from_bytes(hashlib.blake2b(key.encode(), digest_size=8).digest(), 'big')
+
+
+class HashRing:
+    """Consistent-hash ring mapping keys to node indexes via virtual nodes"""
+
+    def __init__(self, nodes: int, replicas: int = 128, cache_size: int = 100000):
+        points = sorted((_hash(f"shard-{node}#{replica}"), node)
+                        for node in range(nodes) for replica in range(replicas))
+        self._points = [point for point, _ in points]
+        self._nodes = [node for _, node in points]
+        self._cache: Dict[str, int] = {}
+        self.cache_size = cache_size
+
+    def node_for(self, key: str) -> int:
+        node = self._cache.get(key)
+        if node is None:
+            node = self._nodes[bisect(self._points, _hash(key)) % len(self._points)]
+            if len(self._cache) >= self.cache_size:
+                self._cache.clear()
+            self._cache[key] = node
+        return node
+
+
+def run_shard(index: int, inbox, control, replies, env: Dict[str, str]):
+    """Worker process entry point: a full oracle pipeline fed from ``inbox``"""
+    os.environ.update(env)
+    from .oracle_server import oracle  # reads the shard's environment on import
+
+    asyncio.run(_serve_shard(index, oracle, inbox, control, replies))
+
+
+async def _serve_shard(index: int, oracle, inbox, control, replies):
+    loop = asyncio.get_running_loop()
+    await oracle.initialize(connect_mqtt=False)
+
+    async def feed():
+        while True:
+            batch = await loop.run_in_executor(None, inbox.get)
+            if batch is None:
+                return
+            for topic, payload in batch:
+                oracle.ingest.submit(topic, payload)
+
+    feeder = loop.create_task(feed())
+    while True:
+        command, request_id, args = await loop.run_in_executor(None, control.get)
+        if command == 'stop':
+            break
+        if command == 'report':
+            result = (oracle.status(), oracle.metrics.collect())
+        elif command == 'recent':
+            method, query = args
+            result = oracle.recent_readings(method, **query)
+        elif command == 'config':
+            try:
+                result = {'applied': oracle.config.update(args)}
+            except Exception as e:
+                result = {'error': str(e)}
+        else:
+            result = None
+        replies.put((request_id, index, result))
+
+    inbox.put(None)
+    await asyncio.gather(feeder, return_exceptions=True)
+    await oracle.shutdown()
+
+
+class ShardSupervisor:
+    """Routes MQTT messages to field-sharded worker processes and gathers their reports"""
+
+    def __init__(self, workers: int, spool_dir: str = '', batch_size: int = 256,
+                 batch_window: float = 0.005, max_queued_batches: int = 1024, spool_root: str = ''):
+        self.workers = workers
+        self.spool_dir = spool_dir
+        self.spool_root = spool_root or spool_dir
+        self.config_env: Dict[str, str] = {}
+        self.batch_size = batch_size
+        self.batch_window = batch_window
+        self.max_queued_batches = max_queued_batches
+        self.ring = HashRing(workers)
+
+        # spawn, not fork: the supervisor already runs paho/uvicorn threads
+        self._ctx = multiprocessing.get_context('spawn')
+        self._inboxes: List = []
+        self._controls: List = []
+        self._replies = None
+        self._processes: List[Optional[multiprocessing.Process]] = [None] * workers
+
+        self._lock = threading.Lock()
+        self._buffers: List[List[Tuple[str, bytes]]] = [[] for _ in range(workers)]
+        self._flusher: Optional[threading.Thread] = None
+        self._monitor: Optional[asyncio.Task] = None
+        self._collector: Optional[asyncio.Task] = None
+        self._waiting: Dict[int, Tuple[asyncio.Future, Dict[int, object], int]] = {}
+        self._request_ids = itertools.count(1)
+        self._running = False
+
+        self.routed = [0] * workers
+        self.overflow = [0] * workers
+        self.restarts = [0] * workers
+
+    def start(self):
+        """Spawn the workers and start batching, liveness and reply tasks"""
+        self._running = True
+        self._inboxes = [self._ctx.Queue(self.max_queued_batches) for _ in range(self.workers)]
+        self._controls = [self._ctx.Queue() for _ in range(self.workers)]
+        self._replies = self._ctx.Queue()
+        for index in range(self.workers):
+            self._spawn(index)
+        self._flusher = threading.Thread(target=self._flush_periodically, name='shard-flush', daemon=True)
+        self._flusher.start()
+        loop = asyncio.get_running_loop()
+        self._monitor = loop.create_task(self._watch_workers())
+        self._collector = loop.create_task(self._collect_replies())
+
+    def _spawn(self, index: int):
+        env = {'ORACLE_WORKERS': '1', 'ORACLE_SHARD_INDEX': str(index)}
+        env['ORACLE_SPOOL_DIR'] = os.path.join(self.spool_dir, f"shard-{index}") if self.spool_dir else ''
+        # Shards drain what removed shards, or a single-worker run, left behind
+        env['ORACLE_SPOOL_ROOT'] = self.spool_root
+        env.update(self.config_env)  # live config survives a respawn
+        process = self._ctx.Process(
+            target=run_shard,
+            args=(index, self._inboxes[index], self._controls[index], self._replies, env),
+            name=f"heady-oracle-shard-{index}",
+            daemon=True
+        )
+        process.start()
+        self._processes[index] = process
+        logger.info(f"Started oracle shard {index} (pid {process.pid})")
+
+    def route(self, topic: str, payload: bytes):
+        """Queue a message for the worker owning its field; safe from any thread"""
+        parts = topic.split('/', 2)
+        shard = self.ring.node_for(parts[1] if len(parts) > 1 else topic)
+        with self._lock:
+            buffer = self._buffers[shard]
+            buffer.append((topic, payload))
+            if len(buffer) >= self.batch_size:
+                self._buffers[shard] = []
+                self._send(shard, buffer)
+
+    def _send(self, shard: int, batch: List[Tuple[str, bytes]]):
+        try:
+            self._inboxes[shard].put_nowait(batch)
+            self.routed[shard] += len(batch)
+        except queue.Full:
+            self.overflow[shard] += len(batch)
+
+    def _flush_buffers(self):
+        with self._lock:
+            for shard, buffer in enumerate(self._buffers):
+                if buffer:
+                    self._buffers[shard] = []
+                    self._send(shard, buffer)
+
+    def _flush_periodically(self):
+        while self._running:
+            time.sleep(self.batch_window)
+            self._flush_buffers()
+
+    async def _watch_workers(self):
+        """Respawn workers that exit unexpectedly; queued batches are kept"""
+        while True:
+            await asyncio.sleep(1.0)
+            for index, process in enumerate(self._processes):
+                if process is not None and not process.is_alive():
+                    self.restarts[index] += 1
+                    logger.error(f"Oracle shard {index} exited with code {process.exitcode}; restarting")
+                    self._spawn(index)
+
+    async def _collect_replies(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            reply = await loop.run_in_executor(None, self._replies.get)
+            if reply is None:
+                return
+            request_id, index, result = reply
+            waiting = self._waiting.get(request_id)
+            if waiting is None:
+                continue
+            future, results, expected = waiting
+            results[index] = result
+            if len(results) == expected and not future.done():
+                future.set_result(results)
+
+    async def _request(self, command: str, args=None, shards: Optional[List[int]] = None,
+                       timeout: float = 2.0) -> Dict[int, object]:
+        """Send a control request and gather the replies that arrive within ``timeout``"""
+        shards = list(range(self.workers)) if shards is None else shards
+        request_id = next(self._request_ids)
+        future = asyncio.get_running_loop().create_future()
+        results: Dict[int, object] = {}
+        self._waiting[request_id] = (future, results, len(shards))
+        for shard in shards:
+            self._controls[shard].put((command, request_id, args))
+        try:
+            await asyncio.wait_for(asyncio.shield(future), timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"Shard {command} request timed out; "
+                           f"{len(shards) - len(results)} of {len(shards)} workers silent")
+        finally:
+            del self._waiting[request_id]
+        return results
+
+    async def configure(self, updates: Dict, env: Dict[str, str]) -> Dict[int, Dict]:
+        """Apply live config ``updates`` on every worker; ``env`` is used for workers spawned later"""
+        self.config_env = env
+        return await self._request('config', updates)
+
+    async def collect(self) -> List[Tuple[Dict, List]]:
+        """(status, metric families) from every worker that answers in time"""
+        results = await self._request('report')
+        return [results[shard] for shard in sorted(results)]
+
+    async def query_recent(self, method: str, query: Dict) -> List[Dict]:
+        """Recent readings from the worker owning ``query['field_id']``, or from all workers"""
+        field_id = query.get('field_id')
+        shards = [self.ring.node_for(field_id)] if field_id else None
+        results = await self._request('recent', (method, query), shards)
+        return [reading for shard in sorted(results) for reading in results[shard]]
+
+    async def stop(self, timeout: float = 15.0):
+        """Flush routed messages and shut every worker down cleanly"""
+        self._running = False
+        if self._monitor:
+            self._monitor.cancel()
+        self._flush_buffers()
+        for control in self._controls:
+            control.put(('stop', 0, None))
+        loop = asyncio.get_running_loop()
+        for index, process in enumerate(self._processes):
+            if process is None:
+                continue
+            await loop.run_in_executor(None, process.join, timeout)
+            if process.is_alive():
+                logger.warning(f"Oracle shard {index} did not stop in {timeout}s; terminating")
+                process.terminate()
+        self._replies.put(None)
+        if self._collector:
+            await asyncio.gather(self._collector, return_exceptions=True)
+
+    def stats(self) -> Dict:
+        return {
+            "workers": self.workers,
+            "pids": [process.pid if process else None for process in self._processes],
+            "alive": [bool(process and process.is_alive()) for process in self._processes],
+            "routed": self.routed,
+            "overflow": self.overflow,
+            "restarts": self.restarts,
+        }
@@ -0,0 +1,365 @@
+#!/usr/bin/env python3
+"""
+HEADY_BRAND:BEGIN
+╔══════════════════════════════════════════════════════════════════╗
+║  HeadyField Oracle - Durable Write-Ahead Spool                    ║
+║  "The vault can wait; the readings are already safe"              ║
+╚══════════════════════════════════════════════════════════════════╝
+HEADY_BRAND:END
+
+Verified line-protocol batches are appended to numbered segment files as
+``<length:u32><crc32:u32><body>`` records. A drainer streams sealed segments
+to InfluxDB in bulk and deletes each segment once it has been written.
+
+After a crash every segment on disk is treated as sealed and replayed; a torn
+or corrupt tail record ends that segment's replay. A segment interrupted
+mid-drain is replayed from its start, which is safe because InfluxDB treats a
+point with the same measurement, tags and timestamp as an overwrite.
+
+A live spool holds an exclusive lock on ``<directory>/.lock``. Directories
+under the spool ``root`` whose lock nobody holds belong to an oracle that is
+gone: the other half of a blue/green swap, a shard removed by a scale-down,
+or a single-worker run before sharding. Their segments are moved into the
+live spool and drained, at open and then every ``adopt_interval`` seconds.
+
+A chunk InfluxDB refuses for good (``rejected`` says so, e.g. a 400 for a
+field type conflict) is appended to ``quarantine/rejected-<date>.lp`` as line
+protocol and draining carries on, so one bad record cannot wedge the spool.
+"""
+
+import asyncio
+import fcntl
+import logging
+import os
+import struct
+import threading
+import time
+import zlib
+from typing import Callable, Dict, Iterator, List, Optional
+
+logger = logging.getLogger(__name__)
+
+HEADER = struct.Struct('<II')
+SEGMENT_PREFIX = 'segment-'
+SEGMENT_SUFFIX = '.spool'
+LOCK_NAME = '.lock'
+QUARANTINE_DIR = 'quarantine'
+
+
+class SpoolFull(Exception):
+    """Raised when appending would exceed the spool's size cap"""
+
+
+def spool_writable(directory: str) -> bool:
+    """Whether segment files can be created in ``directory`` (created if missing)"""
+    try:
+        os.makedirs(directory, exist_ok=True)
+        probe = os.path.join(directory, f".probe-{os.getpid()}")
+        with open(probe, 'wb'):
+            pass
+        os.remove(probe)
+        return True
+    except OSError as e:
+        logger.warning(f"Spool directory {directory} is not writable: {e}")
+        return False
+
+
+def _is_segment(name: str) -> bool:
+    return name.startswith(SEGMENT_PREFIX) and name.endswith(SEGMENT_SUFFIX)
+
+
+def _try_lock(directory: str):
+    """Open file holding the directory's exclusive lock, or None if a live spool has it"""
+    handle = open(os.path.join(directory, LOCK_NAME), 'a')
+    try:
+        fcntl.flock(handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except BlockingIOError:
+        handle.close()
+        return None
+    return handle
+
+
+class SegmentSpool:
+    """Append-only, CRC-checked segment files with rotation and a size cap"""
+
+    def __init__(self, directory: str, segment_bytes: int = 64 * 1024 * 1024,
+                 max_bytes: int = 1024 * 1024 * 1024, fsync: bool = True, root: Optional[str] = None):
+        self.directory = directory
+        self.root = root or directory
+        self.segment_bytes = segment_bytes
+        self.max_bytes = max_bytes
+        self.fsync = fsync
+
+        self._lock = threading.Lock()
+        self._sealed: List[str] = []
+        self._active = None
+        self._active_path: Optional[str] = None
+        self._active_size = 0
+        self._active_opened = 0.0
+        self._next_seq = 1
+        self._total_bytes = 0
+        self._dir_lock = None
+
+        self.records_appended = 0
+        self.segments_adopted = 0
+        self.records_corrupt = 0
+
+    def open(self):
+        """Adopt segments left by a previous run and start a fresh active segment"""
+        os.makedirs(self.directory, exist_ok=True)
+        # Another spool only holds it briefly while adopting; a second live oracle holds it for good
+        deadline = time.monotonic() + 10.0
+        self._dir_lock = _try_lock(self.directory)
+        while self._dir_lock is None:
+            if time.monotonic() >= deadline:
+                raise RuntimeError(f"Spool directory {self.directory} is in use by another oracle process")
+            time.sleep(0.1)
+            self._dir_lock = _try_lock(self.directory)
+        names = sorted(n for n in os.listdir(self.directory) if _is_segment(n))
+        with self._lock:
+            self._sealed = [os.path.join(self.directory, n) for n in names]
+            self._total_bytes = sum(os.path.getsize(p) for p in self._sealed)
+            if names:
+                self._next_seq = int(names[-1][len(SEGMENT_PREFIX):-len(SEGMENT_SUFFIX)]) + 1
+            self._open_active()
+        if self._sealed:
+            logger.info(f"Spool recovered {len(self._sealed)} segments ({self._total_bytes} bytes) for replay")
+        self.adopt_orphans()
+
+    def close(self):
+        with self._lock:
+            if self._active is not None:
+                self._active.close()
+                self._active = None
+            if self._dir_lock is not None:
+                self._dir_lock.close()
+                self._dir_lock = None
+
+    def adopt_orphans(self) -> int:
+        """Move segments from unlocked spool directories under ``root`` into this spool"""
+        own = os.path.abspath(self.directory)
+        adopted = 0
+        for path, _, files in os.walk(self.root):
+            if os.path.abspath(path) != own and any(_is_segment(n) for n in files):
+                adopted += self._adopt_from(path)
+        return adopted
+
+    def _adopt_from(self, path: str) -> int:
+        try:
+            lock = _try_lock(path)
+        except OSError as e:
+            logger.warning(f"Cannot check spool directory {path} for orphaned segments: {e}")
+            return 0
+        if lock is None:
+            return 0
+        adopted = 0
+        try:
+            with self._lock:
+                for name in sorted(n for n in os.listdir(path) if _is_segment(n)):
+                    target = os.path.join(self.directory, f"{SEGMENT_PREFIX}{self._next_seq:010d}{SEGMENT_SUFFIX}")
+                    self._next_seq += 1
+                    os.rename(os.path.join(path, name), target)
+                    self._sealed.append(target)
+                    self._total_bytes += os.path.getsize(target)
+                    adopted += 1
+        except OSError as e:
+            logger.warning(f"Adopting orphaned spool segments from {path} stopped: {e}")
+        finally:
+            lock.close()
+        if adopted:
+            self.segments_adopted += adopted
+            logger.info(f"Spool adopted {adopted} orphaned segments from {path} for replay")
+        return adopted
+
+    def append(self, body: str):
+        """Durably append one line-protocol batch (blocking)"""
+        data = body.encode()
+        record = HEADER.pack(len(data), zlib.crc32(data)) + data
+        if len(record) > self.max_bytes:
+            raise ValueError(f"Batch of {len(record)} bytes can never fit a {self.max_bytes}-byte spool")
+        with self._lock:
+            if self._total_bytes + len(record) > self.max_bytes:
+                raise SpoolFull(f"Spool at {self.directory} is full ({self._total_bytes} bytes)")
+            self._active.write(record)
+            self._active.flush()
+            if self.fsync:
+                os.fsync(self._active.fileno())
+            self._active_size += len(record)
+            self._total_bytes += len(record)
+            self.records_appended += 1
+            if self._active_size >= self.segment_bytes:
+                self._seal_active()
+
+    def seal_if_idle(self, max_age: float) -> bool:
+        """Seal a non-empty active segment older than ``max_age`` seconds"""
+        with self._lock:
+            if self._active_size and time.monotonic() - self._active_opened >= max_age:
+                self._seal_active()
+                return True
+        return False
+
+    def sealed_segments(self) -> List[str]:
+        with self._lock:
+            return list(self._sealed)
+
+    def read_segment(self, path: str) -> Iterator[bytes]:
+        """Yield record bodies, stopping at the first torn or corrupt record"""
+        with open(path, 'rb') as f:
+            while True:
+                header = f.read(HEADER.size)
+                if not header:
+                    return
+                if len(header) < HEADER.size:
+                    self._corrupt(path, "truncated header")
+                    return
+                length, crc = HEADER.unpack(header)
+                data = f.read(length)
+                if len(data) < length or zlib.crc32(data) != crc:
+                    self._corrupt(path, "truncated or corrupt record")
+                    return
+                yield data
+
+    def remove(self, path: str):
+        """Delete a fully drained segment"""
+        with self._lock:
+            size = os.path.getsize(path)
+            os.remove(path)
+            self._sealed.remove(path)
+            self._total_bytes -= size
+
+    def quarantine(self, body: str, reason: str) -> str:
+        """Append a batch the sink refused for good to today's quarantine file; returns its path"""
+        directory = os.path.join(self.directory, QUARANTINE_DIR)
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f"rejected-{time.strftime('%Y%m%d')}.lp")
+        with open(path, 'a') as f:
+            f.write(f"# {time.strftime('%Y-%m-%dT%H:%M:%S')} {reason}\n{body}\n")
+        return path
+
+    def _corrupt(self, path: str, reason: str):
+        self.records_corrupt += 1
+        logger.error(f"Spool segment {os.path.basename(path)}: {reason}; discarding the rest of the segment")
+
+    def _open_active(self):
+        self._active_path = os.path.join(self.directory, f"{SEGMENT_PREFIX}{self._next_seq:010d}{SEGMENT_SUFFIX}")
+        self._next_seq += 1
+        self._active = open(self._active_path, 'ab')
+        self._active_size = 0
+        self._active_opened = time.monotonic()
+
+    def _seal_active(self):
+        self._active.close()
+        self._sealed.append(self._active_path)
+        self._open_active()
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "directory": self.directory,
+                "sealed_segments": len(self._sealed),
+                "bytes": self._total_bytes,
+                "max_bytes": self.max_bytes,
+                "records_appended": self.records_appended,
+                "records_corrupt": self.records_corrupt,
+                "segments_adopted": self.segments_adopted,
+            }
+
+
+class SpoolDrainer:
+    """Streams sealed spool segments to InfluxDB in bulk, oldest first"""
+
+    def __init__(self, spool: SegmentSpool, write_batch: Callable[[str], None], backoff,
+                 batch_bytes: int = 4 * 1024 * 1024, seal_after: float = 1.0,
+                 write_latency=None, adopt_interval: float = 30.0,
+                 rejected: Optional[Callable[[Exception], bool]] = None):
+        self.spool = spool
+        self._write_batch = write_batch
+        self._rejected = rejected or (lambda error: False)
+        self.backoff = backoff
+        self.batch_bytes = batch_bytes
+        self.seal_after = seal_after
+        self.adopt_interval = adopt_interval
+        self._task: Optional[asyncio.Task] = None
+        self._write_latency = write_latency
+
+        self.records_drained = 0
+        self.segments_drained = 0
+        self.write_failures = 0
+        self.records_quarantined = 0
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _run(self):
+        next_adopt = time.monotonic() + self.adopt_interval
+        while True:
+            if time.monotonic() >= next_adopt:
+                # Picks up what the other half of a blue/green swap left once it has stopped
+                await asyncio.to_thread(self.spool.adopt_orphans)
+                next_adopt = time.monotonic() + self.adopt_interval
+            self.spool.seal_if_idle(self.seal_after)
+            segments = self.spool.sealed_segments()
+            if not segments:
+                await asyncio.sleep(self.seal_after)
+                continue
+            for path in segments:
+                await self._drain_segment(path)
+
+    async def _drain_segment(self, path: str):
+        chunk: List[bytes] = []
+        size = 0
+        records = self.spool.read_segment(path)
+        while True:
+            # Each record is a whole flushed batch, so one thread hop per record is cheap
+            record = await asyncio.to_thread(next, records, None)
+            if record is None:
+                break
+            chunk.append(record)
+            size += len(record)
+            if size >= self.batch_bytes:
+                await self._write(chunk)
+                chunk, size = [], 0
+        if chunk:
+            await self._write(chunk)
+        await asyncio.to_thread(self.spool.remove, path)
+        self.segments_drained += 1
+
+    async def _write(self, records: List[bytes]):
+        """Write until InfluxDB accepts the chunk, or quarantine it if InfluxDB never will"""
+        body = b"\n".join(records).decode()
+        attempt = 0
+        while True:
+            started = time.perf_counter()
+            try:
+                await asyncio.to_thread(self._write_batch, body)
+                if self._write_latency is not None:
+                    self._write_latency.observe(time.perf_counter() - started)
+                self.records_drained += len(records)
+                return
+            except Exception as e:
+                self.write_failures += 1
+                if self._rejected(e):
+                    reason = ' '.join(str(e).split())[:300]
+                    path = await asyncio.to_thread(self.spool.quarantine, body, reason)
+                    self.records_quarantined += len(records)
+                    logger.error(f"InfluxDB rejected {len(records)} spooled batches ({reason}); moved to {path}")
+                    return
+                delay = self.backoff.get_delay(min(attempt, self.backoff.max_retries - 1)) / 1000.0
+                attempt += 1
+                logger.warning(f"Spool drain write failed: {e}. Retrying in {delay}s")
+                await asyncio.sleep(delay)
+
+    def stats(self) -> Dict:
+        return {
+            "records_drained": self.records_drained,
+            "segments_drained": self.segments_drained,
+            "write_failures": self.write_failures,
+            "records_quarantined": self.records_quarantined,
+        }
@@ -0,0 +1,273 @@
+#!/usr/bin/env python3
+"""
+HEADY_BRAND:BEGIN
+╔══════════════════════════════════════════════════════════════════╗
+║  HeadyField Oracle - Sensor Signature Verification                ║
+║  "Don't trust words—trust actions"                                 ║
+╚══════════════════════════════════════════════════════════════════╝
+HEADY_BRAND:END
+
+Sensors sign the canonical JSON serialization of ``{"data": ..., "timestamp": ...}``
+(sorted keys, no whitespace) and publish the signature hex-encoded in the
+``signature`` field (or as raw bytes in CBOR/MessagePack payloads; the signed
+bytes are always the canonical JSON, whatever the wire format). Keys are
+provisioned per ``sensor_id`` in a JSON key file::
+
+    {"esp32-a1": {"alg": "ed25519", "key": "<32-byte public key, hex>"},
+     "esp32-b7": {"alg": "hmac-sha256", "key": "<shared secret, hex>"}}
+
+``config/sensor_keys.example.json`` is a template. In strict mode the oracle
+refuses to start until a real key file exists.
+
+Verification runs in micro-batches on a thread or process pool so the event
+loop never executes the crypto itself.
+"""
+
+import asyncio
+import hashlib
+import hmac
+import json
+import logging
+import os
+import time
+from collections import OrderedDict
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+try:
+    from cryptography.exceptions import InvalidSignature
+    from cryptography.hazmat.primitives.asymmetric.ed25519 import Ed25519PublicKey
+except ImportError:  # pragma: no cover - cryptography is in requirements.txt
+    Ed25519PublicKey = None
+    InvalidSignature = Exception
+
+logger = logging.getLogger(__name__)
+
+REQUIRED_FIELDS = ('timestamp', 'sensor_id', 'signature', 'data')
+
+# (algorithm, key bytes)
+SensorKey = Tuple[str, bytes]
+# (algorithm, key bytes, canonical message, signature bytes)
+VerifyJob = Tuple[str, bytes, bytes, bytes]
+
+
+def canonical_message(payload: Dict) -> bytes:
+    """Canonical bytes a sensor signs: sorted, whitespace-free data + timestamp"""
+    return json.dumps(
+        {'data': payload['data'], 'timestamp': payload['timestamp']},
+        sort_keys=True,
+        separators=(',', ':')
+    ).encode()
+
+
+@lru_cache(maxsize=4096)
+def _ed25519_key(key: bytes):
+    return Ed25519PublicKey.from_public_bytes(key)
+
+
+def verify_one(alg: str, key: bytes, message: bytes, signature: bytes) -> bool:
+    """Verify a single signature; never raises"""
+    try:
+        if alg == 'ed25519':
+            if Ed25519PublicKey is None:
+                return False
+            _ed25519_key(key).verify(signature, message)
+            return True
+        if alg == 'hmac-sha256':
+            expected = hmac.new(key, message, hashlib.sha256).digest()
+            return hmac.compare_digest(expected, signature)
+    except (InvalidSignature, ValueError):
+        return False
+    return False
+
+
+def verify_batch(jobs: List[VerifyJob]) -> List[bool]:
+    """Verify a batch of jobs; module level so it pickles for process pools"""
+    return [verify_one(*job) for job in jobs]
+
+
+class KeyStore:
+    """Loads per-sensor keys from the JSON key file, re-reading it when it changes"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._mtime: Optional[float] = None
+        self._keys: Dict[str, SensorKey] = {}
+
+    def lookup(self, sensor_id: str) -> Optional[SensorKey]:
+        try:
+            mtime = os.path.getmtime(self.path)
+        except OSError:
+            return None
+        if mtime != self._mtime:
+            self._reload(mtime)
+        return self._keys.get(sensor_id)
+
+    def check(self):
+        """Load the key file now; raises if it is missing or unreadable"""
+        try:
+            mtime = os.path.getmtime(self.path)
+        except OSError as e:
+            raise FileNotFoundError(f"No sensor key file at {self.path}") from e
+        self._reload(mtime)
+        if self._mtime != mtime:
+            raise ValueError(f"Sensor key file {self.path} could not be loaded")
+        return len(self._keys)
+
+    def _reload(self, mtime: float):
+        try:
+            with open(self.path) as f:
+                raw = json.load(f)
+            self._keys = {
+                sensor_id: (entry.get('alg', 'ed25519').lower(), bytes.fromhex(entry['key']))
+                for sensor_id, entry in raw.items()
+            }
+            self._mtime = mtime
+            logger.info(f"Loaded {len(self._keys)} sensor keys from {self.path}")
+        except Exception as e:
+            logger.error(f"Error loading sensor keys from {self.path}: {e}")
+
+
+class SensorKeyCache:
+    """LRU cache of per-sensor keys with a TTL, so key rotations are picked up"""
+
+    def __init__(self, store: KeyStore, max_size: int = 10000, ttl: float = 300.0):
+        self.store = store
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, Tuple[float, Optional[SensorKey]]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, sensor_id: str) -> Optional[SensorKey]:
+        now = time.monotonic()
+        entry = self._entries.get(sensor_id)
+        if entry is not None and entry[0] > now:
+            self._entries.move_to_end(sensor_id)
+            self.hits += 1
+            return entry[1]
+
+        # Unknown sensors are cached too, so they cannot force a reload per message
+        self.misses += 1
+        key = self.store.lookup(sensor_id)
+        self._entries[sensor_id] = (now + self.ttl, key)
+        self._entries.move_to_end(sensor_id)
+        if len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+        return key
+
+    def stats(self) -> Dict:
+        return {"size": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+
+class SignatureVerifier:
+    """Collects verification requests into micro-batches and runs them on a pool"""
+
+    def __init__(self, key_cache: SensorKeyCache, mode: str = 'strict',
+                 executor: str = 'thread', workers: Optional[int] = None,
+                 batch_size: int = 256, batch_window: float = 0.002):
+        self.key_cache = key_cache
+        self.mode = mode
+        self.executor_kind = executor
+        self.workers = workers or os.cpu_count() or 1
+        self.batch_size = batch_size
+        self.batch_window = batch_window
+
+        self._executor: Optional[Executor] = None
+        self._pending: List[Tuple[VerifyJob, asyncio.Future]] = []
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+
+        self.verified = 0
+        self.rejected = 0
+        self.unknown_sensors = 0
+        self.batches = 0
+
+    def start(self):
+        """Create the worker pool"""
+        if self.mode != 'strict' or self._executor is not None:
+            return
+        if self.executor_kind == 'process':
+            self._executor = ProcessPoolExecutor(max_workers=self.workers)
+        else:
+            self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='verify')
+
+    async def stop(self):
+        """Shut the worker pool down"""
+        if self._executor is not None:
+            self._flush()
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    async def verify(self, payload: Dict) -> bool:
+        """Verify one message's signature; batches with concurrent callers"""
+        if not all(field in payload for field in REQUIRED_FIELDS):
+            self.rejected += 1
+            return False
+        if self.mode != 'strict':
+            self.verified += 1
+            return True
+
+        key = self.key_cache.get(payload['sensor_id'])
+        if key is None:
+            self.unknown_sensors += 1
+            self.rejected += 1
+            return False
+        try:
+            signature = payload['signature']
+            if not isinstance(signature, (bytes, bytearray)):
+                signature = bytes.fromhex(signature)
+            job = (key[0], key[1], canonical_message(payload), signature)
+        except (TypeError, ValueError):
+            self.rejected += 1
+            return False
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((job, future))
+        if len(self._pending) >= self.batch_size:
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(self.batch_window, self._flush)
+
+        ok = await future
+        if ok:
+            self.verified += 1
+        else:
+            self.rejected += 1
+        return ok
+
+    def _flush(self):
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        if not self._pending or self._executor is None:
+            return
+        pending, self._pending = self._pending, []
+        self.batches += 1
+        loop = asyncio.get_running_loop()
+        batch = loop.run_in_executor(self._executor, verify_batch, [job for job, _ in pending])
+        batch.add_done_callback(lambda done: self._resolve(pending, done))
+
+    @staticmethod
+    def _resolve(pending: List[Tuple[VerifyJob, asyncio.Future]], done: asyncio.Future):
+        if done.cancelled() or done.exception() is not None:
+            logger.error(f"Signature batch of {len(pending)} failed: {done.exception() if not done.cancelled() else 'cancelled'}")
+            results = [False] * len(pending)
+        else:
+            results = done.result()
+        for (_, future), ok in zip(pending, results):
+            if not future.done():
+                future.set_result(ok)
+
+    def stats(self) -> Dict:
+        return {
+            "mode": self.mode,
+            "executor": self.executor_kind,
+            "workers": self.workers,
+            "verified": self.verified,
+            "rejected": self.rejected,
+            "unknown_sensors": self.unknown_sensors,
+            "batches": self.batches,
+            "key_cache": self.key_cache.stats(),
+        }
@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+"""
+HEADY_BRAND:BEGIN
+╔══════════════════════════════════════════════════════════════════╗
+║  HeadyField Oracle - Batched InfluxDB Write Pipeline              ║
+║  "Many readings, one round trip"                                   ║
+╚══════════════════════════════════════════════════════════════════╝
+HEADY_BRAND:END
+"""
+
+import asyncio
+import logging
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+_STOP = object()
+
+
+class BatchedWriter:
+    """Buffers line-protocol records and flushes them to InfluxDB in batches
+
+    Records are queued in a bounded asyncio queue. A single flush task drains
+    the queue and hands a batch to ``write_batch`` (a blocking callable that is
+    run in a worker thread) when either ``batch_size`` records are pending or
+    the oldest pending record is ``flush_interval`` seconds old. Failed batches
+    are retried with the supplied Fibonacci backoff; while a batch is being
+    retried the queue fills up and ``submit`` blocks, which pushes backpressure
+    up into the ingest path instead of growing memory without bound.
+    Successful write durations are recorded in the optional ``write_latency``
+    histogram. If a ``ready`` event is given, nothing is flushed until it is
+    set; records buffer in the queue (and then push back on ingest) while the
+    sink is still coming up. Exceptions in ``full_errors`` mean the sink is
+    full rather than failing (a full spool): the batch is held and retried
+    every ``flush_interval`` until it fits, without counting as a failure.
+    Errors for which ``rejected`` returns True (InfluxDB refusing the body
+    itself, e.g. a 400) are not retried: the batch is dropped at once and
+    counted as rejected, so one bad batch cannot hold up the flush task.
+    """
+
+    def __init__(self, write_batch: Callable[[str], None], backoff,
+                 batch_size: int = 5000, flush_interval: float = 1.0,
+                 max_queue: int = 50000, write_latency=None,
+                 ready: Optional[asyncio.Event] = None, full_errors: Tuple[type, ...] = (),
+                 rejected: Optional[Callable[[Exception], bool]] = None):
+        self._write_batch = write_batch
+        self.backoff = backoff
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_queue = max_queue
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=max_queue)
+        self._task: Optional[asyncio.Task] = None
+        self._write_latency = write_latency
+        self._ready = ready
+        self._full_errors = full_errors
+        self._rejected = rejected or (lambda error: False)
+
+        # Counters surfaced on /status
+        self.records_written = 0
+        self.records_dropped = 0
+        self.records_rejected = 0
+        self.batches_written = 0
+        self.batches_failed = 0
+        self.retries = 0
+        self.full_stalls = 0
+        self.full_seconds = 0.0
+        self.last_flush_duration = 0.0
+
+    def start(self):
+        """Start the background flush task on the running loop"""
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def submit(self, record: str):
+        """Queue a line-protocol record, waiting while the queue is full"""
+        await self._queue.put(record)
+
+    async def stop(self, timeout: float = 30.0):
+        """Flush everything still queued and stop the flush task"""
+        if self._task is None:
+            return
+        if self._ready is not None and not self._ready.is_set():
+            logger.error(f"Write sink never became ready; {self._queue.qsize()} queued records abandoned")
+            self._task.cancel()
+            self._task = None
+            return
+        await self._queue.put(_STOP)
+        try:
+            await asyncio.wait_for(self._task, timeout)
+        except asyncio.TimeoutError:
+            logger.error(f"Write pipeline did not drain within {timeout}s; "
+                         f"{self._queue.qsize()} records abandoned")
+            self._task.cancel()
+        self._task = None
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        stopping = False
+        while not stopping:
+            if self._ready is not None and not self._ready.is_set():
+                await self._ready.wait()
+            first = await self._queue.get()
+            if first is _STOP:
+                break
+            batch: List[str] = [first]
+            deadline = loop.time() + self.flush_interval
+
+            while len(batch) < self.batch_size:
+                try:
+                    record = self._queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    timeout = deadline - loop.time()
+                    if timeout <= 0:
+                        break
+                    try:
+                        record = await asyncio.wait_for(self._queue.get(), timeout)
+                    except asyncio.TimeoutError:
+                        break
+                if record is _STOP:
+                    stopping = True
+                    break
+                batch.append(record)
+
+            await self._flush(batch)
+
+        # Drain whatever was queued ahead of the stop marker
+        remaining: List[str] = []
+        while not self._queue.empty():
+            record = self._queue.get_nowait()
+            if record is not _STOP:
+                remaining.append(record)
+        for i in range(0, len(remaining), self.batch_size):
+            await self._flush(remaining[i:i + self.batch_size])
+
+    async def _flush(self, batch: List[str]):
+        """Write one batch, retrying with Fibonacci backoff"""
+        body = "\n".join(batch)
+        for attempt in range(self.backoff.max_retries):
+            try:
+                self.last_flush_duration = await self._write_when_room(body, len(batch))
+                if self._write_latency is not None:
+                    self._write_latency.observe(self.last_flush_duration)
+                self.records_written += len(batch)
+                self.batches_written += 1
+                return
+            except Exception as e:
+                if self._rejected(e):
+                    self.batches_failed += 1
+                    self.records_rejected += len(batch)
+                    logger.error(f"Dropping batch of {len(batch)} records the sink rejected: "
+                                 f"{' '.join(str(e).split())[:300]}")
+                    return
+                if attempt == self.backoff.max_retries - 1:
+                    logger.warning(f"Batch write of {len(batch)} records failed (attempt {attempt + 1}): {e}")
+                    break
+                self.retries += 1
+                delay = self.backoff.get_delay(attempt) / 1000.0
+                logger.warning(f"Batch write of {len(batch)} records failed (attempt {attempt + 1}): {e}. "
+                               f"Retrying in {delay}s")
+                await asyncio.sleep(delay)
+
+        self.batches_failed += 1
+        self.records_dropped += len(batch)
+        logger.error(f"Dropping batch of {len(batch)} records after {self.backoff.max_retries} attempts")
+
+    async def _write_when_room(self, body: str, records: int) -> float:
+        """Hand ``body`` to the sink, holding it (and so the queue) while the sink is full
+
+        Returns the duration of the write that succeeded, not counting the stall.
+        """
+        stalled_at = None
+        while True:
+            started = time.perf_counter()
+            try:
+                await asyncio.to_thread(self._write_batch, body)
+                duration = time.perf_counter() - started
+                break
+            except self._full_errors as e:
+                if stalled_at is None:
+                    stalled_at = time.perf_counter()
+                    self.full_stalls += 1
+                    logger.warning(f"Write sink full, holding {records} records until it drains: {e}")
+                await asyncio.sleep(self.flush_interval)
+        if stalled_at is not None:
+            stalled = time.perf_counter() - stalled_at
+            self.full_seconds += stalled
+            logger.info(f"Write sink has room again after {stalled:.1f}s")
+        return duration
+
+    def stats(self) -> Dict:
+        """Snapshot of pipeline counters"""
+        return {
+            "queue_depth": self._queue.qsize(),
+            "queue_capacity": self.max_queue,
+            "sink_ready": self._ready is None or self._ready.is_set(),
+            "batch_size": self.batch_size,
+            "flush_interval": self.flush_interval,
+            "records_written": self.records_written,
+            "records_dropped": self.records_dropped,
+            "records_rejected": self.records_rejected,
+            "batches_written": self.batches_written,
+            "batches_failed": self.batches_failed,
+            "retries": self.retries,
+            "full_stalls": self.full_stalls,
+            "full_seconds": round(self.full_seconds, 3),
+            "last_flush_duration": self.last_flush_duration,
+        }
@@ -0,0 +1,9 @@
+import os
+import sys
+
+# Tests import the service as ``src.*``, the same way the benchmarks do
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Importing oracle_server builds an oracle from the environment: no spool on disk, no HeadyBrain calls
+os.environ.setdefault('ORACLE_SPOOL_DIR', '')
+os.environ.setdefault('HEADY_BRAIN_ENDPOINT', '')
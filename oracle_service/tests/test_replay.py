@@ -0,0 +1,50 @@
+import asyncio
+import json
+import time
+
+from src import dedup
+from src.oracle_server import HeadyOracle
+
+
+class _Clock:
+    """Stand-in for the ``time`` module in dedup, moved forward by the test"""
+
+    def __init__(self):
+        self.offset = 0.0
+
+    def time(self):
+        return time.time() + self.offset
+
+    def monotonic(self):
+        return time.monotonic() + self.offset
+
+
+def _message(timestamp: float) -> bytes:
+    return json.dumps({'sensor_id': 'soil-1', 'timestamp': timestamp, 'signature': 'ab' * 32,
+                       'data': {'soil_temp': 18.5}}).encode()
+
+
+def test_replay_after_window_is_rejected(monkeypatch):
+    clock = _Clock()
+    monkeypatch.setattr(dedup, 'time', clock)
+    oracle = HeadyOracle()
+    window = oracle.replay_index.window
+
+    async def run():
+        raw = _message(clock.time())
+        assert await oracle._process_message('field/north/sensors', raw)
+        assert not await oracle._process_message('field/north/sensors', raw)  # duplicate within the window
+        clock.offset += window + 1  # the key has left the index
+        assert not await oracle._process_message('field/north/sensors', raw)
+
+    asyncio.run(run())
+    assert oracle.replay_index.duplicates == 1
+    assert oracle.replay_index.stale == 1
+
+
+def test_timestamps_beyond_the_skew_tolerance_are_stale():
+    index = dedup.ReplayIndex(window=600, max_skew=60)
+    now = time.time()
+    assert index.fresh(now - 590) and index.fresh(now + 50)
+    assert not index.fresh(now - 610)
+    assert not index.fresh(now + 120)
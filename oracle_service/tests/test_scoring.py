@@ -0,0 +1,39 @@
+from array import array
+
+import numpy as np
+
+from src.records import SensorReading
+from src.scoring import AnomalyScorer
+
+
+def _escalation_rate(values_per_reading: int, threshold: float = 0.95) -> float:
+    rng = np.random.default_rng(7)
+    scorer = AnomalyScorer(threshold=threshold)
+    names = tuple(f"value_{i}" for i in range(values_per_reading))
+    flagged = total = 0
+    for step in range(2000):
+        batch = [SensorReading('field', f"sensor_{s}", float(step), names,
+                               array('d', rng.normal(20.0, 2.0, values_per_reading)), 'f' * values_per_reading)
+                 for s in range(10)]
+        verdicts = scorer.score_batch(batch)
+        if step >= 100:  # past warmup and the EWMA settling in
+            flagged += sum(v.suspicious for v in verdicts)
+            total += len(verdicts)
+    return flagged / total
+
+
+def test_stationary_noise_escalates_about_one_minus_threshold():
+    for k in (1, 4, 8):
+        assert abs(_escalation_rate(k) - 0.05) < 0.02, k
+
+
+def test_outlier_is_still_escalated():
+    scorer = AnomalyScorer(threshold=0.95)
+    rng = np.random.default_rng(3)
+    names = ('a', 'b', 'c', 'd')
+    for step in range(200):
+        scorer.score_batch([SensorReading('field', 'sensor', float(step), names,
+                                          array('d', rng.normal(20.0, 2.0, 4)), 'ffff')])
+    verdict, = scorer.score_batch([SensorReading('field', 'sensor', 200.0, names,
+                                                 array('d', [20.0, 20.0, 40.0, 20.0]), 'ffff')])
+    assert verdict.suspicious and any(reason.startswith('c:z=') for reason in verdict.reasons)